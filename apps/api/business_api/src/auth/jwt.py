@@ -9,6 +9,8 @@ from typing import Optional, Dict
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
+from services.tracing import tracer
+
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
@@ -65,11 +67,14 @@ def decode_access_token(token: str) -> Optional[Dict]:
     Returns:
         Decoded token payload or None if invalid
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+    with tracer.start_span("jwt.decode") as span:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            return payload
+        except JWTError as e:
+            span.set_attribute("jwt.valid", False)
+            span.set_attribute("jwt.error", str(e))
+            return None
 
 
 # Mock users database (for MVP)
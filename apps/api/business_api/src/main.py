@@ -12,7 +12,11 @@ sys.path.insert(0, current_dir)
 
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
+import asyncio
 import uvicorn
 import logging
 
@@ -26,10 +30,7 @@ logger = logging.getLogger(__name__)
 # Global services
 keycloak_service = None
 cedar_engine = None
-
-# Simple in-memory database for MVP
-documents_db = []
-document_id_counter = 1
+policy_subscriber = None
 
 
 @asynccontextmanager
@@ -39,9 +40,33 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Business API...")
     
     # Initialize services
-    global keycloak_service, cedar_engine
+    global keycloak_service, cedar_engine, policy_subscriber
     keycloak_service = None  # Will be implemented later
-    cedar_engine = None  # Will be implemented later
+    from services.cedar_engine import CedarEngine
+    cedar_engine = CedarEngine()
+    app.state.cedar_engine = cedar_engine
+
+    # Keep the engine in sync with the Policy API policy feed
+    if os.getenv("POLICY_SUBSCRIPTION_ENABLED", "false").lower() == "true":
+        from services.policy_subscription import PolicySubscriber
+        policy_subscriber = PolicySubscriber(cedar_engine)
+        policy_subscriber.start()
+        logger.info("Policy subscription started")
+
+    # Share metrics between workers (METRICS_MULTIPROC_DIR)
+    from services.metrics import REGISTRY
+    REGISTRY.start()
+
+    # Write authorization decisions behind to segment files
+    from services.decision_log import DECISION_LOG_ENABLED, start_decision_log
+    if DECISION_LOG_ENABLED:
+        start_decision_log()
+        logger.info("Decision log started")
+
+    # Ship per-minute decision counts to the Policy API analytics rollups
+    if DECISION_ROLLUP_ENABLED:
+        get_decision_rollup().start()
+        logger.info("Decision rollup started")
     
     logger.info("Services initialized successfully")
     
@@ -49,6 +74,19 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Business API...")
+    if policy_subscriber:
+        await policy_subscriber.stop()
+    if rate_limiter:
+        await rate_limiter.backend.close()
+    from services.document_store import close_document_repository
+    close_document_repository()
+    from services.decision_log import stop_decision_log
+    await stop_decision_log()
+    from services.decision_rollup import stop_decision_rollup
+    await stop_decision_rollup()
+
+    from services.metrics import REGISTRY
+    await REGISTRY.stop()
 
 
 # Create FastAPI app
@@ -59,7 +97,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# CORS middleware
+# Rate limiting per API key, user or client IP
+rate_limiter = None
+if os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true":
+    from services.rate_limit import RateLimiter, RateLimitMiddleware, create_rate_limit_backend_from_env
+    from services.request_limits import resolve_buckets
+    rate_limiter = RateLimiter(create_rate_limit_backend_from_env())
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, resolve_buckets=resolve_buckets)
+
+# CORS middleware (added last so it also covers 429 responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -71,40 +117,149 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics (outermost, so limited and failed requests are counted too)
+from services.metrics import REGISTRY, MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
+# Server spans continuing incoming W3C trace context (TRACING_ENABLED)
+from services.tracing import TracingMiddleware
+app.add_middleware(TracingMiddleware)
+
 # Include routers - import directly to avoid package import issues
 from routers.auth import router as auth_router
 from routers.documents import router as documents_router
+from routers.authorization import router as authorization_router
+from routers.profiling import router as profiling_router
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(documents_router, prefix="/api/v1")
+app.include_router(authorization_router, prefix="/api/v1")
+app.include_router(profiling_router, prefix="/api/v1")
 
 
 # Health endpoints
-@app.get("/health/")
-async def health_check():
-    """Basic health check"""
+from services.decision_log import DECISION_LOG_ENABLED, get_decision_log
+from services.decision_rollup import DECISION_ROLLUP_ENABLED, get_decision_rollup
+from services.health import HEALTH_CHECK_TIMEOUT, HealthCheck, HealthProbe
+
+health_probe: Optional[HealthProbe] = None
+
+
+async def check_documents() -> Optional[str]:
+    from services.document_store import get_document_repository
+    await asyncio.to_thread(get_document_repository().ping)
+    return None
+
+
+async def check_policies() -> Optional[str]:
+    # Serving with an empty engine would deny everything
+    if cedar_engine is None or cedar_engine.version is None:
+        raise RuntimeError("no policy set loaded yet")
+    return f"version {cedar_engine.version}"
+
+
+async def check_policy_api() -> Optional[str]:
+    response = await policy_subscriber.client.get("/health/live", timeout=HEALTH_CHECK_TIMEOUT)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return None
+
+
+def get_health_probe() -> HealthProbe:
+    """Probe built on first use, after startup knows whether policies come from the Policy API"""
+    global health_probe
+    if health_probe is None:
+        checks = [HealthCheck("documents", check_documents)]
+        if policy_subscriber:
+            checks.append(HealthCheck("policies", check_policies))
+            # The engine keeps serving its last policy set while the Policy API is away
+            checks.append(HealthCheck("policy_api", check_policy_api, critical=False))
+        health_probe = HealthProbe(checks)
+    return health_probe
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is serving requests (no dependency checks)"""
     return {
-        "status": "healthy",
-        "timestamp": "2025-01-11T00:00:00Z",
-        "services": {
-            "keycloak": "not_initialized",
-            "cedar_engine": "not_initialized"
-        }
+        "status": "alive",
+        "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
 
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 while a critical dependency is down"""
+    result = await get_health_probe().readiness()
+    return JSONResponse(status_code=200 if result["ready"] else 503, content=result)
+
+
+@app.get("/health/")
+async def health_check():
+    """Basic health check (same result as the readiness probe)"""
+    return await readiness()
+
+
 @app.get("/health/detailed")
 async def detailed_health_check():
     """Detailed health check including external services"""
+    probe = await get_health_probe().readiness()
     return {
-        "status": "healthy",
-        "timestamp": "2025-01-11T00:00:00Z",
+        "status": probe["status"],
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "checks": probe["checks"],
         "services": {
             "keycloak": "not_initialized",
-            "cedar_engine": "not_initialized"
-        }
+            "cedar_engine": {
+                "policies": cedar_engine.get_policy_count(),
+                "version": cedar_engine.version
+            } if cedar_engine else "not_initialized",
+            "policy_subscription": policy_subscriber.status() if policy_subscriber else "disabled",
+            "decision_log": get_decision_log().status() if DECISION_LOG_ENABLED else "disabled",
+            "decision_rollup": get_decision_rollup().status() if DECISION_ROLLUP_ENABLED else "disabled"
+        },
+        "rate_limit": rate_limiter.stats if rate_limiter else "disabled"
     }
 
 
+def collect_service_metrics():
+    """Engine, subscription, decision log/rollup and rate limit state sampled at scrape time"""
+    samples = []
+    if cedar_engine:
+        samples.append(("cedar_engine_policies", "gauge", "Policies loaded in the engine", {}, cedar_engine.get_policy_count()))
+        if cedar_engine.version is not None:
+            samples.append(("cedar_engine_policy_version", "gauge", "Policy set version loaded in the engine", {}, cedar_engine.version))
+    if policy_subscriber:
+        for name, value in policy_subscriber.stats.items():
+            samples.append((f"policy_subscription_{name}_total", "counter", f"Policy subscription {name.replace('_', ' ')}", {}, value))
+    if DECISION_LOG_ENABLED:
+        decision_log = get_decision_log()
+        for stage in ("allows", "denies", "sampled_out", "dropped", "written"):
+            samples.append(("decision_log_records_total", "counter", "Decision log records by stage", {"stage": stage}, decision_log.stats[stage]))
+        samples.append(("decision_log_flush_failures_total", "counter", "Decision log writes that failed", {}, decision_log.stats["flush_failures"]))
+        samples.append(("decision_log_queue_depth", "gauge", "Decisions waiting to be written", {}, decision_log.queued))
+        if decision_log.writer:
+            samples.append(("decision_log_bytes_total", "counter", "Bytes written to decision log segments", {}, decision_log.writer.stats["bytes"]))
+    if DECISION_ROLLUP_ENABLED:
+        decision_rollup = get_decision_rollup()
+        samples.append(("decision_rollup_buckets_sent_total", "counter", "Decision rollup buckets sent to the Policy API", {}, decision_rollup.stats["buckets_sent"]))
+        samples.append(("decision_rollup_buckets_dropped_total", "counter", "Decision rollup buckets dropped while unsent or rejected", {}, decision_rollup.stats["buckets_dropped"]))
+        samples.append(("decision_rollup_batches_rejected_total", "counter", "Decision rollup batches rejected by the Policy API", {}, decision_rollup.stats["batches_rejected"]))
+        samples.append(("decision_rollup_flush_failures_total", "counter", "Decision rollup sends that failed", {}, decision_rollup.stats["flush_failures"]))
+    if rate_limiter:
+        for decision, value in rate_limiter.stats.items():
+            samples.append(("rate_limit_decisions_total", "counter", "Rate limit decisions", {"decision": decision}, value))
+    return samples
+
+
+REGISTRY.register_collector(collect_service_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Metrics in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -2,6 +2,6 @@
 Routers package for Business API
 """
 
-from . import auth, documents
+from . import auth, authorization, documents
 
-__all__ = ["auth", "documents"]
\ No newline at end of file
+__all__ = ["auth", "authorization", "documents"]
\ No newline at end of file
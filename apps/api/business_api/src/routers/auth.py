@@ -11,6 +11,8 @@ from typing import Optional
 from jose import jwt, JWTError
 from pydantic import BaseModel, EmailStr, Field
 
+from services.tracing import tracer
+
 # Mock users database (same as in jwt.py)
 MOCK_USERS = {
     "admin@sentinela.com": {
@@ -113,12 +115,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Optional[dict]:
     """Extract and validate JWT token from Authorization header"""
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        with tracer.start_span("jwt.decode"):
+            payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         email = payload.get("sub")
         if email is None:
             return None
         
-        user = MOCK_USERS.get(email)
+        with tracer.start_span("auth.user_lookup"):
+            user = MOCK_USERS.get(email)
         if user is None:
             return None
             
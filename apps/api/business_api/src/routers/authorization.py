@@ -0,0 +1,104 @@
+"""
+Authorization API Router for Business API
+Evaluates requests against the policies loaded in the local engine
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+import time
+
+from routers.auth import get_current_user
+from services.cedar_engine import AuthorizationRequest, CedarEngine
+
+MAX_BATCH_SIZE = 100
+
+
+# Schemas
+class AuthorizeRequest(BaseModel):
+    principal: str = Field(..., description='Entity making the request, e.g. User::"alice"')
+    action: str = Field(..., description='Action being performed, e.g. Action::"read"')
+    resource: str = Field(..., description='Resource being accessed, e.g. Document::"123"')
+    context: Dict[str, Any] = Field(default_factory=dict)
+
+class AuthorizeResponse(BaseModel):
+    allow: bool
+    principal: str
+    action: str
+    resource: str
+    reason: Optional[str] = None
+    evaluation_time_ms: float
+
+class BatchAuthorizeRequest(BaseModel):
+    requests: List[AuthorizeRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class BatchAuthorizeResponse(BaseModel):
+    results: List[AuthorizeResponse]
+    total_evaluated: int
+
+router = APIRouter(
+    prefix="/authorize",
+    tags=["Authorization"]
+)
+
+
+def get_cedar_engine(request: Request) -> CedarEngine:
+    """Engine created in the application lifespan"""
+    engine = getattr(request.app.state, "cedar_engine", None)
+    if engine is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authorization engine not initialized"
+        )
+    return engine
+
+
+def _require_user(current_user: Optional[dict]) -> None:
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+
+
+def _evaluate(engine: CedarEngine, body: AuthorizeRequest) -> AuthorizeResponse:
+    start = time.perf_counter()
+    result = engine.evaluate(AuthorizationRequest(
+        principal=body.principal,
+        action=body.action,
+        resource=body.resource,
+        context=body.context
+    ))
+    return AuthorizeResponse(
+        allow=result.allow,
+        principal=body.principal,
+        action=body.action,
+        resource=body.resource,
+        reason=result.reason,
+        evaluation_time_ms=round((time.perf_counter() - start) * 1000, 3)
+    )
+
+
+@router.post("", response_model=AuthorizeResponse)
+# Same route with the trailing slash, answered directly instead of with a redirect
+@router.post("/", response_model=AuthorizeResponse, include_in_schema=False)
+async def authorize(
+    body: AuthorizeRequest,
+    engine: CedarEngine = Depends(get_cedar_engine),
+    current_user: Optional[dict] = Depends(get_current_user)
+):
+    """Evaluate one authorization request against the loaded policies"""
+    _require_user(current_user)
+    return _evaluate(engine, body)
+
+
+@router.post("/batch", response_model=BatchAuthorizeResponse)
+async def authorize_batch(
+    body: BatchAuthorizeRequest,
+    engine: CedarEngine = Depends(get_cedar_engine),
+    current_user: Optional[dict] = Depends(get_current_user)
+):
+    """Evaluate up to MAX_BATCH_SIZE authorization requests in one call"""
+    _require_user(current_user)
+    results = [_evaluate(engine, item) for item in body.requests]
+    return BatchAuthorizeResponse(results=results, total_evaluated=len(results))
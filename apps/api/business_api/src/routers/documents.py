@@ -3,14 +3,19 @@ Documents API Router for Business API
 Provides endpoints for document management
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from typing import Any, Dict, Iterator, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import base64
+import binascii
+import json
 
-# Mock documents database
-documents_db = []
-document_id_counter = 1
+from services.document_store import DOCUMENT_FIELDS, DocumentRepository, get_document_repository
+
+# Listed when no projection is requested; bodies are only sent when asked for
+SUMMARY_FIELDS = tuple(field for field in DOCUMENT_FIELDS if field != "content")
 
 # Schemas
 class DocumentBase(BaseModel):
@@ -28,26 +33,97 @@ class DocumentResponse(DocumentBase):
     updated_at: datetime
 
 class DocumentListResponse(BaseModel):
-    documents: List[DocumentResponse]
+    documents: List[Dict[str, Any]]
     total: int
+    next_cursor: Optional[str] = None
 
 router = APIRouter(
     prefix="/documents",
     tags=["Documents"]
 )
 
-@router.get("/", response_model=DocumentListResponse)
-async def list_documents():
-    """List all documents"""
-    return DocumentListResponse(
-        documents=documents_db,
-        total=len(documents_db)
+def _encode_cursor(document_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{document_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        prefix, _, value = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().partition(":")
+        if prefix != "id":
+            raise ValueError(cursor)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _parse_fields(fields: Optional[str]) -> tuple:
+    if not fields:
+        return SUMMARY_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in DOCUMENT_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(DOCUMENT_FIELDS)}"
+        )
+    return requested
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _list_chunks(documents: List[Dict[str, Any]], total: int, next_cursor: Optional[str]) -> Iterator[bytes]:
+    """The list response as JSON, one document per chunk"""
+    yield b'{"documents":['
+    for index, document in enumerate(documents):
+        yield (b"," if index else b"") + json.dumps(document, default=_json_default).encode()
+    yield f'],"total":{total},"next_cursor":{json.dumps(next_cursor)}}}'.encode()
+
+
+@router.get("/", responses={200: {"model": DocumentListResponse}})
+def list_documents(
+    category: Optional[str] = Query(None, description="Only documents in this category"),
+    owner: Optional[str] = Query(None, description="Only documents of this owner"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of documents to return"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title (default: all but content)"),
+    repository: DocumentRepository = Depends(get_document_repository)
+):
+    """
+    List documents in id order, a page at a time
+
+    Filters are served from the owner/category indexes and only the
+    projected fields are read. Without ``fields`` the body (``content``) is
+    left out; pages that include it are streamed document by document.
+    """
+    projection = _parse_fields(fields)
+    after_id = _decode_cursor(cursor) if cursor else 0
+
+    # Read the id as well to build the cursor, and one extra row to know if there is a next page
+    read_fields = projection if "id" in projection else ("id",) + projection
+    documents = repository.list(
+        owner=owner, category=category, after_id=after_id, limit=limit + 1, fields=read_fields
     )
+    next_cursor = _encode_cursor(documents[limit - 1]["id"]) if len(documents) > limit else None
+    documents = documents[:limit]
+    if read_fields is not projection:
+        documents = [{field: document[field] for field in projection} for document in documents]
+
+    chunks = _list_chunks(documents, repository.count(owner=owner, category=category), next_cursor)
+    if "content" in projection:
+        return StreamingResponse(chunks, media_type="application/json")
+    return Response(b"".join(chunks), media_type="application/json")
 
 @router.get("/{document_id}", response_model=DocumentResponse)
-async def get_document(document_id: int):
+def get_document(document_id: int, repository: DocumentRepository = Depends(get_document_repository)):
     """Get a specific document"""
-    document = next((doc for doc in documents_db if doc["id"] == document_id), None)
+    document = repository.get(document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -56,54 +132,33 @@ async def get_document(document_id: int):
     return document
 
 @router.post("/", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
-async def create_document(document: DocumentCreate):
+def create_document(document: DocumentCreate, repository: DocumentRepository = Depends(get_document_repository)):
     """Create a new document"""
-    global document_id_counter
-    
-    new_document = {
-        "id": document_id_counter,
-        "title": document.title,
-        "content": document.content,
-        "category": document.category,
-        "owner": "current_user",  # Would get from auth context
-        "created_at": datetime.now(),
-        "updated_at": datetime.now()
-    }
-    
-    documents_db.append(new_document)
-    document_id_counter += 1
-    
-    return new_document
+    return repository.create(
+        document.model_dump(),
+        owner="current_user"  # Would get from auth context
+    )
 
 @router.put("/{document_id}", response_model=DocumentResponse)
-async def update_document(document_id: int, document: DocumentCreate):
+def update_document(
+    document_id: int,
+    document: DocumentCreate,
+    repository: DocumentRepository = Depends(get_document_repository)
+):
     """Update a document"""
-    doc_index = next((i for i, doc in enumerate(documents_db) if doc["id"] == document_id), None)
-    if doc_index is None:
+    updated_document = repository.update(document_id, document.model_dump())
+    if updated_document is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
-    
-    updated_document = {
-        **documents_db[doc_index],
-        "title": document.title,
-        "content": document.content,
-        "category": document.category,
-        "updated_at": datetime.now()
-    }
-    
-    documents_db[doc_index] = updated_document
     return updated_document
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_document(document_id: int):
+def delete_document(document_id: int, repository: DocumentRepository = Depends(get_document_repository)):
     """Delete a document"""
-    doc_index = next((i for i, doc in enumerate(documents_db) if doc["id"] == document_id), None)
-    if doc_index is None:
+    if not repository.delete(document_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found"
         )
-    
-    documents_db.pop(doc_index)
\ No newline at end of file
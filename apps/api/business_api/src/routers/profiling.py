@@ -0,0 +1,94 @@
+"""
+Profiling API Router for Business API
+On-demand CPU profiles and allocation snapshots of this worker (admin only)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+import logging
+import os
+
+from routers.auth import get_current_user
+from services.profiling import (
+    PROFILE_DEFAULT_INTERVAL, PROFILE_MAX_SECONDS, ProfilerBusyError, allocation_snapshot, profile_cpu
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["Debug"]
+)
+
+
+def _require_admin(current_user: Optional[dict]) -> dict:
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not current_user["is_superuser"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can profile the service"
+        )
+    return current_user
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A profiling session is already running in this worker"
+    )
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(PROFILE_DEFAULT_INTERVAL * 1000, ge=1, le=1000),
+    include_idle: bool = Query(False, description="Keep samples of threads that are only waiting"),
+    current_user: Optional[dict] = Depends(get_current_user)
+):
+    """
+    Sample the stacks of every thread of the worker serving this request
+
+    Returns collapsed stacks (``frame;frame;... count``) ready for
+    flamegraph.pl, speedscope or inferno. Only this worker is profiled.
+    """
+    user = _require_admin(current_user)
+
+    logger.info(f"CPU profile of worker {os.getpid()} for {seconds}s requested by {user['email']}")
+    try:
+        profiler = await profile_cpu(seconds, interval=interval_ms / 1000, include_idle=include_idle)
+    except ProfilerBusyError:
+        raise _busy()
+
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "X-Profile-Pid": str(os.getpid()),
+            "X-Profile-Samples": str(profiler.samples),
+            "X-Profile-Duration": f"{profiler.elapsed:.3f}"
+        }
+    )
+
+
+@router.get("/allocations")
+async def allocations(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    group_by: str = Query("lineno", pattern="^(lineno|filename)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: Optional[dict] = Depends(get_current_user)
+):
+    """Largest allocations still alive after tracing this worker with tracemalloc for ``seconds``"""
+    user = _require_admin(current_user)
+
+    logger.info(f"Allocation snapshot of worker {os.getpid()} for {seconds}s requested by {user['email']}")
+    try:
+        result = await allocation_snapshot(seconds, group_by=group_by, limit=limit)
+    except ProfilerBusyError:
+        raise _busy()
+
+    return {"pid": os.getpid(), **result}
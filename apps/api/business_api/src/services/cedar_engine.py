@@ -0,0 +1,257 @@
+"""
+Cedar Policy Engine for authorization evaluation
+"""
+
+import logging
+import time
+from typing import Dict, Any, Hashable, Iterable, List, Optional
+from dataclasses import dataclass
+import re
+
+from services.decision_log import log_decision
+from services.decision_rollup import count_decision
+from services.metrics import REGISTRY
+from services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+AUTHORIZATION_DECISIONS = REGISTRY.counter("authorization_decisions_total", "Authorization decisions by outcome")
+AUTHORIZATION_DURATION = REGISTRY.histogram(
+    "authorization_duration_seconds", "Authorization evaluation latency",
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+
+@dataclass
+class AuthorizationRequest:
+    """Authorization request for Cedar evaluation"""
+    principal: str  # e.g., 'User::"alice-id"'
+    action: str      # e.g., 'Action::"read"'
+    resource: str    # e.g., 'Document::"123"'
+    context: Dict[str, Any]  # Additional context like groups
+
+
+@dataclass
+class AuthorizationResponse:
+    """Authorization response from Cedar evaluation"""
+    allow: bool
+    reason: Optional[str] = None
+
+
+class CedarEngine:
+    """
+    Mock Cedar policy engine for MVP
+
+    Policies are keyed by id so a policy subscription can apply deltas
+    without recompiling the whole set. Updates swap in a new compiled list,
+    so evaluations in flight keep a consistent view.
+    """
+    
+    def __init__(self):
+        self.policies: Dict[Hashable, str] = {}
+        self.compiled_policies: List[Dict[str, Any]] = []
+        self._compiled: Dict[Hashable, Dict[str, Any]] = {}
+        # Version of the policy set the engine reflects (None until loaded)
+        self.version: Optional[int] = None
+    
+    def load_policies(self, policies: List[str]):
+        """Load Cedar policies"""
+        self.replace_policies({index: policy for index, policy in enumerate(policies, 1)})
+    
+    def replace_policies(self, policies: Dict[Hashable, str], version: Optional[int] = None):
+        """Replace the whole policy set"""
+        self.policies = {}
+        self._compiled = {}
+        for policy_id, policy in policies.items():
+            self._compile(policy_id, policy)
+        self._publish(version)
+        logger.info(f"Loaded {len(self.compiled_policies)} policies")
+    
+    def upsert_policy(self, policy_id: Hashable, policy: str, version: Optional[int] = None):
+        """Add or replace a single policy"""
+        self._compiled.pop(policy_id, None)
+        self._compile(policy_id, policy)
+        self._publish(version)
+    
+    def remove_policy(self, policy_id: Hashable, version: Optional[int] = None):
+        """Remove a single policy (no-op when unknown)"""
+        self.policies.pop(policy_id, None)
+        self._compiled.pop(policy_id, None)
+        self._publish(version)
+    
+    def apply_changes(
+        self,
+        upserts: Dict[Hashable, str],
+        removals: Iterable[Hashable] = (),
+        version: Optional[int] = None
+    ):
+        """Apply several upserts and removals, publishing the result once"""
+        for policy_id in removals:
+            self.policies.pop(policy_id, None)
+            self._compiled.pop(policy_id, None)
+        for policy_id, policy in upserts.items():
+            self._compiled.pop(policy_id, None)
+            self._compile(policy_id, policy)
+        self._publish(version)
+    
+    def _compile(self, policy_id: Hashable, policy: str):
+        self.policies[policy_id] = policy
+        
+        # Parse and compile policies (mock implementation)
+        try:
+            compiled = self._parse_policy(policy, name=f"policy_{policy_id}")
+            if compiled:
+                self._compiled[policy_id] = compiled
+                logger.debug("Loaded policy: %s", compiled.get('name', 'unnamed'))
+        except Exception as e:
+            logger.error(f"Failed to parse policy: {e}")
+    
+    def _publish(self, version: Optional[int]):
+        self.compiled_policies = list(self._compiled.values())
+        if version is not None:
+            self.version = version
+    
+    def _parse_policy(self, policy_text: str, name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Parse a Cedar policy (mock implementation)"""
+        try:
+            # Simple regex-based parsing for MVP
+            # Look for permit(...) statements
+            permit_match = re.search(r'permit\s*\([^)]*\)', policy_text, re.IGNORECASE)
+            
+            if permit_match:
+                permit_statement = permit_match.group(0)
+                
+                # Extract conditions (mock)
+                conditions = []
+                
+                # Check for principal condition
+                if 'principal' in permit_statement:
+                    conditions.append({'type': 'principal', 'operator': 'any'})
+                
+                # Check for action condition
+                action_match = re.search(r'action\s*==\s*Action::"([^"]+)"', permit_statement)
+                if action_match:
+                    conditions.append({
+                        'type': 'action',
+                        'operator': 'equals',
+                        'value': action_match.group(1)
+                    })
+                
+                # Check for resource type condition
+                resource_match = re.search(r'resource_type\s*==\s*"([^"]+)"', permit_statement)
+                if resource_match:
+                    conditions.append({
+                        'type': 'resource_type',
+                        'operator': 'equals',
+                        'value': resource_match.group(1)
+                    })
+                
+                return {
+                    'name': name or f'policy_{len(self.compiled_policies) + 1}',
+                    'type': 'permit',
+                    'conditions': conditions,
+                    'raw': policy_text
+                }
+        
+        except Exception as e:
+            logger.error(f"Policy parsing error: {e}")
+        
+        return None
+    
+    def evaluate(self, request: AuthorizationRequest) -> AuthorizationResponse:
+        """Evaluate authorization request against loaded policies"""
+        start = time.perf_counter()
+        with tracer.start_span("authz.evaluate", attributes={"authz.action": request.action}) as span:
+            response = self._evaluate(request)
+            span.set_attribute("authz.decision", "allow" if response.allow else "deny")
+            span.set_attribute("authz.policies", len(self.compiled_policies))
+        elapsed = time.perf_counter() - start
+        AUTHORIZATION_DURATION.observe(elapsed)
+        AUTHORIZATION_DECISIONS.inc(decision="allow" if response.allow else "deny")
+        log_decision(request.principal, request.action, request.resource, response.allow, response.reason, elapsed)
+        count_decision(request.action, request.resource, response.allow)
+        return response
+
+    def _evaluate(self, request: AuthorizationRequest) -> AuthorizationResponse:
+        try:
+            logger.debug("Evaluating: %s %s %s", request.principal, request.action, request.resource)
+            
+            # Check each policy
+            for policy in self.compiled_policies:
+                result = self._evaluate_policy(policy, request)
+                if result.allow:
+                    logger.debug("Allowed by policy: %s", policy['name'])
+                    return result
+            
+            # Default deny
+            logger.debug("Denied: no matching policy found")
+            return AuthorizationResponse(allow=False, reason="No matching policy")
+            
+        except Exception as e:
+            logger.error(f"Policy evaluation error: {e}")
+            return AuthorizationResponse(allow=False, reason="Evaluation error")
+    
+    def _evaluate_policy(self, policy: Dict[str, Any], request: AuthorizationRequest) -> AuthorizationResponse:
+        """Evaluate a single policy against the request"""
+        try:
+            # For permit policies, all conditions must be satisfied
+            if policy['type'] == 'permit':
+                for condition in policy['conditions']:
+                    if not self._evaluate_condition(condition, request):
+                        return AuthorizationResponse(
+                            allow=False,
+                            reason=f"Condition failed: {condition['type']}"
+                        )
+                
+                return AuthorizationResponse(allow=True)
+            
+            return AuthorizationResponse(allow=False, reason="Unknown policy type")
+            
+        except Exception as e:
+            logger.error(f"Policy evaluation error: {e}")
+            return AuthorizationResponse(allow=False, reason="Evaluation error")
+    
+    def _evaluate_condition(self, condition: Dict[str, Any], request: AuthorizationRequest) -> bool:
+        """Evaluate a single condition"""
+        try:
+            condition_type = condition['type']
+            operator = condition.get('operator', 'equals')
+            
+            if condition_type == 'principal':
+                # For MVP, allow any principal
+                return True
+            
+            elif condition_type == 'action':
+                if operator == 'equals':
+                    expected_action = f'Action::"{condition["value"]}"'
+                    return request.action == expected_action
+            
+            elif condition_type == 'resource_type':
+                if operator == 'equals':
+                    # Extract resource type from request.resource
+                    # Format: 'Document::"123"' -> 'Document'
+                    resource_parts = request.resource.split('::')
+                    if len(resource_parts) >= 2:
+                        resource_type = resource_parts[0]
+                        return resource_type == condition["value"]
+            
+            return False
+            
+        except Exception as e:
+            logger.error(f"Condition evaluation error: {e}")
+            return False
+    
+    def get_policy_count(self) -> int:
+        """Get number of loaded policies"""
+        return len(self.compiled_policies)
+    
+    def get_policies_info(self) -> List[Dict[str, Any]]:
+        """Get information about loaded policies"""
+        return [
+            {
+                'name': policy['name'],
+                'type': policy['type'],
+                'conditions_count': len(policy['conditions'])
+            }
+            for policy in self.compiled_policies
+        ]
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+Decision Rollup
+Per-minute decision counts pushed to the Policy API analytics rollups
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from services.tracing import inject_httpx_request
+
+logger = logging.getLogger(__name__)
+
+DECISION_ROLLUP_ENABLED = os.getenv("DECISION_ROLLUP_ENABLED", "false").lower() == "true"
+DECISION_ROLLUP_FLUSH_INTERVAL = float(os.getenv("DECISION_ROLLUP_FLUSH_INTERVAL", "10"))
+# Buckets kept while the Policy API is unreachable (oldest batches are dropped beyond this)
+DECISION_ROLLUP_MAX_BUCKETS = int(os.getenv("DECISION_ROLLUP_MAX_BUCKETS", "100000"))
+INGEST_PATH = "/api/v1/analytics/decisions/ingest"
+INGEST_BATCH_SIZE = 5000
+UNKNOWN = "unknown"
+# Width of the Policy API resource_type/action_type columns; longer values are cut to fit
+MAX_TYPE_LENGTH = 100
+# 4xx answers that can succeed later (credentials being fixed, throttling); other 4xx drop the batch
+RETRYABLE_STATUS = {401, 403, 408, 429}
+
+# (minute start as epoch seconds, resource type, action type)
+BucketKey = Tuple[int, str, str]
+
+_ACTION_ID = re.compile(r'::\s*"([^"]*)"')
+
+
+def resource_type_of(resource: str) -> str:
+    """Entity type of a resource uid: 'Document::"123"' -> 'Document'"""
+    entity_type, separator, _ = resource.partition("::")
+    return entity_type.strip()[:MAX_TYPE_LENGTH] if separator and entity_type.strip() else UNKNOWN
+
+
+def action_type_of(action: str) -> str:
+    """Action id of an action uid: 'Action::"read"' -> 'read'"""
+    match = _ACTION_ID.search(action)
+    action_type = match.group(1) if match and match.group(1) else action.strip()
+    return action_type[:MAX_TYPE_LENGTH] or UNKNOWN
+
+
+class DecisionRollup:
+    """
+    Counts decisions per minute, resource type and action type, and ships the counts
+
+    ``record`` bumps a counter in a dict under a short lock, so every
+    decision is counted (decision log sampling does not apply). Every
+    ``flush_interval`` seconds the dict is swapped out and posted to the
+    Policy API, which folds the minute counts into its minute, hour and day
+    rollups. Batches that could not be sent are retried in order with the
+    same id, so the Policy API can ignore a batch it already applied; past
+    ``max_buckets`` unsent buckets the oldest batches are dropped. A batch
+    the Policy API rejects as invalid (a 4xx other than RETRYABLE_STATUS)
+    would fail the same way every time, so it is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        base_url: str = os.getenv("POLICY_API_URL", "http://localhost:8000"),
+        token: Optional[str] = os.getenv("POLICY_FEED_TOKEN"),
+        api_key: Optional[str] = os.getenv("POLICY_FEED_API_KEY"),
+        application_id: Optional[int] = int(os.environ["POLICY_APPLICATION_ID"]) if os.getenv("POLICY_APPLICATION_ID") else None,
+        flush_interval: float = DECISION_ROLLUP_FLUSH_INTERVAL,
+        max_buckets: int = DECISION_ROLLUP_MAX_BUCKETS,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.application_id = application_id
+        self.flush_interval = flush_interval
+        self.max_buckets = max_buckets
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        if api_key:
+            headers["X-API-Key"] = api_key
+        self.client = client or httpx.AsyncClient(
+            base_url=base_url.rstrip('/'),
+            headers=headers,
+            event_hooks={"request": [inject_httpx_request]}
+        )
+        # [allows, denies] per bucket
+        self._pending: Dict[BucketKey, List[int]] = {}
+        # (batch id, buckets) taken from _pending but not acknowledged yet, oldest first
+        self._unsent: List[Tuple[str, List[Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_flush_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.stats = {"recorded": 0, "buckets_sent": 0, "batches": 0, "buckets_dropped": 0, "batches_rejected": 0, "flush_failures": 0}
+
+    def record(self, action: str, resource: str, allow: bool, at: Optional[float] = None) -> None:
+        """Count one decision"""
+        key = (int(at if at is not None else time.time()) // 60 * 60, resource_type_of(resource), action_type_of(action))
+        with self._lock:
+            counts = self._pending.get(key)
+            if counts is None:
+                counts = self._pending[key] = [0, 0]
+            counts[0 if allow else 1] += 1
+            self.stats["recorded"] += 1
+
+    def _take(self) -> Dict[BucketKey, List[int]]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    async def _post(self, batch_id: str, buckets: List[Dict[str, Any]]) -> None:
+        response = await self.client.post(
+            INGEST_PATH,
+            json={"batch_id": batch_id, "application_id": self.application_id, "buckets": buckets},
+            timeout=30.0
+        )
+        response.raise_for_status()
+
+    def _seal(self) -> None:
+        """Turn the pending counts into batches with their final ids"""
+        items = sorted(self._take().items())
+        for start in range(0, len(items), INGEST_BATCH_SIZE):
+            self._unsent.append((str(uuid.uuid4()), [
+                {
+                    "minute": datetime.utcfromtimestamp(minute).isoformat() + "Z",
+                    "resource_type": resource_type,
+                    "action_type": action_type,
+                    "allow": allows,
+                    "deny": denies
+                }
+                for (minute, resource_type, action_type), (allows, denies) in items[start:start + INGEST_BATCH_SIZE]
+            ]))
+        while sum(len(buckets) for _, buckets in self._unsent) > self.max_buckets:
+            _, dropped = self._unsent.pop(0)
+            self.stats["buckets_dropped"] += len(dropped)
+
+    async def flush(self) -> int:
+        """Send the counts gathered so far; returns the number of buckets sent"""
+        async with self._flush_lock:
+            self._seal()
+            sent = 0
+            while self._unsent:
+                batch_id, buckets = self._unsent[0]
+                try:
+                    await self._post(batch_id, buckets)
+                except Exception as e:
+                    code = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                    if code is not None and 400 <= code < 500 and code not in RETRYABLE_STATUS:
+                        # Retrying cannot help and would hold back every later batch
+                        self._unsent.pop(0)
+                        self.stats["batches_rejected"] += 1
+                        self.stats["buckets_dropped"] += len(buckets)
+                        self.last_error = f"batch {batch_id} rejected: {code} {e.response.text[:200]}"
+                        logger.error(f"Decision rollup batch {batch_id} rejected with {code}, dropping {len(buckets)} buckets")
+                        continue
+                    # Retried with the same id, so the Policy API can tell a repeat from new counts
+                    self.stats["flush_failures"] += 1
+                    self.last_error = str(e)
+                    logger.warning(f"Decision rollup flush failed ({len(self._unsent)} batches kept): {e}")
+                    raise
+                self._unsent.pop(0)
+                sent += len(buckets)
+                self.stats["buckets_sent"] += len(buckets)
+                self.stats["batches"] += 1
+            if sent:
+                self.last_flush_at = datetime.utcnow()
+                self.last_error = None
+            return sent
+
+    async def run_forever(self) -> None:
+        """Flush every ``flush_interval`` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Already logged; unsent batches are retried on the next round
+                pass
+
+    def start(self) -> None:
+        """Start the background flusher"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        """Stop the flusher, send what is left and close the HTTP client"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+        await self.client.aclose()
+
+    def status(self) -> Dict[str, Any]:
+        """Current state of the flusher"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "application_id": self.application_id,
+            "pending_buckets": len(self._pending),
+            "unsent_batches": len(self._unsent),
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+            "last_error": self.last_error,
+            **self.stats,
+        }
+
+
+_decision_rollup: Optional[DecisionRollup] = None
+
+
+def get_decision_rollup() -> DecisionRollup:
+    """Get the process-wide decision rollup"""
+    global _decision_rollup
+    if _decision_rollup is None:
+        _decision_rollup = DecisionRollup()
+    return _decision_rollup
+
+
+async def stop_decision_rollup() -> None:
+    """Stop the process-wide decision rollup, sending pending counts"""
+    if _decision_rollup is not None:
+        await _decision_rollup.stop()
+
+
+def count_decision(action: str, resource: str, allow: bool) -> None:
+    """Count an authorization decision when DECISION_ROLLUP_ENABLED"""
+    if DECISION_ROLLUP_ENABLED:
+        get_decision_rollup().record(action, resource, allow)
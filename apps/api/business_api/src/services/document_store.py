@@ -0,0 +1,360 @@
+"""
+Document Store
+Repository for Business API documents, in memory (single worker) or SQL-backed
+"""
+
+import bisect
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, MetaData, String, Table, Text, create_engine, delete, func, insert, select, update
+)
+
+from services.metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+Document = Dict[str, Any]
+
+# Fields a client may set; id, owner and timestamps are managed by the store
+EDITABLE_FIELDS = ("title", "content", "category")
+DOCUMENT_FIELDS = ("id", "title", "content", "category", "owner", "created_at", "updated_at")
+
+
+def project(document: Document, fields: Optional[Sequence[str]]) -> Document:
+    """Only the requested fields of a document (all of them when ``fields`` is None)"""
+    if fields is None:
+        return document
+    return {field: document[field] for field in fields}
+
+
+class DocumentRepository(ABC):
+    """Storage for documents; every method returns plain dicts"""
+
+    @abstractmethod
+    def get(self, document_id: int) -> Optional[Document]:
+        """Document by id, or None"""
+
+    @abstractmethod
+    def list(
+        self,
+        owner: Optional[str] = None,
+        category: Optional[str] = None,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Document]:
+        """
+        Documents in id order, optionally filtered by owner and/or category
+
+        Only documents with an id greater than ``after_id`` are returned, at
+        most ``limit`` of them, with only ``fields`` when given.
+        """
+
+    @abstractmethod
+    def create(self, data: Dict[str, Any], owner: str) -> Document:
+        """Store a new document and return it with its id"""
+
+    @abstractmethod
+    def update(self, document_id: int, data: Dict[str, Any]) -> Optional[Document]:
+        """Replace the editable fields of a document; None when it does not exist"""
+
+    @abstractmethod
+    def delete(self, document_id: int) -> bool:
+        """Remove a document; False when it does not exist"""
+
+    @abstractmethod
+    def count(self, owner: Optional[str] = None, category: Optional[str] = None) -> int:
+        """Number of stored documents matching the filters"""
+
+    def ping(self) -> None:
+        """Raise when the storage is unreachable"""
+
+    def close(self) -> None:
+        """Release storage resources"""
+
+
+class InMemoryDocumentRepository(DocumentRepository):
+    """
+    Documents in a dict keyed by id, with secondary indexes on owner and category
+
+    Every index (including the primary one) keeps its ids sorted, so a page
+    after a cursor is found by bisection rather than by scanning. Ids are
+    assigned in increasing order, so indexing a new document is an append.
+    Data lives in this process only; use the SQL repository when running
+    several workers. Routes run in the threadpool, so every public method
+    holds a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._documents: Dict[int, Document] = {}
+        self._ids: List[int] = []
+        self._by_owner: Dict[str, List[int]] = {}
+        self._by_category: Dict[str, List[int]] = {}
+        self._next_id = 1
+
+    @staticmethod
+    def _insert(ids: List[int], document_id: int) -> None:
+        if not ids or ids[-1] < document_id:
+            ids.append(document_id)
+        else:
+            bisect.insort(ids, document_id)
+
+    @staticmethod
+    def _remove(index: Dict[str, List[int]], value: str, document_id: int) -> None:
+        ids = index.get(value)
+        if ids is None:
+            return
+        position = bisect.bisect_left(ids, document_id)
+        if position < len(ids) and ids[position] == document_id:
+            del ids[position]
+        if not ids:
+            del index[value]
+
+    def _index(self, document: Document) -> None:
+        self._insert(self._by_owner.setdefault(document["owner"], []), document["id"])
+        self._insert(self._by_category.setdefault(document["category"], []), document["id"])
+
+    def _unindex(self, document: Document) -> None:
+        self._remove(self._by_owner, document["owner"], document["id"])
+        self._remove(self._by_category, document["category"], document["id"])
+
+    def _candidates(self, owner: Optional[str], category: Optional[str]) -> List[int]:
+        """Smallest sorted id list covering the filters"""
+        if owner is None and category is None:
+            return self._ids
+        lists = []
+        if owner is not None:
+            lists.append(self._by_owner.get(owner, []))
+        if category is not None:
+            lists.append(self._by_category.get(category, []))
+        return min(lists, key=len)
+
+    def get(self, document_id: int) -> Optional[Document]:
+        with self._lock:
+            return self._documents.get(document_id)
+
+    def list(
+        self,
+        owner: Optional[str] = None,
+        category: Optional[str] = None,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Document]:
+        with self._lock:
+            ids = self._candidates(owner, category)
+            documents = []
+            for position in range(bisect.bisect_right(ids, after_id), len(ids)):
+                document = self._documents[ids[position]]
+                # The other filter, when both are set, is checked on the document
+                if (owner is not None and document["owner"] != owner) or \
+                        (category is not None and document["category"] != category):
+                    continue
+                documents.append(project(document, fields))
+                if limit is not None and len(documents) >= limit:
+                    break
+            return documents
+
+    def create(self, data: Dict[str, Any], owner: str) -> Document:
+        with self._lock:
+            now = datetime.now()
+            document = {
+                "id": self._next_id,
+                **{field: data[field] for field in EDITABLE_FIELDS},
+                "owner": owner,
+                "created_at": now,
+                "updated_at": now
+            }
+            self._next_id += 1
+            self._documents[document["id"]] = document
+            self._ids.append(document["id"])
+            self._index(document)
+            return document
+
+    def update(self, document_id: int, data: Dict[str, Any]) -> Optional[Document]:
+        with self._lock:
+            current = self._documents.get(document_id)
+            if current is None:
+                return None
+
+            document = {
+                **current,
+                **{field: data[field] for field in EDITABLE_FIELDS},
+                "updated_at": datetime.now()
+            }
+            self._unindex(current)
+            self._documents[document_id] = document
+            self._index(document)
+            return document
+
+    def delete(self, document_id: int) -> bool:
+        with self._lock:
+            document = self._documents.pop(document_id, None)
+            if document is None:
+                return False
+            del self._ids[bisect.bisect_left(self._ids, document_id)]
+            self._unindex(document)
+            return True
+
+    def count(self, owner: Optional[str] = None, category: Optional[str] = None) -> int:
+        with self._lock:
+            if owner is not None and category is not None:
+                return len(self.list(owner=owner, category=category, fields=("id",)))
+            return len(self._candidates(owner, category))
+
+
+metadata = MetaData()
+
+documents_table = Table(
+    "documents",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("title", String(255), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("category", String(100), nullable=False),
+    Column("owner", String(255), nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    # Filter plus id so a filtered page after a cursor is one index range scan
+    Index("ix_documents_category_id", "category", "id"),
+    Index("ix_documents_owner_id", "owner", "id"),
+)
+
+
+class SQLDocumentRepository(DocumentRepository):
+    """
+    Documents in a SQL table shared by all workers
+
+    Lookups by id go through the primary key and owner/category filters
+    through (filter, id) indexes. The table is created on first use.
+    """
+
+    def __init__(self, database_url: str):
+        options: Dict[str, Any] = {"pool_pre_ping": True}
+        if database_url.startswith("sqlite"):
+            options["connect_args"] = {"check_same_thread": False}
+        else:
+            options.update(pool_recycle=300, pool_size=10, max_overflow=20)
+        self.engine = create_engine(database_url, **options)
+        instrument_engine(self.engine, name="documents")
+        metadata.create_all(self.engine, tables=[documents_table])
+
+    @staticmethod
+    def _to_dict(row) -> Document:
+        return dict(row._mapping)
+
+    def get(self, document_id: int) -> Optional[Document]:
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                select(documents_table).where(documents_table.c.id == document_id)
+            ).first()
+        return self._to_dict(row) if row else None
+
+    @staticmethod
+    def _filter(query, owner: Optional[str], category: Optional[str]):
+        if owner is not None:
+            query = query.where(documents_table.c.owner == owner)
+        if category is not None:
+            query = query.where(documents_table.c.category == category)
+        return query
+
+    def list(
+        self,
+        owner: Optional[str] = None,
+        category: Optional[str] = None,
+        after_id: int = 0,
+        limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[Document]:
+        # Only the projected columns are read, so bodies stay in the database unless asked for
+        columns = [documents_table.c[field] for field in fields] if fields else [documents_table]
+        query = self._filter(select(*columns), owner, category)
+        query = query.where(documents_table.c.id > after_id).order_by(documents_table.c.id)
+        if limit is not None:
+            query = query.limit(limit)
+        with self.engine.connect() as connection:
+            return [self._to_dict(row) for row in connection.execute(query)]
+
+    def create(self, data: Dict[str, Any], owner: str) -> Document:
+        now = datetime.now()
+        values = {
+            **{field: data[field] for field in EDITABLE_FIELDS},
+            "owner": owner,
+            "created_at": now,
+            "updated_at": now
+        }
+        with self.engine.begin() as connection:
+            result = connection.execute(insert(documents_table).values(**values))
+            document_id = result.inserted_primary_key[0]
+        return {"id": document_id, **values}
+
+    def update(self, document_id: int, data: Dict[str, Any]) -> Optional[Document]:
+        with self.engine.begin() as connection:
+            result = connection.execute(
+                update(documents_table)
+                .where(documents_table.c.id == document_id)
+                .values(**{field: data[field] for field in EDITABLE_FIELDS}, updated_at=datetime.now())
+            )
+            if result.rowcount == 0:
+                return None
+            row = connection.execute(
+                select(documents_table).where(documents_table.c.id == document_id)
+            ).first()
+        return self._to_dict(row)
+
+    def delete(self, document_id: int) -> bool:
+        with self.engine.begin() as connection:
+            result = connection.execute(delete(documents_table).where(documents_table.c.id == document_id))
+        return result.rowcount > 0
+
+    def count(self, owner: Optional[str] = None, category: Optional[str] = None) -> int:
+        query = self._filter(select(func.count()).select_from(documents_table), owner, category)
+        with self.engine.connect() as connection:
+            return connection.execute(query).scalar_one()
+
+    def ping(self) -> None:
+        with self.engine.connect() as connection:
+            connection.execute(select(1))
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+def create_document_repository_from_env() -> DocumentRepository:
+    """Build the repository selected by DOCUMENT_STORE (memory or sql)"""
+    kind = os.getenv("DOCUMENT_STORE", "memory").lower()
+    if kind == "sql":
+        database_url = os.getenv("DOCUMENT_DATABASE_URL", "sqlite:///./documents.db")
+        logger.info("Using SQL document store")
+        return SQLDocumentRepository(database_url)
+    return InMemoryDocumentRepository()
+
+
+_repository: Optional[DocumentRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_document_repository() -> DocumentRepository:
+    """Get the process-wide document repository"""
+    global _repository
+    if _repository is None:
+        # Resolved from threadpool routes: create it once even on concurrent first requests
+        with _repository_lock:
+            if _repository is None:
+                _repository = create_document_repository_from_env()
+    return _repository
+
+
+def close_document_repository() -> None:
+    """Dispose of the process-wide repository"""
+    global _repository
+    if _repository is not None:
+        _repository.close()
+        _repository = None
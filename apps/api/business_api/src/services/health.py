@@ -0,0 +1,104 @@
+"""
+Health Probes
+Concurrent dependency checks with tight timeouts and cached results
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+# Probes arriving within this window share one round of checks
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "5"))
+
+
+@dataclass(frozen=True)
+class HealthCheck:
+    """
+    One dependency check
+
+    ``check`` raises (or times out) when the dependency is unhealthy and may
+    return a short detail string. Only critical checks make the service
+    not ready; the others mark it degraded.
+    """
+    name: str
+    check: Callable[[], Awaitable[Optional[str]]]
+    critical: bool = True
+
+
+class HealthProbe:
+    """
+    Runs all checks concurrently, each under ``timeout`` seconds
+
+    The combined result is cached for ``ttl`` seconds and concurrent probes
+    share one in-flight round, so frequent liveness/readiness probing from
+    several kubelets costs at most one round of checks per ``ttl``.
+    """
+
+    def __init__(self, checks: List[HealthCheck], timeout: float = HEALTH_CHECK_TIMEOUT, ttl: float = HEALTH_CACHE_TTL):
+        self.checks = checks
+        self.timeout = timeout
+        self.ttl = ttl
+        self._result: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def _run_check(self, check: HealthCheck) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(check.check(), timeout=self.timeout)
+            result = {"status": "up"}
+            if detail:
+                result["detail"] = detail
+        except asyncio.TimeoutError:
+            result = {"status": "down", "error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            message = str(e).strip()
+            result = {"status": "down", "error": message.splitlines()[0] if message else type(e).__name__}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if not check.critical:
+            result["critical"] = False
+        return result
+
+    async def _run(self) -> Dict[str, Any]:
+        results = await asyncio.gather(*(self._run_check(check) for check in self.checks))
+        checks = {check.name: result for check, result in zip(self.checks, results)}
+
+        critical_down = any(r["status"] == "down" for c, r in zip(self.checks, results) if c.critical)
+        any_down = any(r["status"] == "down" for r in results)
+        for check, result in zip(self.checks, results):
+            if result["status"] == "down":
+                logger.warning(f"Health check {check.name} failed: {result['error']}")
+
+        return {
+            "status": "unhealthy" if critical_down else "degraded" if any_down else "healthy",
+            "ready": not critical_down,
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+            "checks": checks,
+        }
+
+    async def readiness(self) -> Dict[str, Any]:
+        """Result of the latest round of checks (run now when the cached one expired)"""
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result
+
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(self._run())
+        task = self._inflight
+        try:
+            # Shielded so a probe that disconnects does not cancel the round for the others
+            result = await asyncio.shield(task)
+        finally:
+            if task.done() and self._inflight is task:
+                self._inflight = None
+
+        if self._result is not result:
+            self._result = result
+            self._expires_at = time.monotonic() + self.ttl
+        return result
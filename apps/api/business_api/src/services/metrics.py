@@ -0,0 +1,443 @@
+"""
+Metrics
+Prometheus-style counters, gauges and histograms with text exposition
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Each worker writes its snapshot here so any worker can serve the aggregate
+MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+LabelKey = Tuple[Tuple[str, str], ...]
+# (name, type, help, labels, value) produced by collectors at scrape time
+Sample = Tuple[str, str, str, Dict[str, Any], float]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class _Metric:
+    """
+    Base for metrics whose values are sharded per thread
+
+    Each thread updates its own dict, so recording never takes a lock
+    (only a thread's first update registers its shard). Shards are summed
+    when the metric is collected.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._local = threading.local()
+        self._shards: List[Dict[LabelKey, Any]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelKey, Any]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def collect(self) -> Dict[LabelKey, Any]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        shard = self._shard()
+        key = _label_key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def collect(self) -> Dict[LabelKey, float]:
+        totals: Dict[LabelKey, float] = {}
+        for shard in list(self._shards):
+            for key, value in dict(shard).items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (last write wins)"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[_label_key(labels)] = value
+
+    def collect(self) -> Dict[LabelKey, float]:
+        return dict(self._values)
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets, plus their sum and count"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        shard = self._shard()
+        key = _label_key(labels)
+        state = shard.get(key)
+        if state is None:
+            # Per-bucket (non-cumulative) counts, then sum and count
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self) -> Dict[LabelKey, List[float]]:
+        totals: Dict[LabelKey, List[float]] = {}
+        for shard in list(self._shards):
+            for key, state in dict(shard).items():
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = list(state)
+                else:
+                    for index, value in enumerate(state):
+                        total[index] += value
+        return totals
+
+
+class MetricsRegistry:
+    """
+    Metrics of one process, plus collectors sampled at scrape time
+
+    With ``multiproc_dir`` set every worker writes its snapshot there
+    (on scrape and every ``FLUSH_INTERVAL`` seconds) and a scrape of any
+    worker returns counters and histograms summed over all snapshots;
+    gauges are reported per live worker with a ``pid`` label. Snapshots of
+    exited workers keep counting, so clear the directory when the service
+    is (re)deployed, as with prometheus_client's multiprocess mode.
+    """
+
+    def __init__(self, multiproc_dir: Optional[str] = MULTIPROC_DIR):
+        self.multiproc_dir = multiproc_dir
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], List[Sample]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def _get_or_create(self, cls, name: str, help: str, **kwargs) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, help, **kwargs)
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get_or_create(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help)
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], List[Sample]]) -> None:
+        """Add a callable returning samples read from other components at scrape time"""
+        self._collectors.append(collector)
+
+    # ==================== SNAPSHOTS ====================
+
+    def snapshot(self) -> Dict[str, Any]:
+        """This process's metrics as a JSON-serializable dict"""
+        metrics: Dict[str, Any] = {}
+        for metric in list(self._metrics.values()):
+            entry = {"type": metric.type, "help": metric.help, "samples": {}}
+            if isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            for key, value in metric.collect().items():
+                entry["samples"][json.dumps(key)] = value
+            metrics[metric.name] = entry
+
+        for collector in self._collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+                continue
+            for name, kind, help, labels, value in samples:
+                entry = metrics.setdefault(name, {"type": kind, "help": help, "samples": {}})
+                entry["samples"][json.dumps(_label_key(labels))] = value
+        return {"pid": os.getpid(), "metrics": metrics}
+
+    def write_snapshot(self) -> None:
+        """Write this process's snapshot to the multiprocess directory (atomically)"""
+        if not self.multiproc_dir:
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        path = os.path.join(self.multiproc_dir, f"metrics_{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(temporary, path)
+
+    def _snapshots(self) -> List[Dict[str, Any]]:
+        if not self.multiproc_dir:
+            return [self.snapshot()]
+
+        self.write_snapshot()
+        snapshots = []
+        for filename in sorted(os.listdir(self.multiproc_dir)):
+            if not (filename.startswith("metrics_") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, filename)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping metrics snapshot {filename}: {e}")
+        return snapshots
+
+    # ==================== EXPOSITION ====================
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        snapshots = self._snapshots()
+        multiprocess = self.multiproc_dir is not None
+        merged: Dict[str, Dict[str, Any]] = {}
+
+        for snapshot in snapshots:
+            live = _pid_alive(snapshot["pid"])
+            for name, entry in snapshot["metrics"].items():
+                target = merged.setdefault(name, {**entry, "samples": {}})
+                for key, value in entry["samples"].items():
+                    if entry["type"] == "gauge":
+                        if multiprocess:
+                            if not live:
+                                continue
+                            key = json.dumps(sorted(json.loads(key) + [["pid", str(snapshot["pid"])]]))
+                        target["samples"][key] = value
+                    elif entry["type"] == "histogram":
+                        total = target["samples"].get(key)
+                        target["samples"][key] = list(value) if total is None else [a + b for a, b in zip(total, value)]
+                    else:
+                        target["samples"][key] = target["samples"].get(key, 0) + value
+
+        lines: List[str] = []
+        for name in sorted(merged):
+            entry = merged[name]
+            lines.append(f"# HELP {name} {entry['help']}")
+            lines.append(f"# TYPE {name} {entry['type']}")
+            for key, value in sorted(entry["samples"].items()):
+                labels = [tuple(pair) for pair in json.loads(key)]
+                if entry["type"] == "histogram":
+                    lines.extend(_histogram_lines(name, labels, entry["buckets"], value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    # ==================== BACKGROUND FLUSH ====================
+
+    async def run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def start(self) -> None:
+        """Start writing snapshots periodically (multiprocess mode only)"""
+        if self.multiproc_dir and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        """Stop the writer, leaving a final snapshot so counters are not lost"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.multiproc_dir:
+            try:
+                self.write_snapshot()
+            except OSError as e:
+                logger.warning(f"Could not write metrics snapshot: {e}")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _histogram_lines(name: str, labels: List[Tuple[str, str]], buckets: List[float], state: List[float]) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip(list(buckets) + ["+Inf"], state[:-2]):
+        cumulative += count
+        le = bound if bound == "+Inf" else _format_value(float(bound))
+        lines.append(f"{name}_bucket{_format_labels(labels + [('le', le)])} {_format_value(cumulative)}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(state[-2])}")
+    lines.append(f"{name}_count{_format_labels(labels)} {_format_value(state[-1])}")
+    return lines
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by method, route and status")
+HTTP_REQUEST_DURATION = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency by method and route")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count and latency per route
+
+    Requests are labelled with the route template (``/api/v1/policies/{policy_id}``)
+    rather than the raw path, so the number of series stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: Dict[Any, str] = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            router = getattr(scope.get("app"), "router", None)
+            for route in getattr(router, "routes", []):
+                if getattr(route, "endpoint", None) is not None:
+                    self._templates.setdefault(route.endpoint, route.path)
+            template = self._templates.setdefault(endpoint, "unmatched")
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = self._route(scope)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status_code)
+
+
+DB_POOL_WAIT = REGISTRY.histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection")
+DB_POOL_HELD = REGISTRY.histogram("db_pool_checkout_held_seconds", "Time a database connection was checked out of the pool")
+
+
+def instrument_engine(engine, name: str = "default") -> None:
+    """
+    Record connection pool wait and hold times for a SQLAlchemy engine
+
+    Hold time comes from pool checkout/checkin events. SQLAlchemy has no
+    event before a checkout starts, so wait time is measured by wrapping
+    the pool's ``connect``. Pool size and usage are sampled at scrape time.
+    """
+    from sqlalchemy import event
+
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start, pool=name)
+
+    pool.connect = timed_connect
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            DB_POOL_HELD.observe(time.perf_counter() - checked_out_at, pool=name)
+
+    def collect() -> List[Sample]:
+        samples: List[Sample] = []
+        for metric, method in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+            read = getattr(engine.pool, method, None)
+            if read is not None:
+                samples.append((f"db_pool_{metric}", "gauge", f"Connection pool {metric.replace('_', ' ')}", {"pool": name}, read()))
+        return samples
+
+    REGISTRY.register_collector(collect)
+
+
+def cache_samples(cache: str, stats: Dict[str, Any]) -> List[Sample]:
+    """Samples for a TTLCache ``stats()`` dict; hit ratio is hits / (hits + misses)"""
+    labels = {"cache": cache}
+    return [
+        ("cache_hits_total", "counter", "Cache hits", labels, stats["hits"]),
+        ("cache_misses_total", "counter", "Cache misses", labels, stats["misses"]),
+        ("cache_evictions_total", "counter", "Cache evictions", labels, stats["evictions"]),
+        ("cache_entries", "gauge", "Entries in the cache", labels, stats["size"]),
+    ]
@@ -0,0 +1,375 @@
+"""
+Policy Subscription Client
+Keeps the local Cedar engine in sync with the Policy API policy feed
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import httpx
+
+from services.cedar_engine import CedarEngine
+from services.tracing import inject_httpx_request, tracer
+
+logger = logging.getLogger(__name__)
+
+POLICY_API_URL = os.getenv("POLICY_API_URL", "http://localhost:8000")
+POLICY_FEED_TOKEN = os.getenv("POLICY_FEED_TOKEN")
+POLICY_FEED_API_KEY = os.getenv("POLICY_FEED_API_KEY")
+LONG_POLL_WAIT = float(os.getenv("POLICY_FEED_LONG_POLL_WAIT", "25"))
+POLICY_APPLICATION_ID = os.getenv("POLICY_APPLICATION_ID")
+POLICY_BLOB_CACHE_DIR = os.getenv("POLICY_BLOB_CACHE_DIR")
+BLOB_FETCH_BATCH = 200
+# Consecutive stream failures before switching to long-polling for a while
+STREAM_FAILURE_LIMIT = 3
+STREAM_RETRY_AFTER = 300.0
+MAX_RECONNECT_DELAY = 30.0
+
+FEED_PATH = "/api/v1/policy-feed"
+
+
+class StreamUnavailable(Exception):
+    """The server (or a proxy in between) does not support the SSE stream"""
+
+
+class CursorReset(Exception):
+    """The server no longer knows our cursor; the manifest must be re-synced"""
+
+
+class BlobStore:
+    """
+    Policy contents by content hash, optionally persisted to a directory
+
+    With a cache directory a restarting node only downloads the manifest
+    and the blobs that changed while it was down.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._blobs: Dict[str, str] = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, content_hash)
+
+    def get(self, content_hash: str) -> Optional[str]:
+        content = self._blobs.get(content_hash)
+        if content is not None or not self.directory:
+            return content
+
+        try:
+            with open(self._path(content_hash), "r", encoding="utf-8") as f:
+                content = f.read()
+        except OSError:
+            return None
+        # Never trust a corrupted or truncated file
+        if hashlib.sha256(content.encode("utf-8")).hexdigest() != content_hash:
+            return None
+        self._blobs[content_hash] = content
+        return content
+
+    def put(self, content_hash: str, content: str) -> None:
+        self._blobs[content_hash] = content
+        if self.directory:
+            temp_path = self._path(content_hash) + ".tmp"
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(temp_path, self._path(content_hash))
+            except OSError as e:
+                logger.warning(f"Could not persist policy blob {content_hash}: {e}")
+
+    def missing(self, hashes: Iterable[str]) -> List[str]:
+        return [content_hash for content_hash in dict.fromkeys(hashes) if self.get(content_hash) is None]
+
+
+async def iter_sse(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, str]]:
+    """Parse a Server-Sent Events line stream into {id, event, data} dicts"""
+    event: Dict[str, str] = {}
+    data = []
+
+    async for line in lines:
+        if not line:
+            if data:
+                event["data"] = "\n".join(data)
+                yield event
+            event, data = {}, []
+            continue
+        if line.startswith(":"):
+            continue
+
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "data":
+            data.append(value)
+        elif field in ("id", "event", "retry"):
+            event[field] = value
+
+
+class PolicySubscriber:
+    """
+    Streaming policy subscription with long-poll fallback
+
+    Syncs the content-addressed manifest once (fetching only blobs it does
+    not already have), then applies deltas to the engine as they arrive
+    over SSE, resuming from the last applied version after a reconnect.
+    When streaming is unavailable it long-polls with If-None-Match, and it
+    re-syncs the manifest if the server resets the cursor.
+    """
+
+    def __init__(
+        self,
+        engine: CedarEngine,
+        base_url: str = POLICY_API_URL,
+        token: Optional[str] = POLICY_FEED_TOKEN,
+        api_key: Optional[str] = POLICY_FEED_API_KEY,
+        client: Optional[httpx.AsyncClient] = None,
+        long_poll_wait: float = LONG_POLL_WAIT,
+        application_id: Optional[int] = int(POLICY_APPLICATION_ID) if POLICY_APPLICATION_ID else None,
+        blob_store: Optional[BlobStore] = None
+    ):
+        self.engine = engine
+        self.long_poll_wait = long_poll_wait
+        self.application_id = application_id
+        self.blobs = blob_store or BlobStore(POLICY_BLOB_CACHE_DIR)
+        # Local manifest: policy id -> content hash of what the engine holds
+        self.manifest: Dict[int, str] = {}
+        self.manifest_root: Optional[str] = None
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        if api_key:
+            headers["X-API-Key"] = api_key
+        self.client = client or httpx.AsyncClient(
+            base_url=base_url.rstrip('/'),
+            headers=headers,
+            event_hooks={"request": [inject_httpx_request]}
+        )
+        self.cursor: Optional[int] = None
+        self.mode = "stream"
+        self._stream_failures = 0
+        self._stream_disabled_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.last_update: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.stats = {"deltas_applied": 0, "manifests_synced": 0, "blobs_fetched": 0, "reconnects": 0}
+
+    # ==================== APPLYING ====================
+
+    async def _fetch_blobs(self, hashes: List[str]) -> None:
+        """Download missing blobs in batches (gzip-compressed by the server)"""
+        for start in range(0, len(hashes), BLOB_FETCH_BATCH):
+            batch = hashes[start:start + BLOB_FETCH_BATCH]
+            response = await self.client.post(f"{FEED_PATH}/blobs", json={"hashes": batch}, timeout=30.0)
+            response.raise_for_status()
+            for content_hash, content in response.json()["blobs"].items():
+                self.blobs.put(content_hash, content)
+            self.stats["blobs_fetched"] += len(batch)
+
+    async def sync_manifest(self) -> None:
+        """Bring the engine to the server's manifest, fetching only changed blobs"""
+        with tracer.start_span("policy_feed.sync_manifest") as span:
+            await self._sync_manifest()
+            span.set_attribute("policy.version", self.cursor)
+            span.set_attribute("policy.count", len(self.manifest))
+
+    async def _sync_manifest(self) -> None:
+        params = {"application_id": self.application_id} if self.application_id is not None else {}
+        headers = {"If-None-Match": f'"{self.manifest_root}"'} if self.manifest_root else {}
+        response = await self.client.get(f"{FEED_PATH}/manifest", params=params, headers=headers, timeout=30.0)
+        version = int(response.headers.get("X-Policy-Version", 0))
+
+        if response.status_code != 304:
+            response.raise_for_status()
+            manifest = response.json()
+            entries = {int(policy_id): content_hash for policy_id, content_hash in manifest["entries"].items()}
+
+            await self._fetch_blobs(self.blobs.missing(entries.values()))
+            missing = self.blobs.missing(entries.values())
+            if missing:
+                raise RuntimeError(f"{len(missing)} policy blobs unavailable")
+
+            if not self.manifest:
+                self.engine.replace_policies({policy_id: self.blobs.get(h) for policy_id, h in entries.items()})
+            else:
+                self.engine.apply_changes(
+                    {
+                        policy_id: self.blobs.get(content_hash)
+                        for policy_id, content_hash in entries.items()
+                        if self.manifest.get(policy_id) != content_hash
+                    },
+                    removals=self.manifest.keys() - entries.keys()
+                )
+
+            self.manifest = entries
+            self.manifest_root = manifest["root"]
+
+        self.engine.version = version
+        self.cursor = version
+        self.last_update = datetime.utcnow()
+        self.stats["manifests_synced"] += 1
+        logger.info(f"Synced policy manifest at version {version} ({len(self.manifest)} policies)")
+
+    def _applies_here(self, policy: Dict[str, Any]) -> bool:
+        application_id = policy.get("application_id")
+        return self.application_id is None or application_id is None or application_id == self.application_id
+
+    def apply_delta(self, delta: Dict[str, Any]) -> bool:
+        """Apply a delta to the engine; stale or duplicate deltas are ignored"""
+        version = delta["version"]
+        if self.cursor is not None and version <= self.cursor:
+            return False
+
+        # Collect the whole delta first so a policy-set change compiles once
+        upserts: Dict[int, str] = {}
+        removals: List[int] = []
+        for change in delta.get("changes", []):
+            policy_id = change["policy_id"]
+            policy = change.get("policy")
+            if change.get("op") == "upsert" and self._applies_here(policy):
+                content_hash = policy.get("content_hash") or hashlib.sha256(policy["content"].encode("utf-8")).hexdigest()
+                self.blobs.put(content_hash, policy["content"])
+                upserts[policy_id] = policy["content"]
+                self.manifest[policy_id] = content_hash
+            elif policy_id in self.manifest:
+                # Deleted, or moved to another application
+                removals.append(policy_id)
+                self.manifest.pop(policy_id)
+        self.engine.apply_changes(upserts, removals=removals, version=version)
+        # The local set no longer matches any server root until the next sync
+        self.manifest_root = None
+
+        self.engine.version = version
+        self.cursor = version
+        self.last_update = datetime.utcnow()
+        self.stats["deltas_applied"] += 1
+        logger.info(f"Applied policy delta to version {version} ({len(delta.get('changes', []))} changes)")
+        return True
+
+    # ==================== TRANSPORTS ====================
+
+    async def _stream(self) -> None:
+        """Follow the SSE stream until it ends or fails"""
+        headers = {"Accept": "text/event-stream", "Last-Event-ID": str(self.cursor)}
+        # No read timeout beyond a few missed heartbeats
+        timeout = httpx.Timeout(10.0, read=60.0)
+
+        async with self.client.stream("GET", f"{FEED_PATH}/stream", headers=headers, timeout=timeout) as response:
+            if response.status_code == 410:
+                raise CursorReset()
+            if response.status_code in (404, 405, 406, 501):
+                raise StreamUnavailable(f"Stream endpoint returned {response.status_code}")
+            response.raise_for_status()
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                raise StreamUnavailable("Stream endpoint did not return text/event-stream")
+
+            async for event in iter_sse(response.aiter_lines()):
+                if event.get("event") == "reset":
+                    raise CursorReset()
+                if event.get("event", "message") == "delta":
+                    self.apply_delta(json.loads(event["data"]))
+                # A healthy stream resets the failure streak
+                self._stream_failures = 0
+
+    async def _long_poll(self) -> None:
+        """Issue one long-poll request"""
+        response = await self.client.get(
+            f"{FEED_PATH}/events",
+            params={"wait": self.long_poll_wait},
+            headers={"If-None-Match": f'"{self.cursor}"'},
+            timeout=httpx.Timeout(10.0, read=self.long_poll_wait + 10.0)
+        )
+        if response.status_code == 304:
+            return
+        if response.status_code == 410:
+            raise CursorReset()
+        response.raise_for_status()
+        self.apply_delta(response.json())
+
+    # ==================== RUNNING ====================
+
+    def _use_stream(self) -> bool:
+        return asyncio.get_running_loop().time() >= self._stream_disabled_until
+
+    def _fall_back(self, reason: str, duration: float = STREAM_RETRY_AFTER) -> None:
+        logger.warning(f"Policy stream unavailable ({reason}); long-polling for {duration:.0f}s")
+        self._stream_disabled_until = asyncio.get_running_loop().time() + duration
+        self._stream_failures = 0
+
+    async def run_forever(self) -> None:
+        """Keep the engine in sync until cancelled"""
+        failures = 0
+        while True:
+            try:
+                if self.cursor is None:
+                    await self.sync_manifest()
+
+                if self._use_stream():
+                    self.mode = "stream"
+                    try:
+                        await self._stream()
+                    except StreamUnavailable as e:
+                        self._fall_back(str(e))
+                        continue
+                    except (httpx.TransportError, httpx.HTTPStatusError):
+                        self._stream_failures += 1
+                        if self._stream_failures >= STREAM_FAILURE_LIMIT:
+                            self._fall_back(f"{self._stream_failures} consecutive failures")
+                        raise
+                    # The server or a proxy closed the stream; reconnect from the
+                    # cursor, but stop streaming if it keeps closing without deltas
+                    self.stats["reconnects"] += 1
+                    self._stream_failures += 1
+                    if self._stream_failures >= STREAM_FAILURE_LIMIT:
+                        self._fall_back("stream keeps closing")
+                else:
+                    self.mode = "long_poll"
+                    await self._long_poll()
+
+                failures = 0
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except CursorReset:
+                logger.warning(f"Policy cursor {self.cursor} was reset; re-syncing manifest")
+                self.cursor = None
+            except Exception as e:
+                failures += 1
+                self.last_error = str(e) or type(e).__name__
+                self.stats["reconnects"] += 1
+                delay = random.uniform(0, min(MAX_RECONNECT_DELAY, 0.5 * (2 ** failures)))
+                logger.error(f"Policy subscription error: {self.last_error}; retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def start(self) -> None:
+        """Start the background subscription"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        """Stop the subscription and close the HTTP client"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.client.aclose()
+
+    def status(self) -> Dict[str, Any]:
+        """Current state of the subscription"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "mode": self.mode,
+            "version": self.cursor,
+            "policies": self.engine.get_policy_count(),
+            "last_update": self.last_update.isoformat() if self.last_update else None,
+            "last_error": self.last_error,
+            **self.stats,
+        }
@@ -0,0 +1,194 @@
+"""
+Profiling
+On-demand sampling CPU profiler and tracemalloc allocation snapshots for a live worker
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_DEFAULT_INTERVAL = float(os.getenv("PROFILE_DEFAULT_INTERVAL", "0.005"))
+
+# Leaf frames of threads that are only waiting (idle pool workers, the event loop's select)
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+# One profile at a time per worker: samplers would otherwise sample each other
+_session_lock = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile or allocation snapshot is already running in this worker"""
+
+    def __init__(self):
+        super().__init__("A profiling session is already running in this worker")
+
+
+def _path_prefixes() -> List[str]:
+    # Longest first, so site-packages wins over the prefix it lives in
+    return sorted((os.path.join(path, "") for path in sys.path if path), key=len, reverse=True)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler sampling the Python stack of every thread
+
+    A sampler thread wakes every ``interval`` seconds and records the stack
+    of each other thread from ``sys._current_frames()``; nothing is hooked
+    into the interpreter, so the profiled code runs unmodified and nothing
+    at all runs between sessions. Stacks are aggregated in the "collapsed"
+    format understood by flamegraph.pl, speedscope and inferno:
+    ``thread;outer (file:line);...;inner (file:line) <samples>``.
+    """
+
+    def __init__(self, interval: float = PROFILE_DEFAULT_INTERVAL, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.elapsed = 0.0
+        self._prefixes = _path_prefixes()
+        self._labels: Dict[Tuple[Any, int], str] = {}
+
+    def _short_path(self, filename: str) -> str:
+        for prefix in self._prefixes:
+            if filename.startswith(prefix):
+                return filename[len(prefix):]
+        return filename
+
+    def _label(self, frame) -> str:
+        code = frame.f_code
+        key = (code, frame.f_lineno)
+        label = self._labels.get(key)
+        if label is None:
+            # ";" separates frames in the collapsed format
+            label = f"{code.co_name} ({self._short_path(code.co_filename)}:{frame.f_lineno})".replace(";", ":")
+            self._labels[key] = label
+        return label
+
+    def _is_idle(self, frame) -> bool:
+        code = frame.f_code
+        return (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES
+
+    def sample(self, exclude: Optional[int] = None) -> None:
+        """Record one stack per thread (except ``exclude``, the sampler itself)"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == exclude or (not self.include_idle and self._is_idle(frame)):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}").replace(";", ":"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, duration: float) -> None:
+        """Sample the other threads for ``duration`` seconds (blocks the calling thread)"""
+        me = threading.get_ident()
+        start = time.perf_counter()
+        deadline = start + duration
+        next_sample = start
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(min(next_sample - now, deadline - now))
+                continue
+            self.sample(exclude=me)
+            # Skip missed ticks rather than bursting to catch up
+            next_sample = max(next_sample + self.interval, time.perf_counter())
+        self.elapsed = time.perf_counter() - start
+
+    def collapsed(self) -> str:
+        """Aggregated stacks, one ``frames count`` line each, hottest first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+async def profile_cpu(duration: float, interval: float = PROFILE_DEFAULT_INTERVAL, include_idle: bool = False) -> SamplingProfiler:
+    """
+    Profile this worker for ``duration`` seconds
+
+    The sampler runs in its own thread, so the event loop keeps serving (and
+    is sampled) while the caller awaits the result.
+    """
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusyError()
+    try:
+        profiler = SamplingProfiler(interval=interval, include_idle=include_idle)
+        thread = threading.Thread(target=profiler.run, args=(duration,), name="sampling-profiler", daemon=True)
+        thread.start()
+        await asyncio.to_thread(thread.join)
+        return profiler
+    finally:
+        _session_lock.release()
+
+
+def _snapshot_top(snapshot: tracemalloc.Snapshot, group_by: str, limit: int) -> List[Dict[str, Any]]:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+    prefixes = _path_prefixes()
+
+    def short(filename: str) -> str:
+        for prefix in prefixes:
+            if filename.startswith(prefix):
+                return filename[len(prefix):]
+        return filename
+
+    top = []
+    for stat in snapshot.statistics(group_by)[:limit]:
+        frame = stat.traceback[0]
+        entry = {"file": short(frame.filename), "size_bytes": stat.size, "count": stat.count}
+        if group_by == "lineno":
+            entry["line"] = frame.lineno
+        top.append(entry)
+    return top
+
+
+async def allocation_snapshot(duration: float, group_by: str = "lineno", limit: int = 50) -> Dict[str, Any]:
+    """
+    Largest live allocations made while tracing
+
+    tracemalloc slows every allocation down, so unless it was already on
+    (PYTHONTRACEMALLOC) it is started for ``duration`` seconds only and the
+    snapshot covers what was allocated in that window and is still alive.
+    """
+    if not _session_lock.acquire(blocking=False):
+        raise ProfilerBusyError()
+    try:
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        try:
+            await asyncio.sleep(duration)
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+        top = await asyncio.to_thread(_snapshot_top, snapshot, group_by, limit)
+        return {
+            "duration_seconds": duration,
+            "tracing_window": "request" if started_here else "process",
+            "traced_memory": {"current_bytes": current, "peak_bytes": peak},
+            "group_by": group_by,
+            "top": top,
+        }
+    finally:
+        _session_lock.release()
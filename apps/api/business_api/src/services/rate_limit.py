@@ -0,0 +1,344 @@
+"""
+Rate Limiting Service
+Token-bucket rate limiting with pluggable backends and an ASGI middleware
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Only trust X-Forwarded-For behind a proxy that sets it
+TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+# Paths never limited (probes and docs)
+EXEMPT_PREFIXES = ("/health", "/docs", "/redoc", "/openapi.json", "/metrics")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``limit`` requests per ``period`` seconds, with bursts up to ``burst``"""
+    limit: int
+    period: float
+    burst: Optional[int] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.burst or self.limit
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+    @property
+    def policy(self) -> str:
+        """RateLimit-Policy header value"""
+        return f"{self.limit};w={int(self.period)}"
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse ``"600/minute"``, ``"10/second"`` or ``"600/minute;burst=100"``"""
+        spec, _, options = value.strip().partition(";")
+        count, _, unit = spec.partition("/")
+        period = PERIODS.get(unit.strip().rstrip("s"))
+        if period is None:
+            raise ValueError(f"Invalid rate limit period in {value!r}")
+        burst = None
+        if options.strip().startswith("burst="):
+            burst = int(options.strip()[len("burst="):])
+        return cls(limit=int(count), period=period, burst=burst)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of taking a token from one bucket"""
+    allowed: bool
+    limit: RateLimit
+    remaining: int
+    # Seconds until the bucket is full again / until one token is available
+    reset_after: float
+    retry_after: float
+
+
+def take_token(
+    tokens: float,
+    updated_at: float,
+    now: float,
+    limit: RateLimit,
+    cost: int = 1
+) -> Tuple[float, RateLimitDecision]:
+    """Pure token-bucket step: refill since ``updated_at`` then try to spend ``cost``"""
+    tokens = min(limit.capacity, tokens + max(0.0, now - updated_at) * limit.rate)
+    allowed = tokens >= cost
+    if allowed:
+        tokens -= cost
+    retry_after = 0.0 if allowed else (cost - tokens) / limit.rate
+    decision = RateLimitDecision(
+        allowed=allowed,
+        limit=limit,
+        remaining=int(tokens),
+        reset_after=(limit.capacity - tokens) / limit.rate,
+        retry_after=retry_after
+    )
+    return tokens, decision
+
+
+# ==================== BACKENDS ====================
+
+class RateLimitBackend(ABC):
+    """Where bucket state lives; implementations must make ``acquire`` atomic per key"""
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        """Take ``cost`` tokens from the bucket ``key`` if available"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class LocalTokenBucketBackend(RateLimitBackend):
+    """
+    In-process buckets for single-node deployments
+
+    Runs on the event loop without awaiting, so each acquire is atomic.
+    At most ``max_buckets`` are kept; evicting the least recently used one
+    only forgets that it was partly drained.
+    """
+
+    def __init__(self, max_buckets: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        now = self.clock()
+        tokens, updated_at = self._buckets.get(key, (float(limit.capacity), now))
+        tokens, decision = take_token(tokens, updated_at, now, limit, cost)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return decision
+
+
+# Atomic token bucket for a shared store: KEYS[1] bucket, ARGV capacity, rate, now, cost, ttl
+TOKEN_BUCKET_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {allowed, tostring(tokens)}
+"""
+
+
+class SharedTokenBucketBackend(RateLimitBackend):
+    """
+    Buckets in a shared store so limits hold across workers and nodes
+
+    ``client`` is anything with a Redis-compatible ``eval`` coroutine
+    (``redis.asyncio.Redis`` in production, ``InMemoryScriptStore`` in
+    tests); the whole refill-and-take step runs as one script, so it is
+    atomic in the store. When the store fails the backend fails open.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit:", clock: Callable[[], float] = time.time):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+        self.errors = 0
+
+    async def acquire(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        ttl = max(1, math.ceil(limit.capacity / limit.rate))
+        try:
+            allowed, tokens = await self.client.eval(
+                TOKEN_BUCKET_SCRIPT, 1, self.prefix + key,
+                limit.capacity, limit.rate, self.clock(), cost, ttl
+            )
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Rate limit store unavailable, allowing request: {e}")
+            return RateLimitDecision(True, limit, limit.capacity, 0.0, 0.0)
+
+        tokens = float(tokens)
+        return RateLimitDecision(
+            allowed=bool(int(allowed)),
+            limit=limit,
+            remaining=int(tokens),
+            reset_after=(limit.capacity - tokens) / limit.rate,
+            retry_after=0.0 if int(allowed) else (cost - tokens) / limit.rate
+        )
+
+    async def close(self) -> None:
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+
+class InMemoryScriptStore:
+    """
+    Local fake of the shared store for tests and development
+
+    Implements ``eval`` for TOKEN_BUCKET_SCRIPT only, with the same
+    semantics, so SharedTokenBucketBackend can run without Redis.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+
+    async def eval(self, script: str, numkeys: int, key: str, capacity, rate, now, cost, ttl):
+        if script != TOKEN_BUCKET_SCRIPT:
+            raise NotImplementedError("InMemoryScriptStore only runs the token bucket script")
+        capacity, rate, now, cost = float(capacity), float(rate), float(now), float(cost)
+        tokens, ts = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+        allowed = 0
+        if tokens >= cost:
+            tokens -= cost
+            allowed = 1
+        self.buckets[key] = (tokens, now)
+        return [allowed, str(tokens)]
+
+
+def create_rate_limit_backend_from_env() -> RateLimitBackend:
+    """Build the backend selected by RATE_LIMIT_BACKEND (local, redis or memory)"""
+    kind = os.getenv("RATE_LIMIT_BACKEND", "local").lower()
+    if kind == "redis":
+        # Optional dependency, only needed for the shared backend
+        import redis.asyncio as redis
+        return SharedTokenBucketBackend(redis.from_url(os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")))
+    if kind == "memory":
+        return SharedTokenBucketBackend(InMemoryScriptStore())
+    return LocalTokenBucketBackend()
+
+
+# ==================== LIMITER ====================
+
+class RateLimiter:
+    """Checks a request against several buckets; it is allowed only if all allow it"""
+
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.stats = {"allowed": 0, "limited": 0}
+
+    async def check(self, buckets: List[Tuple[str, RateLimit]]) -> Optional[RateLimitDecision]:
+        """
+        Take a token from every bucket; returns the most restrictive decision
+
+        Buckets are checked in order and the first denial stops the check,
+        so a request rejected by its key bucket does not drain its
+        application bucket.
+        """
+        tightest: Optional[RateLimitDecision] = None
+        for key, limit in buckets:
+            decision = await self.backend.acquire(key, limit)
+            if not decision.allowed:
+                self.stats["limited"] += 1
+                return decision
+            if tightest is None or decision.remaining < tightest.remaining:
+                tightest = decision
+        self.stats["allowed"] += 1
+        return tightest
+
+
+def rate_limit_headers(decision: RateLimitDecision) -> Dict[str, str]:
+    """RateLimit-* (and Retry-After when limited) response headers"""
+    headers = {
+        "RateLimit-Limit": str(decision.limit.capacity),
+        "RateLimit-Remaining": str(max(0, decision.remaining)),
+        "RateLimit-Reset": str(math.ceil(decision.reset_after)),
+        "RateLimit-Policy": decision.limit.policy,
+    }
+    if not decision.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+    return headers
+
+
+# Resolves the buckets a request counts against from the ASGI scope
+BucketResolver = Callable[[Dict[str, Any]], Awaitable[List[Tuple[str, RateLimit]]]]
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware enforcing rate limits
+
+    Streaming responses pass through untouched apart from the added
+    headers. Limited requests get 429 with Retry-After.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, resolve_buckets: BucketResolver):
+        self.app = app
+        self.limiter = limiter
+        self.resolve_buckets = resolve_buckets
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES) or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            decision = await self.limiter.check(await self.resolve_buckets(scope))
+        except Exception as e:
+            logger.error(f"Rate limit check failed, allowing request: {e}")
+            decision = None
+
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = [(name.lower().encode(), value.encode()) for name, value in rate_limit_headers(decision).items()]
+        if not decision.allowed:
+            body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def header(scope: Dict[str, Any], name: bytes) -> Optional[str]:
+    """Read a request header from an ASGI scope"""
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope: Dict[str, Any], trust_forwarded: bool = TRUST_FORWARDED) -> str:
+    """Client address (first X-Forwarded-For hop when behind a trusted proxy)"""
+    forwarded = header(scope, b"x-forwarded-for") if trust_forwarded else None
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def limit_from_env(name: str, default: str) -> RateLimit:
+    """Read a RateLimit from an environment variable"""
+    return RateLimit.parse(os.getenv(name, default))
@@ -0,0 +1,30 @@
+"""
+Request Limits
+Maps Business API requests to rate-limit buckets (user or IP)
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from auth.jwt import decode_access_token
+from services.rate_limit import RateLimit, client_ip, header, limit_from_env
+
+USER_LIMIT = limit_from_env("RATE_LIMIT_USER", "600/minute;burst=100")
+ANONYMOUS_LIMIT = limit_from_env("RATE_LIMIT_ANONYMOUS", "120/minute;burst=30")
+
+
+async def resolve_buckets(scope: Dict[str, Any]) -> List[Tuple[str, RateLimit]]:
+    """
+    Buckets a request counts against
+
+    A valid bearer token is limited per user; anything else per client IP.
+    The Business API does not verify API keys, so an X-API-Key header earns
+    no allowance of its own.
+    """
+    authorization = header(scope, b"authorization")
+    if authorization and authorization.startswith("Bearer "):
+        payload = decode_access_token(authorization[7:])
+        subject = payload and payload.get("sub")
+        if subject:
+            return [(f"user:{subject}", USER_LIMIT)]
+
+    return [(f"ip:{client_ip(scope)}", ANONYMOUS_LIMIT)]
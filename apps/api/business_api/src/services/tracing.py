@@ -0,0 +1,355 @@
+"""
+Tracing
+Lightweight spans with W3C trace context propagation and pluggable exporters
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, MutableMapping, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+# Paths not worth a trace (probes, metrics scrapes, docs)
+UNTRACED_PREFIXES = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+
+class SpanContext:
+    """Identity of a span, as carried by a W3C ``traceparent`` header"""
+
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def from_traceparent(cls, value: Optional[str]) -> Optional["SpanContext"]:
+        """Parse a ``traceparent`` header; None when it is missing or malformed"""
+        if not value:
+            return None
+        parts = value.strip().split("-")
+        if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+            return None
+        version, trace_id, span_id, flags = parts[:4]
+        try:
+            int(trace_id, 16), int(span_id, 16)
+            sampled = bool(int(flags, 16) & 0x01)
+        except ValueError:
+            return None
+        if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id, span_id, sampled)
+
+
+class Span:
+    """
+    A timed operation in a trace (fields follow the OpenTelemetry span model)
+
+    Use as a context manager: entering makes it the current span, leaving
+    ends it and hands it to the exporter.
+    """
+
+    recording = True
+
+    def __init__(self, tracer: "Tracer", name: str, context: SpanContext, parent_span_id: Optional[str], kind: str, attributes: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        self.status = status
+        self.status_message = message
+
+    def end(self) -> None:
+        if self.end_time_unix_nano is None:
+            self.end_time_unix_nano = time.time_ns()
+            self.tracer.exporter.export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_unix_nano or time.time_ns()
+        return (end - self.start_time_unix_nano) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "status_message": self.status_message,
+        }
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and self.status == "UNSET":
+            self.set_status("ERROR", f"{exc_type.__name__}: {exc}")
+        _current_span.reset(self._token)
+        self.end()
+
+
+class NonRecordingSpan(Span):
+    """
+    Span that is not sampled: it only carries the trace context
+
+    Propagating it keeps downstream services in the same (unsampled) trace.
+    """
+
+    recording = False
+
+    def __init__(self, context: SpanContext):
+        self.context = context
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_span.reset(self._token)
+
+
+class _NoopSpan:
+    """Shared span returned while tracing is disabled; every method is a no-op"""
+
+    recording = False
+    context = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+# ==================== EXPORTERS ====================
+
+class SpanExporter:
+    """Receives every ended, sampled span"""
+
+    def export(self, span: Span) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps finished spans in a list (for tests and debugging)"""
+
+    def __init__(self, max_spans: int = 10000):
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+        if len(self.spans) > self.max_spans:
+            del self.spans[:len(self.spans) - self.max_spans]
+
+    def get_finished_spans(self, name: Optional[str] = None) -> List[Span]:
+        return [span for span in self.spans if name is None or span.name == name]
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class LoggingSpanExporter(SpanExporter):
+    """Writes each span as one JSON line to the ``tracing`` logger"""
+
+    def __init__(self):
+        self.logger = logging.getLogger("tracing")
+
+    def export(self, span: Span) -> None:
+        self.logger.info(json.dumps(span.to_dict(), default=str))
+
+
+# ==================== TRACER ====================
+
+class Tracer:
+    """
+    Creates spans, sampling new traces at ``sample_ratio``
+
+    Sampling is decided once at the root of a trace (or taken from an
+    incoming ``traceparent``) and inherited by every child span. With
+    ``enabled=False`` ``start_span`` returns a shared no-op span, so the
+    instrumentation costs one attribute check.
+    """
+
+    def __init__(self, enabled: bool = False, sample_ratio: float = 1.0, exporter: Optional[SpanExporter] = None):
+        self.enabled = enabled
+        self.sample_ratio = sample_ratio
+        self.exporter = exporter or SpanExporter()
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "INTERNAL",
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None
+    ):
+        """Span for a block: ``with tracer.start_span("jwt.decode") as span: ...``"""
+        if not self.enabled:
+            return NOOP_SPAN
+
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current is not None else None
+
+        if parent is None:
+            trace_id = f"{random.getrandbits(128):032x}"
+            sampled = random.random() < self.sample_ratio
+        elif not parent.sampled:
+            # Nothing below an unsampled span is recorded; just carry its context
+            return NonRecordingSpan(parent)
+        else:
+            trace_id, sampled = parent.trace_id, True
+
+        context = SpanContext(trace_id, f"{random.getrandbits(64):016x}", sampled)
+        if not sampled:
+            return NonRecordingSpan(context)
+        return Span(self, name, context, parent.span_id if parent else None, kind, attributes)
+
+
+def current_span():
+    """The active span, or the no-op span when there is none"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def inject(headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
+    """Add the current trace context to outgoing request headers"""
+    span = _current_span.get()
+    if span is not None:
+        headers[TRACEPARENT_HEADER] = span.context.to_traceparent()
+    return headers
+
+
+async def inject_httpx_request(request) -> None:
+    """httpx ``request`` event hook propagating the current trace context"""
+    inject(request.headers)
+
+
+def create_tracer_from_env() -> Tracer:
+    """Build the tracer from TRACING_ENABLED, TRACING_SAMPLE_RATIO and TRACING_EXPORTER (log or memory)"""
+    enabled = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    exporter_name = os.getenv("TRACING_EXPORTER", "log").lower()
+    exporter = InMemorySpanExporter() if exporter_name == "memory" else LoggingSpanExporter()
+    return Tracer(
+        enabled=enabled,
+        sample_ratio=float(os.getenv("TRACING_SAMPLE_RATIO", "1.0")),
+        exporter=exporter
+    )
+
+
+tracer = create_tracer_from_env()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening a server span per request
+
+    Continues the trace of an incoming ``traceparent`` and returns the
+    request's own ``traceparent`` so clients can correlate.
+    """
+
+    def __init__(self, app, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+        self._templates: Dict[Any, str] = {}
+
+    def _route(self, scope) -> Optional[str]:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return None
+        if endpoint not in self._templates:
+            router = getattr(scope.get("app"), "router", None)
+            for route in getattr(router, "routes", []):
+                if getattr(route, "endpoint", None) is endpoint:
+                    self._templates[endpoint] = route.path
+                    break
+            else:
+                return None
+        return self._templates[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if not self.tracer.enabled or scope["type"] != "http" or scope["path"].startswith(UNTRACED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        parent = SpanContext.from_traceparent(_header(scope, b"traceparent"))
+        span = self.tracer.start_span(
+            f"{scope['method']} {scope['path']}",
+            kind="SERVER",
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+            parent=parent
+        )
+
+        async def send_with_trace(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_status("ERROR")
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", [])) + [(b"traceparent", span.context.to_traceparent().encode())]
+                }
+            await send(message)
+
+        with span:
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                # Named after the route template once routing has matched
+                route = self._route(scope)
+                if route is not None and span.recording:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
@@ -0,0 +1,35 @@
+"""Add Keycloak sync columns to users and groups tables
+
+Revision ID: 006_add_keycloak_sync_columns
+Revises: 005_add_missing_columns_resources_actions
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_add_keycloak_sync_columns'
+down_revision: Union[str, None] = '005_add_missing_columns_resources_actions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Mirror columns maintained by the Keycloak sync engine
+    for table in ('users', 'groups'):
+        op.add_column(table, sa.Column('keycloak_id', sa.String(length=36), nullable=True))
+        op.add_column(table, sa.Column('sync_hash', sa.String(length=64), nullable=True))
+        op.add_column(table, sa.Column('synced_at', sa.DateTime(), nullable=True))
+        op.create_index(f'ix_{table}_keycloak_id', table, ['keycloak_id'], unique=True)
+
+
+def downgrade() -> None:
+    for table in ('groups', 'users'):
+        op.drop_index(f'ix_{table}_keycloak_id', table_name=table)
+        op.drop_column(table, 'synced_at')
+        op.drop_column(table, 'sync_hash')
+        op.drop_column(table, 'keycloak_id')
@@ -0,0 +1,44 @@
+"""Add policy_events outbox table
+
+Revision ID: 007_add_policy_events_outbox
+Revises: 006_add_keycloak_sync_columns
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_add_policy_events_outbox'
+down_revision: Union[str, None] = '006_add_keycloak_sync_columns'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Transactional outbox read by the OPAL publisher
+    op.create_table(
+        'policy_events',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('topic', sa.String(length=100), nullable=False),
+        sa.Column('policy_id', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_policy_events_topic', 'policy_events', ['topic'])
+    op.create_index('ix_policy_events_policy_id', 'policy_events', ['policy_id'])
+    op.create_index('ix_policy_events_pending', 'policy_events', ['published_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_policy_events_pending', table_name='policy_events')
+    op.drop_index('ix_policy_events_policy_id', table_name='policy_events')
+    op.drop_index('ix_policy_events_topic', table_name='policy_events')
+    op.drop_table('policy_events')
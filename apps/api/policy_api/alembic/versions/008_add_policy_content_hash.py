@@ -0,0 +1,47 @@
+"""Add content_hash and application_id to policies
+
+Revision ID: 008_add_policy_content_hash
+Revises: 007_add_policy_events_outbox
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_add_policy_content_hash'
+down_revision: Union[str, None] = '007_add_policy_events_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('policies', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.add_column('policies', sa.Column('application_id', sa.Integer(), nullable=True))
+    op.create_index('ix_policies_content_hash', 'policies', ['content_hash'])
+    op.create_index('ix_policies_application_id', 'policies', ['application_id'])
+    op.create_foreign_key(
+        'fk_policies_application_id', 'policies', 'applications',
+        ['application_id'], ['id'], ondelete='SET NULL'
+    )
+
+    # Backfill hashes for existing policies
+    connection = op.get_bind()
+    policies = connection.execute(sa.text("SELECT id, content FROM policies")).fetchall()
+    for policy_id, content in policies:
+        connection.execute(
+            sa.text("UPDATE policies SET content_hash = :hash WHERE id = :id"),
+            {"hash": hashlib.sha256(content.encode("utf-8")).hexdigest(), "id": policy_id}
+        )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_policies_application_id', 'policies', type_='foreignkey')
+    op.drop_index('ix_policies_application_id', table_name='policies')
+    op.drop_index('ix_policies_content_hash', table_name='policies')
+    op.drop_column('policies', 'application_id')
+    op.drop_column('policies', 'content_hash')
@@ -0,0 +1,88 @@
+"""Add content-addressed policy version history
+
+Revision ID: 009_add_policy_versions
+Revises: 008_add_policy_content_hash
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+import hashlib
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009_add_policy_versions'
+down_revision: Union[str, None] = '008_add_policy_content_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'policy_contents',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.create_table(
+        'policy_versions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('policy_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.String(length=50), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('comment', sa.String(length=255), nullable=True),
+        sa.ForeignKeyConstraint(['policy_id'], ['policies.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['content_hash'], ['policy_contents.content_hash']),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_policy_versions_policy_version', 'policy_versions', ['policy_id', 'version'], unique=True
+    )
+    op.add_column('policies', sa.Column('current_version_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_policies_current_version_id', 'policies', 'policy_versions',
+        ['current_version_id'], ['id'], ondelete='SET NULL'
+    )
+
+    # Seed history with each policy's current content
+    connection = op.get_bind()
+    now = datetime.utcnow()
+    policies = connection.execute(sa.text("SELECT id, version, content FROM policies")).fetchall()
+    stored = set()
+    for policy_id, version, content in policies:
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if content_hash not in stored:
+            connection.execute(
+                sa.text(
+                    "INSERT INTO policy_contents (content_hash, content, created_at) "
+                    "VALUES (:hash, :content, :now)"
+                ),
+                {"hash": content_hash, "content": content, "now": now}
+            )
+            stored.add(content_hash)
+        version_id = connection.execute(
+            sa.text(
+                "INSERT INTO policy_versions (policy_id, version, content_hash, created_at) "
+                "VALUES (:policy_id, :version, :hash, :now) RETURNING id"
+            ),
+            {"policy_id": policy_id, "version": version or "1.0.0", "hash": content_hash, "now": now}
+        ).scalar()
+        connection.execute(
+            sa.text("UPDATE policies SET current_version_id = :version_id WHERE id = :id"),
+            {"version_id": version_id, "id": policy_id}
+        )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_policies_current_version_id', 'policies', type_='foreignkey')
+    op.drop_column('policies', 'current_version_id')
+    op.drop_index('ix_policy_versions_policy_version', table_name='policy_versions')
+    op.drop_table('policy_versions')
+    op.drop_table('policy_contents')
@@ -0,0 +1,44 @@
+"""Add policy_changesets table
+
+Revision ID: 010_add_policy_changesets
+Revises: 009_add_policy_versions
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_add_policy_changesets'
+down_revision: Union[str, None] = '009_add_policy_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'policy_changesets',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='draft'),
+        sa.Column('operations', sa.JSON(), nullable=False),
+        sa.Column('committed_version', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('committed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.CheckConstraint("status IN ('draft', 'committed', 'discarded')", name='check_policy_changeset_status'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_policy_changesets_status', 'policy_changesets', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_policy_changesets_status', table_name='policy_changesets')
+    op.drop_table('policy_changesets')
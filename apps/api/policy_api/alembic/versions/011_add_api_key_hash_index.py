@@ -0,0 +1,26 @@
+"""Add unique index on api_keys.key_hash
+
+Revision ID: 011_add_api_key_hash_index
+Revises: 010_add_policy_changesets
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011_add_api_key_hash_index'
+down_revision: Union[str, None] = '010_add_policy_changesets'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Presented keys are looked up by hash; keys are 256-bit random so hashes are unique
+    op.create_index('ix_api_keys_key_hash', 'api_keys', ['key_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_api_keys_key_hash', table_name='api_keys')
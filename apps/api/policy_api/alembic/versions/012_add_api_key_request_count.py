@@ -0,0 +1,27 @@
+"""Add request_count to api_keys
+
+Revision ID: 012_add_api_key_request_count
+Revises: 011_add_api_key_hash_index
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_add_api_key_request_count'
+down_revision: Union[str, None] = '011_add_api_key_hash_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Incremented in bulk by the API key usage tracker
+    op.add_column('api_keys', sa.Column('request_count', sa.BigInteger(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('api_keys', 'request_count')
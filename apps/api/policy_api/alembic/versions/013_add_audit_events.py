@@ -0,0 +1,49 @@
+"""Add audit_events table
+
+Revision ID: 013_add_audit_events
+Revises: 012_add_api_key_request_count
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_add_audit_events'
+down_revision: Union[str, None] = '012_add_api_key_request_count'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Append-only audit trail written in batches by the audit writer
+    op.create_table(
+        'audit_events',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False),
+        sa.Column('action', sa.String(length=100), nullable=False),
+        sa.Column('outcome', sa.String(length=20), nullable=False),
+        sa.Column('actor_type', sa.String(length=20), nullable=False),
+        sa.Column('actor_id', sa.String(length=64), nullable=True),
+        sa.Column('actor_name', sa.String(length=255), nullable=True),
+        sa.Column('entity_type', sa.String(length=50), nullable=True),
+        sa.Column('entity_id', sa.String(length=64), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('trace_id', sa.String(length=32), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_events_occurred_at', 'audit_events', ['occurred_at'])
+    op.create_index('ix_audit_events_action', 'audit_events', ['action'])
+    op.create_index('ix_audit_events_entity', 'audit_events', ['entity_type', 'entity_id', 'occurred_at'])
+    op.create_index('ix_audit_events_actor', 'audit_events', ['actor_id', 'occurred_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_events_actor', table_name='audit_events')
+    op.drop_index('ix_audit_events_entity', table_name='audit_events')
+    op.drop_index('ix_audit_events_action', table_name='audit_events')
+    op.drop_index('ix_audit_events_occurred_at', table_name='audit_events')
+    op.drop_table('audit_events')
@@ -0,0 +1,58 @@
+"""Add decision_rollups and decision_rollup_batches tables
+
+Revision ID: 014_add_decision_rollups
+Revises: 013_add_audit_events
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014_add_decision_rollups'
+down_revision: Union[str, None] = '013_add_audit_events'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Decision counts per minute/hour/day bucket, incremented by rollup ingestion
+    op.create_table(
+        'decision_rollups',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('application_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('resource_type', sa.String(length=100), nullable=False),
+        sa.Column('action_type', sa.String(length=100), nullable=False),
+        sa.Column('allow_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('deny_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'granularity', 'bucket_start', 'application_id', 'resource_type', 'action_type',
+            name='uq_decision_rollups_key'
+        )
+    )
+    op.create_index(
+        'ix_decision_rollups_application', 'decision_rollups', ['granularity', 'application_id', 'bucket_start']
+    )
+
+    # Batch ids already applied, so retried batches are not counted twice
+    op.create_table(
+        'decision_rollup_batches',
+        sa.Column('batch_id', sa.String(length=36), nullable=False),
+        sa.Column('applied_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('batch_id')
+    )
+    op.create_index('ix_decision_rollup_batches_applied_at', 'decision_rollup_batches', ['applied_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_decision_rollup_batches_applied_at', table_name='decision_rollup_batches')
+    op.drop_table('decision_rollup_batches')
+    op.drop_index('ix_decision_rollups_application', table_name='decision_rollups')
+    op.drop_table('decision_rollups')
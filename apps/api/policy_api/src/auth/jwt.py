@@ -9,6 +9,9 @@ from typing import Optional, Dict
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
+from models.user import KEYCLOAK_MANAGED_PASSWORD
+from services.tracing import tracer
+
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
@@ -19,8 +22,13 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against its hash (False for users without a local password)"""
+    if not hashed_password or hashed_password == KEYCLOAK_MANAGED_PASSWORD:
+        return False
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except ValueError:
+        return False
 
 
 def get_password_hash(password: str) -> str:
@@ -65,11 +73,14 @@ def decode_access_token(token: str) -> Optional[Dict]:
     Returns:
         Decoded token payload or None if invalid
     """
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+    with tracer.start_span("jwt.decode") as span:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            return payload
+        except JWTError as e:
+            span.set_attribute("jwt.valid", False)
+            span.set_attribute("jwt.error", str(e))
+            return None
 
 
 # Mock users database (for MVP)
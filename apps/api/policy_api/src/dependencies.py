@@ -3,19 +3,25 @@ Shared Dependencies
 FastAPI dependency injection functions
 """
 
-from fastapi import HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import HTTPException, Depends, Request, status
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from typing import Optional
 import logging
 
 from database_pg import get_db
 from models.user import User
 from auth.jwt import decode_access_token
+from services.api_key_auth import API_KEY_HEADER, APIKeyPrincipal, get_api_key_authenticator
+from services.api_key_usage import get_api_key_usage_tracker
+from services.audit import audit_denied
+from services.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 # Security
 security = HTTPBearer(auto_error=False)
+api_key_header = APIKeyHeader(name=API_KEY_HEADER, auto_error=False)
 
 
 async def get_current_user(
@@ -55,7 +61,9 @@ async def get_current_user(
             )
 
         # Get user from database
-        user = db.query(User).filter(User.email == email).first()
+        with tracer.start_span("auth.user_lookup") as span:
+            user = db.query(User).filter(User.email == email).first()
+            span.set_attribute("user.found", user is not None)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,6 +72,7 @@ async def get_current_user(
             )
 
         if not user.is_active:
+            audit_denied(user, "auth.authenticate", "user", user.id, reason="inactive user")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Inactive user",
@@ -80,3 +89,48 @@ async def get_current_user(
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+async def get_optional_api_key(
+    request: Request,
+    api_key: Optional[str] = Depends(api_key_header)
+) -> Optional[APIKeyPrincipal]:
+    """
+    Dependency resolving the X-API-Key header, if one was sent
+
+    Returns None when no key was presented and raises 401 when the key is
+    unknown, inactive or expired. The principal is also stored on
+    ``request.state.api_key`` for middleware and logging, and its usage is
+    buffered for the write-behind tracker.
+    """
+    if not api_key:
+        return None
+
+    with tracer.start_span("api_key.authenticate") as span:
+        principal = await get_api_key_authenticator().authenticate(api_key)
+        span.set_attribute("api_key.valid", principal is not None)
+    if principal is None:
+        # Only the public prefix part of the presented key is kept
+        audit_denied(None, "api_key.authenticate", "api_key", key_prefix=api_key[:8], path=request.url.path)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API key",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+
+    request.state.api_key = principal
+    get_api_key_usage_tracker().record(principal.id)
+    return principal
+
+
+async def get_api_key(
+    principal: Optional[APIKeyPrincipal] = Depends(get_optional_api_key)
+) -> APIKeyPrincipal:
+    """Dependency requiring a valid API key (machine clients)"""
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="API key required",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+    return principal
@@ -3,19 +3,28 @@ Sentinela Policy API
 Policy Management Service for Authorization Control Plane
 """
 
-import sys
-import os
+import time
+
+# Started before the framework imports so import time is part of the startup figures
+_process_import_start = time.perf_counter()
 
-# Add current directory to Python path
-current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, current_dir)
+import os
+import importlib
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, Tuple
 import uvicorn
 import logging
 
+from services.keycloak_admin import KeycloakUnavailableError, get_shared_keycloak_admin
+from services.resilience import CircuitBreaker
+from services.metrics import REGISTRY, MetricsMiddleware, cache_samples, instrument_engine
+from services.tracing import TracingMiddleware
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,13 +32,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Authentication router: "keycloak" (login against Keycloak) or "local" (local password hashes)
+AUTH_PROVIDER = os.getenv("AUTH_PROVIDER", "keycloak").lower()
+AUTH_ROUTERS = {
+    "keycloak": "routers.auth_keycloak",
+    "local": "routers.auth",
+}
+
+# Every router the API serves, in registration order: (module, include prefix).
+# A router that fails to import stops startup instead of silently disappearing.
+ROUTER_MANIFEST: Tuple[Tuple[str, str], ...] = (
+    (AUTH_ROUTERS.get(AUTH_PROVIDER, ""), "/api/v1"),
+    ("routers.applications", "/api/v1"),
+    ("routers.resources", "/api/v1"),
+    ("routers.actions", "/api/v1"),
+    ("routers.users", ""),
+    ("routers.groups", ""),
+    ("routers.policies", ""),
+    ("routers.keycloak_users", ""),
+    ("routers.keycloak_groups", ""),
+    ("routers.keycloak_sync", ""),
+    ("routers.policy_feed", ""),
+    ("routers.policy_changesets", ""),
+    ("routers.audit", ""),
+    ("routers.analytics", ""),
+    ("routers.profiling", ""),
+    ("routers.health", ""),
+)
+
 # Global services
 opal_service = None
 keycloak_service = None
-
-# Simple in-memory database for MVP
-policies_db = []
-policy_id_counter = 1
+keycloak_sync_service = None
+rate_limiter = None
 
 
 @asynccontextmanager
@@ -37,130 +72,270 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info("Starting Policy API...")
-    
-    # Initialize services (mock for MVP)
-    global opal_service, keycloak_service
-    opal_service = None  # Will be implemented later
-    keycloak_service = None  # Will be implemented later
-    
-    logger.info("Services initialized successfully")
-    
+
+    # Initialize services
+    global opal_service, keycloak_service, keycloak_sync_service
+
+    # Keycloak login client, only needed by the Keycloak auth router
+    if AUTH_PROVIDER == "keycloak":
+        from services.keycloak_service import KeycloakService
+        keycloak_service = KeycloakService(
+            server_url=os.getenv("KEYCLOAK_URL", "http://localhost:8080"),
+            realm=os.getenv("KEYCLOAK_REALM", "sentinela")
+        )
+    app.state.keycloak_service = keycloak_service
+
+    # Deliver policy changes from the outbox to OPAL
+    if os.getenv("OPAL_PUBLISHER_ENABLED", "false").lower() == "true":
+        from services.opal_service import OPALService
+        from services.opal_publisher import start_policy_publisher
+        opal_service = OPALService(
+            server_url=os.getenv("OPAL_SERVER_URL", "http://opal_publisher:7002"),
+            auth_token=os.getenv("OPAL_AUTH_TOKEN", "")
+        )
+        start_policy_publisher(opal_service)
+        logger.info("OPAL policy publisher started")
+
+    # Mirror Keycloak users and groups into the local tables
+    if os.getenv("KEYCLOAK_SYNC_ENABLED", "false").lower() == "true":
+        from services.keycloak_sync import get_sync_service
+        keycloak_sync_service = get_sync_service()
+        keycloak_sync_service.start()
+        logger.info("Keycloak sync started")
+
+    # Write API key usage behind the request path
+    from services.api_key_usage import get_api_key_usage_tracker
+    get_api_key_usage_tracker().start()
+
+    # Write audit events behind the request path
+    from services.audit import create_audit_sink_from_env, get_audit_log
+    get_audit_log().start(create_audit_sink_from_env())
+
+    # Share metrics between workers (METRICS_MULTIPROC_DIR)
+    REGISTRY.start()
+
+    app.state.startup["ready_ms"] = round((time.perf_counter() - _process_import_start) * 1000, 1)
+    logger.info(f"Services initialized successfully ({app.state.startup['ready_ms']} ms since import)")
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down Policy API...")
+    if keycloak_sync_service:
+        await keycloak_sync_service.stop()
+        await keycloak_sync_service.keycloak.close()
 
+    if keycloak_service:
+        await keycloak_service.close()
+        keycloak_service = None
 
-# Create FastAPI app
-app = FastAPI(
-    title="Sentinela Policy API",
-    description="Policy Management Service for Authorization Control Plane",
-    version="1.0.0",
-    lifespan=lifespan
-)
+    from services.keycloak_admin import close_shared_keycloak_admin
+    await close_shared_keycloak_admin()
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:3030",  # Frontend Next.js
-        "http://localhost:8080"
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    from services.api_key_usage import stop_api_key_usage_tracker
+    await stop_api_key_usage_tracker()
 
-# Include routers
-from routers import applications, resources, actions
-try:
-    from routers import auth_keycloak
-    app.include_router(auth_keycloak.router, prefix="/api/v1")  # Keycloak auth router
-    print("Keycloak auth router included successfully")
-except Exception as e:
-    print(f"Failed to include Keycloak auth router: {e}")
-    # Fallback to regular auth
-    from routers import auth
-    app.include_router(auth.router, prefix="/api/v1")  # Regular auth router
-app.include_router(applications.router, prefix="/api/v1")
-app.include_router(resources.router, prefix="/api/v1")
-app.include_router(actions.router, prefix="/api/v1")
-
-# Include user router
-try:
-    from routers import users
-    app.include_router(users.router)  # User router already has prefix
-    print("User router included successfully")
-except Exception as e:
-    print(f"Failed to include user router: {e}")
-
-# Include group router
-try:
-    from routers import groups
-    app.include_router(groups.router)  # Group router already has prefix
-    print("Group router included successfully")
-except Exception as e:
-    print(f"Failed to include group router: {e}")
-
-# Include policies router
-try:
-    from routers import policies
-    app.include_router(policies.router)  # Policies router already has prefix
-    print("Policies router included successfully")
-except Exception as e:
-    print(f"Failed to include policies router: {e}")
-
-# Include Keycloak user management router
-try:
-    from routers import keycloak_users
-    app.include_router(keycloak_users.router)  # Keycloak users router
-    print("Keycloak users router included successfully")
-except Exception as e:
-    print(f"Failed to include Keycloak users router: {e}")
-
-# Include Keycloak group management router
-try:
-    from routers import keycloak_groups
-    app.include_router(keycloak_groups.router)  # Keycloak groups router
-    print("Keycloak groups router included successfully")
-except Exception as e:
-    print(f"Failed to include Keycloak groups router: {e}")
-
-
-# Health endpoints
-@app.get("/health/")
-async def health_check():
-    """Basic health check"""
-    return {
-        "status": "healthy",
-        "timestamp": "2025-01-11T00:00:00Z",
-        "services": {
-            "database": "healthy",
-            "opal": "not_initialized",
-            "keycloak": "not_initialized"
-        }
+    from services.audit import stop_audit_log
+    await stop_audit_log()
+
+    if rate_limiter:
+        await rate_limiter.backend.close()
+
+    await REGISTRY.stop()
+
+    if opal_service:
+        from services.opal_publisher import stop_policy_publisher
+        await stop_policy_publisher()
+        await opal_service.close()
+
+
+async def keycloak_unavailable_handler(request: Request, exc: KeycloakUnavailableError):
+    """Fail fast with 503 while Keycloak is down instead of a generic 500"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, int(exc.retry_after + 0.999)))}
+    )
+
+
+def include_routers(app: FastAPI) -> Dict[str, float]:
+    """
+    Import and include every router of ROUTER_MANIFEST
+
+    Returns the import time of each router module in milliseconds. Modules
+    shared by several routers are charged to the first router importing them.
+    """
+    if AUTH_PROVIDER not in AUTH_ROUTERS:
+        raise RuntimeError(f"Unknown AUTH_PROVIDER '{AUTH_PROVIDER}' (expected one of: {', '.join(AUTH_ROUTERS)})")
+
+    timings = {}
+    for module_name, prefix in ROUTER_MANIFEST:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        timings[module_name] = round((time.perf_counter() - start) * 1000, 1)
+        app.include_router(module.router, prefix=prefix)
+    return timings
+
+
+def create_app() -> FastAPI:
+    """
+    Build the Policy API application
+
+    Only routers and middleware are set up here; clients that open
+    connections (Keycloak, OPAL, sync and usage workers) are created in
+    ``lifespan`` once the worker starts serving.
+    """
+    global rate_limiter
+    start = time.perf_counter()
+
+    app = FastAPI(
+        title="Sentinela Policy API",
+        description="Policy Management Service for Authorization Control Plane",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # Rate limiting per API key, application, user or client IP
+    if os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true":
+        from services.rate_limit import RateLimiter, RateLimitMiddleware, create_rate_limit_backend_from_env
+        from services.request_limits import resolve_buckets
+        rate_limiter = RateLimiter(create_rate_limit_backend_from_env())
+        app.add_middleware(RateLimitMiddleware, limiter=rate_limiter, resolve_buckets=resolve_buckets)
+
+    # CORS middleware (added last so it also covers 429 responses)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:3000",
+            "http://localhost:3030",  # Frontend Next.js
+            "http://localhost:8080"
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Request metrics (outermost, so limited and failed requests are counted too)
+    from database_pg import engine as database_engine
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(database_engine)
+
+    # Server spans continuing incoming W3C trace context (TRACING_ENABLED)
+    app.add_middleware(TracingMiddleware)
+
+    app.add_exception_handler(KeycloakUnavailableError, keycloak_unavailable_handler)
+
+    router_imports = include_routers(app)
+    for path, endpoint in SERVICE_ROUTES:
+        app.add_api_route(path, endpoint, methods=["GET"], include_in_schema=path != "/metrics")
+
+    app.state.keycloak_service = None
+    app.state.startup = {
+        "process_import_ms": round((start - _process_import_start) * 1000, 1),
+        "create_app_ms": round((time.perf_counter() - start) * 1000, 1),
+        "router_imports_ms": router_imports,
     }
+    slowest = max(router_imports, key=router_imports.get)
+    logger.info(
+        f"Policy API built in {app.state.startup['create_app_ms']} ms with {len(router_imports)} routers "
+        f"(slowest import: {slowest}, {router_imports[slowest]} ms)"
+    )
+    return app
 
 
-@app.get("/health/detailed")
-async def detailed_health_check():
+# Health endpoints (/health/, /health/live and /health/ready are in routers/health.py)
+async def detailed_health_check(request: Request):
     """Detailed health check including external services"""
+    from routers.health import get_health_probe
+    from services.opal_publisher import get_policy_publisher
+    from services.api_key_auth import get_api_key_authenticator
+    from services.api_key_usage import get_api_key_usage_tracker
+    from services.audit import get_audit_log
+    keycloak_admin = get_shared_keycloak_admin()
+    publisher = get_policy_publisher()
+    probe = await get_health_probe().readiness()
     return {
-        "status": "healthy",
-        "timestamp": "2025-01-11T00:00:00Z",
+        "status": probe["status"],
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "checks": probe["checks"],
         "services": {
-            "database": "healthy",
-            "opal": "not_initialized",
-            "keycloak": "not_initialized"
-        }
+            "database": probe["checks"]["database"]["status"],
+            "opal": await publisher.status() if publisher else "not_initialized",
+            "keycloak": probe["checks"]["keycloak"]["status"]
+        },
+        "keycloak_admin": {
+            "resilience": keycloak_admin.resilience_stats(),
+            "cache": keycloak_admin.cache_stats()
+        },
+        "api_keys": {
+            "cache": get_api_key_authenticator().stats(),
+            "usage": get_api_key_usage_tracker().status()
+        },
+        "audit": get_audit_log().status(),
+        "rate_limit": rate_limiter.stats if rate_limiter else "disabled",
+        "startup": request.app.state.startup
     }
 
 
+# KeycloakAdminService.request_stats keys exported as keycloak_<key>_total
+KEYCLOAK_REQUEST_METRICS = {
+    "requests": "Keycloak admin HTTP requests sent (retries and hedges included)",
+    "retries": "Keycloak admin request retries",
+    "timeouts": "Keycloak admin requests that timed out",
+    "failures": "Keycloak admin requests that failed",
+    "hedges": "Hedged Keycloak admin GETs sent",
+    "hedge_wins": "Hedged Keycloak admin GETs that answered first",
+}
+
+
+def collect_service_metrics():
+    """Cache, Keycloak client, rate limit, API key usage and audit counters sampled at scrape time"""
+    from services.api_key_auth import get_api_key_authenticator
+    from services.api_key_usage import get_api_key_usage_tracker
+    from services.audit import get_audit_log
+    from services.policy_versions import diff_cache_stats
+
+    keycloak_admin = get_shared_keycloak_admin()
+    api_key_caches = get_api_key_authenticator().stats()
+    samples = (
+        cache_samples("keycloak", keycloak_admin.cache_stats())
+        + cache_samples("api_keys", api_key_caches["valid"])
+        + cache_samples("api_keys_rejected", api_key_caches["rejected"])
+        + cache_samples("policy_diffs", diff_cache_stats())
+    )
+    for name, help_text in KEYCLOAK_REQUEST_METRICS.items():
+        samples.append((f"keycloak_{name}_total", "counter", help_text, {}, keycloak_admin.request_stats[name]))
+    breaker = keycloak_admin.breaker.stats()
+    # One series per state, 1 for the current one
+    for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+        samples.append(("keycloak_circuit_state", "gauge", "Keycloak circuit breaker state", {"state": state}, int(breaker["state"] == state)))
+    samples.append(("keycloak_circuit_opened_total", "counter", "Times the Keycloak circuit breaker opened", {}, breaker["times_opened"]))
+    samples.append(("keycloak_circuit_rejected_total", "counter", "Keycloak calls refused by the open circuit breaker", {}, breaker["rejected"]))
+    samples.append(("keycloak_circuit_consecutive_failures", "gauge", "Consecutive failed Keycloak calls", {}, breaker["consecutive_failures"]))
+    for name, value in get_api_key_usage_tracker().stats.items():
+        samples.append((f"api_key_usage_{name}_total", "counter", f"API key usage tracker {name.replace('_', ' ')}", {}, value))
+    if rate_limiter:
+        for decision, value in rate_limiter.stats.items():
+            samples.append(("rate_limit_decisions_total", "counter", "Rate limit decisions", {"decision": decision}, value))
+    audit_log = get_audit_log()
+    for name in ("recorded", "dropped", "written"):
+        samples.append(("audit_events_total", "counter", "Audit events by stage", {"stage": name}, audit_log.stats[name]))
+    samples.append(("audit_flush_failures_total", "counter", "Failed audit batch writes", {}, audit_log.stats["flush_failures"]))
+    samples.append(("audit_queue_depth", "gauge", "Audit events waiting to be written", {}, audit_log.queued))
+    return samples
+
+
+REGISTRY.register_collector(collect_service_metrics)
+
+
+async def metrics():
+    """Metrics in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 # Policy endpoints are now handled by the policies router
 
 
-@app.get("/")
 async def root():
     """Root endpoint"""
     return {
@@ -170,7 +345,6 @@ async def root():
     }
 
 
-@app.get("/info")
 async def info():
     """API information endpoint"""
     return {
@@ -185,10 +359,22 @@ async def info():
     }
 
 
+# Endpoints served by the application itself rather than a router
+SERVICE_ROUTES = (
+    ("/health/detailed", detailed_health_check),
+    ("/metrics", metrics),
+    ("/", root),
+    ("/info", info),
+)
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "src.main:app",
         host="0.0.0.0",
         port=8000,
         reload=True
-    )
\ No newline at end of file
+    )
@@ -7,12 +7,18 @@ from .api_key import APIKey
 from .resource import Resource
 from .action import Action
 from .policy import Policy
+from .policy_event import PolicyEvent
+from .policy_version import PolicyContent, PolicyVersion
+from .policy_changeset import PolicyChangeset
+from .audit_event import AuditEvent
+from .decision_rollup import DecisionRollup, DecisionRollupBatch
 from .user import User, UserStatus, UserRole
 from .group import Group
 from .user_group import UserGroup, user_group_association
 
 __all__ = [
-    'Application', 'APIKey', 'Resource', 'Action', 'Policy',
+    'Application', 'APIKey', 'Resource', 'Action', 'Policy', 'PolicyEvent', 'PolicyContent', 'PolicyVersion',
+    'PolicyChangeset', 'AuditEvent', 'DecisionRollup', 'DecisionRollupBatch',
     'User', 'UserStatus', 'UserRole', 
     'Group', 
     'UserGroup', 'user_group_association'
@@ -2,12 +2,13 @@
 APIKey model for application authentication
 """
 
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import BigInteger, Column, String, DateTime, Boolean, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
 import hashlib
+import hmac
 import secrets
 
 try:
@@ -26,7 +27,8 @@ class APIKey(Base):
         name: Friendly name for the API key
         key_prefix: Visible prefix (e.g., 'app_')
         key_hash: Hashed key for secure storage
-        last_used_at: Timestamp of last usage
+        last_used_at: Timestamp of last usage (written behind, may lag a few seconds)
+        request_count: Number of authenticated requests made with the key
         expires_at: Optional expiration timestamp
         is_active: Whether the key is active
         created_at: Timestamp of creation
@@ -54,10 +56,11 @@ class APIKey(Base):
     # Key Information
     name = Column(String(100), nullable=False)
     key_prefix = Column(String(10), nullable=False, default='app_')
-    key_hash = Column(String(255), nullable=False)
+    key_hash = Column(String(255), nullable=False, unique=True, index=True)
 
     # Usage Tracking
     last_used_at = Column(DateTime, nullable=True)
+    request_count = Column(BigInteger, nullable=False, default=0, server_default='0')
     expires_at = Column(DateTime, nullable=True)
 
     # Status
@@ -90,10 +93,15 @@ class APIKey(Base):
         # Create full key
         plain_key = f"{prefix}{random_string}"
         # Hash the key for storage
-        key_hash = hashlib.sha256(plain_key.encode()).hexdigest()
+        key_hash = APIKey.hash_key(plain_key)
 
         return plain_key, key_hash
 
+    @staticmethod
+    def hash_key(plain_key: str) -> str:
+        """Hash a plain key the way it is stored"""
+        return hashlib.sha256(plain_key.encode()).hexdigest()
+
     @staticmethod
     def verify_key(plain_key: str, key_hash: str) -> bool:
         """
@@ -106,11 +114,16 @@ class APIKey(Base):
         Returns:
             True if key matches hash, False otherwise
         """
-        computed_hash = hashlib.sha256(plain_key.encode()).hexdigest()
-        return computed_hash == key_hash
+        computed_hash = APIKey.hash_key(plain_key)
+        return hmac.compare_digest(computed_hash, key_hash)
 
     def update_last_used(self):
-        """Update the last_used_at timestamp"""
+        """
+        Update the last_used_at timestamp
+
+        Request handling records usage through APIKeyUsageTracker instead,
+        which batches these writes.
+        """
         self.last_used_at = datetime.utcnow()
 
     def is_expired(self) -> bool:
@@ -139,6 +152,7 @@ class APIKey(Base):
             'name': self.name,
             'key_prefix': self.key_prefix,
             'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None,
+            'request_count': self.request_count or 0,
             'expires_at': self.expires_at.isoformat() if self.expires_at else None,
             'is_active': self.is_active,
             'is_expired': self.is_expired(),
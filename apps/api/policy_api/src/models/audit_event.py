@@ -0,0 +1,117 @@
+"""
+AuditEvent model (append-only audit trail)
+"""
+
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, JSON, Index
+from datetime import datetime
+
+try:
+    from ..database_pg import Base
+except ImportError:
+    from database_pg import Base
+
+
+class AuditEvent(Base):
+    """
+    AuditEvent model recording who changed what, and which requests were denied
+
+    Rows are only ever inserted, in batches, by the audit writer; nothing
+    updates or deletes them.
+
+    Attributes:
+        id: Monotonic event id
+        occurred_at: Timestamp of the audited action (not of the write)
+        action: Dotted action name (e.g. "policy.update", "api_key.authenticate")
+        outcome: "success", "denied" or "failure"
+        actor_type: "user", "api_key", "system" or "anonymous"
+        actor_id: User id or API key id
+        actor_name: User email, API key name or system component
+        entity_type: Kind of entity acted on (policy, user, group, application, api_key, ...)
+        entity_id: Id of the entity acted on
+        details: Action-specific fields
+        trace_id: Trace of the request that caused the event, when traced
+    """
+
+    __tablename__ = "audit_events"
+
+    # Primary Key (BIGINT, except on SQLite where only INTEGER keys autoincrement)
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+        nullable=False
+    )
+
+    # Event
+    occurred_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        index=True
+    )
+    action = Column(
+        String(100),
+        nullable=False,
+        index=True
+    )
+    outcome = Column(
+        String(20),
+        nullable=False,
+        default="success"
+    )
+
+    # Actor
+    actor_type = Column(
+        String(20),
+        nullable=False
+    )
+    actor_id = Column(
+        String(64),
+        nullable=True
+    )
+    actor_name = Column(
+        String(255),
+        nullable=True
+    )
+
+    # Target
+    entity_type = Column(
+        String(50),
+        nullable=True
+    )
+    entity_id = Column(
+        String(64),
+        nullable=True
+    )
+    details = Column(
+        JSON,
+        nullable=True
+    )
+    trace_id = Column(
+        String(32),
+        nullable=True
+    )
+
+    __table_args__ = (
+        Index("ix_audit_events_entity", "entity_type", "entity_id", "occurred_at"),
+        Index("ix_audit_events_actor", "actor_id", "occurred_at"),
+    )
+
+    def __repr__(self):
+        return f"<AuditEvent(id={self.id}, action='{self.action}', outcome='{self.outcome}')>"
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'id': self.id,
+            'occurred_at': self.occurred_at.isoformat() if self.occurred_at else None,
+            'action': self.action,
+            'outcome': self.outcome,
+            'actor_type': self.actor_type,
+            'actor_id': self.actor_id,
+            'actor_name': self.actor_name,
+            'entity_type': self.entity_type,
+            'entity_id': self.entity_id,
+            'details': self.details,
+            'trace_id': self.trace_id
+        }
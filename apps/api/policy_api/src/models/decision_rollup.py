@@ -0,0 +1,134 @@
+"""
+DecisionRollup models (authorization decision counts per time bucket)
+"""
+
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Index, UniqueConstraint
+from datetime import datetime
+
+try:
+    from ..database_pg import Base
+except ImportError:
+    from database_pg import Base
+
+
+class DecisionRollup(Base):
+    """
+    DecisionRollup model counting decisions per bucket, application, resource type and action type
+
+    One row per (granularity, bucket) and key; counts are only ever
+    incremented, by the ingestion of per-minute batches from data planes,
+    so a query reads one row per bucket and key instead of raw decisions.
+
+    Attributes:
+        id: Row id
+        granularity: "minute", "hour" or "day"
+        bucket_start: Start of the bucket (UTC)
+        application_id: Application of the data plane that decided (0 when not configured)
+        resource_type: Resource type of the decision (entity type of the resource uid)
+        action_type: Action type of the decision (id of the action uid)
+        allow_count: Allowed decisions in the bucket
+        deny_count: Denied decisions in the bucket
+        updated_at: Timestamp of the last increment
+    """
+
+    __tablename__ = "decision_rollups"
+
+    # Primary Key (BIGINT, except on SQLite where only INTEGER keys autoincrement)
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+        nullable=False
+    )
+
+    # Bucket
+    granularity = Column(
+        String(10),
+        nullable=False
+    )
+    bucket_start = Column(
+        DateTime,
+        nullable=False
+    )
+
+    # Key
+    application_id = Column(
+        Integer,
+        nullable=False,
+        default=0
+    )
+    resource_type = Column(
+        String(100),
+        nullable=False
+    )
+    action_type = Column(
+        String(100),
+        nullable=False
+    )
+
+    # Counts
+    allow_count = Column(
+        BigInteger,
+        nullable=False,
+        default=0
+    )
+    deny_count = Column(
+        BigInteger,
+        nullable=False,
+        default=0
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity", "bucket_start", "application_id", "resource_type", "action_type",
+            name="uq_decision_rollups_key"
+        ),
+        Index("ix_decision_rollups_application", "granularity", "application_id", "bucket_start"),
+    )
+
+    def __repr__(self):
+        return f"<DecisionRollup(granularity='{self.granularity}', bucket_start='{self.bucket_start}', resource_type='{self.resource_type}', action_type='{self.action_type}')>"
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'granularity': self.granularity,
+            'bucket_start': self.bucket_start.isoformat() if self.bucket_start else None,
+            'application_id': self.application_id,
+            'resource_type': self.resource_type,
+            'action_type': self.action_type,
+            'allow_count': self.allow_count,
+            'deny_count': self.deny_count
+        }
+
+
+class DecisionRollupBatch(Base):
+    """
+    Ingested rollup batch ids, so a batch retried by a data plane is applied once
+
+    Attributes:
+        batch_id: Id chosen by the data plane for the batch
+        applied_at: Timestamp the batch was applied
+    """
+
+    __tablename__ = "decision_rollup_batches"
+
+    batch_id = Column(
+        String(36),
+        primary_key=True,
+        nullable=False
+    )
+    applied_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        index=True
+    )
+
+    def __repr__(self):
+        return f"<DecisionRollupBatch(batch_id='{self.batch_id}')>"
@@ -24,6 +24,9 @@ class Group(Base):
         created_at: Timestamp of creation
         updated_at: Timestamp of last update
         created_by: User who created this group
+        keycloak_id: ID of the mirrored Keycloak group, if any
+        sync_hash: Content hash of the Keycloak representation last applied
+        synced_at: Timestamp of the last sync that changed this row
     """
 
     __tablename__ = "groups"
@@ -75,6 +78,22 @@ class Group(Base):
         nullable=True
     )
 
+    # Keycloak mirror (maintained by the sync engine)
+    keycloak_id = Column(
+        String(36),
+        nullable=True,
+        unique=True,
+        index=True
+    )
+    sync_hash = Column(
+        String(64),
+        nullable=True
+    )
+    synced_at = Column(
+        DateTime,
+        nullable=True
+    )
+
     # Relationships
     parent = relationship("Group", remote_side=[id], back_populates="children")
     children = relationship("Group", back_populates="parent", cascade="all, delete-orphan")
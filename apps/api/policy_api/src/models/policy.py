@@ -2,12 +2,14 @@
 Policy models for database and API
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey
+from sqlalchemy.orm import validates
 from sqlalchemy.sql import func
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 import enum
+import hashlib
 
 try:
     from ..database_pg import Base
@@ -23,6 +25,11 @@ class PolicyStatus(str, enum.Enum):
     ARCHIVED = "archived"
 
 
+def compute_content_hash(content: str) -> str:
+    """SHA-256 of policy content, used to address it in manifests and blob fetches"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
 # SQLAlchemy Model
 class Policy(Base):
     """Policy database model"""
@@ -32,11 +39,25 @@ class Policy(Base):
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     content = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=True, index=True)
+    # NULL means the policy applies to every application
+    application_id = Column(Integer, ForeignKey("applications.id", ondelete="SET NULL"), nullable=True, index=True)
     version = Column(String(50), nullable=False, default="1.0.0")
+    # Points at the policy_versions row currently in effect; rollback moves it
+    current_version_id = Column(
+        Integer,
+        ForeignKey("policy_versions.id", use_alter=True, name="fk_policies_current_version_id", ondelete="SET NULL"),
+        nullable=True
+    )
     status = Column(Enum(PolicyStatus), nullable=False, default=PolicyStatus.DRAFT)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    @validates("content")
+    def _update_content_hash(self, key, content):
+        self.content_hash = compute_content_hash(content) if content is not None else None
+        return content
+    
     def __repr__(self):
         return f"<Policy(id={self.id}, name='{self.name}', status='{self.status}')>"
 
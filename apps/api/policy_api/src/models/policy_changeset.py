@@ -0,0 +1,81 @@
+"""
+PolicyChangeset model (staged multi-policy changes committed atomically)
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, CheckConstraint
+from datetime import datetime
+
+try:
+    from ..database_pg import Base
+except ImportError:
+    from database_pg import Base
+
+
+class PolicyChangeset(Base):
+    """
+    PolicyChangeset model staging creates, updates and (de)activations
+
+    Operations are kept as submitted until commit, when they are validated
+    together and applied in one transaction that produces a single
+    policy-set version.
+
+    Attributes:
+        id: Unique identifier
+        name: Short label for the change (e.g., "rotate finance rules")
+        description: Detailed description
+        status: Changeset status (draft, committed, discarded)
+        operations: Staged operations, applied in order
+        committed_version: Policy-set version produced by the commit
+        result: Policy ids touched by the commit (created ones included)
+        created_by: User who created the changeset
+        created_at: Timestamp of creation
+        updated_at: Timestamp of last update
+        committed_at: Timestamp of commit
+    """
+
+    __tablename__ = "policy_changesets"
+
+    # Primary Key
+    id = Column(
+        Integer,
+        primary_key=True,
+        autoincrement=True,
+        nullable=False
+    )
+
+    # Basic Information
+    name = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(
+        String(20),
+        nullable=False,
+        default='draft',
+        index=True
+    )
+    operations = Column(
+        JSON,
+        nullable=False,
+        default=list
+    )
+
+    # Outcome
+    committed_version = Column(Integer, nullable=True)
+    result = Column(JSON, nullable=True)
+
+    # Metadata
+    created_by = Column(
+        Integer,
+        ForeignKey('users.id', ondelete='SET NULL'),
+        nullable=True
+    )
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    committed_at = Column(DateTime, nullable=True)
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint("status IN ('draft', 'committed', 'discarded')", name='check_policy_changeset_status'),
+    )
+
+    def __repr__(self):
+        return f"<PolicyChangeset(id={self.id}, name='{self.name}', status='{self.status}')>"
@@ -0,0 +1,97 @@
+"""
+PolicyEvent model (transactional outbox for policy publication)
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from datetime import datetime
+
+try:
+    from ..database_pg import Base
+except ImportError:
+    from database_pg import Base
+
+
+class PolicyEvent(Base):
+    """
+    PolicyEvent model recording policy changes to be published to OPAL
+
+    Events are written in the same transaction as the policy change they
+    describe; the OPAL publisher reads unpublished events in id order.
+
+    Attributes:
+        id: Monotonic event id, also used as the policy set version
+        topic: OPAL topic the change is published to
+        policy_id: Policy the change applies to
+        payload: Change description ({"changes": [...]})
+        created_at: Timestamp of the change
+        published_at: Timestamp the event was delivered to OPAL (NULL while pending)
+        attempts: Number of failed delivery attempts
+        last_error: Last delivery error, if any
+    """
+
+    __tablename__ = "policy_events"
+
+    # Primary Key
+    id = Column(
+        Integer,
+        primary_key=True,
+        autoincrement=True,
+        nullable=False
+    )
+
+    # Event
+    topic = Column(
+        String(100),
+        nullable=False,
+        default="policy_data",
+        index=True
+    )
+    policy_id = Column(
+        Integer,
+        nullable=True,
+        index=True
+    )
+    payload = Column(
+        JSON,
+        nullable=False
+    )
+
+    # Delivery
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow
+    )
+    published_at = Column(
+        DateTime,
+        nullable=True
+    )
+    attempts = Column(
+        Integer,
+        nullable=False,
+        default=0
+    )
+    last_error = Column(
+        Text,
+        nullable=True
+    )
+
+    __table_args__ = (
+        Index("ix_policy_events_pending", "published_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<PolicyEvent(id={self.id}, topic='{self.topic}', policy_id={self.policy_id})>"
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'id': self.id,
+            'topic': self.topic,
+            'policy_id': self.policy_id,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'published_at': self.published_at.isoformat() if self.published_at else None,
+            'attempts': self.attempts,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,124 @@
+"""
+Policy version history models (content-addressed)
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from datetime import datetime
+
+try:
+    from ..database_pg import Base
+except ImportError:
+    from database_pg import Base
+
+
+class PolicyContent(Base):
+    """
+    PolicyContent model storing each distinct policy text once
+
+    Versions reference content by hash, so re-publishing an identical text
+    (or rolling back to it) never stores it again.
+
+    Attributes:
+        content_hash: SHA-256 of the content (primary key)
+        content: Cedar policy text
+        created_at: Timestamp the content was first stored
+    """
+
+    __tablename__ = "policy_contents"
+
+    content_hash = Column(
+        String(64),
+        primary_key=True,
+        nullable=False
+    )
+    content = Column(
+        Text,
+        nullable=False
+    )
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow
+    )
+
+    def __repr__(self):
+        return f"<PolicyContent(content_hash='{self.content_hash[:12]}')>"
+
+
+class PolicyVersion(Base):
+    """
+    PolicyVersion model, an append-only history entry of a policy
+
+    Rows are never updated; a policy's current version is the one its
+    ``current_version_id`` points to.
+
+    Attributes:
+        id: Unique identifier
+        policy_id: Policy the version belongs to
+        version: Version label (e.g., 1.0.3), unique per policy
+        content_hash: Content of this version
+        created_at: Timestamp the version was created
+        created_by: User who created the version
+        comment: Optional note (e.g., "rollback to 1.0.1")
+    """
+
+    __tablename__ = "policy_versions"
+
+    # Primary Key
+    id = Column(
+        Integer,
+        primary_key=True,
+        autoincrement=True,
+        nullable=False
+    )
+
+    # Version
+    policy_id = Column(
+        Integer,
+        ForeignKey('policies.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    version = Column(
+        String(50),
+        nullable=False
+    )
+    content_hash = Column(
+        String(64),
+        ForeignKey('policy_contents.content_hash'),
+        nullable=False
+    )
+
+    # Metadata
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow
+    )
+    created_by = Column(
+        Integer,
+        ForeignKey('users.id', ondelete='SET NULL'),
+        nullable=True
+    )
+    comment = Column(
+        String(255),
+        nullable=True
+    )
+
+    __table_args__ = (
+        Index("ix_policy_versions_policy_version", "policy_id", "version", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<PolicyVersion(policy_id={self.policy_id}, version='{self.version}')>"
+
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'id': self.id,
+            'policy_id': self.policy_id,
+            'version': self.version,
+            'content_hash': self.content_hash,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_by': self.created_by,
+            'comment': self.comment
+        }
@@ -13,6 +13,10 @@ except ImportError:
     from database_pg import Base
 
 
+# password_hash of users who authenticate through Keycloak; never a valid bcrypt hash
+KEYCLOAK_MANAGED_PASSWORD = "!keycloak"
+
+
 class UserStatus(str, enum.Enum):
     """User status enumeration"""
     ACTIVE = "ACTIVE"
@@ -43,6 +47,9 @@ class User(Base):
         updated_at: Timestamp of last update
         last_login: Last login timestamp
         created_by: User who created this user
+        keycloak_id: ID of the mirrored Keycloak user, if any
+        sync_hash: Content hash of the Keycloak representation last applied
+        synced_at: Timestamp of the last sync that changed this row
     """
 
     __tablename__ = "users"
@@ -112,6 +119,22 @@ class User(Base):
         nullable=True
     )
 
+    # Keycloak mirror (maintained by the sync engine)
+    keycloak_id = Column(
+        String(36),
+        nullable=True,
+        unique=True,
+        index=True
+    )
+    sync_hash = Column(
+        String(64),
+        nullable=True
+    )
+    synced_at = Column(
+        DateTime,
+        nullable=True
+    )
+
     # Relationships
     # groups will be defined through UserGroup association table
 
@@ -1,7 +1,5 @@
 """
 Routers package for Policy API
-"""
-
-from . import applications, resources, actions, auth, users, groups, policies
 
-__all__ = ['applications', 'resources', 'actions', 'auth', 'users', 'groups', 'policies']
\ No newline at end of file
+Routers are imported one by one from the manifest in main.py.
+"""
@@ -0,0 +1,141 @@
+"""
+Analytics router: decision rollups ingested from data planes and served to the dashboard
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import logging
+
+from database_pg import get_db
+from models.user import User
+from dependencies import get_current_user, get_optional_api_key
+from routers.policy_feed import check_feed_credentials
+from services.api_key_auth import APIKeyPrincipal
+from services.audit import audit_denied
+from services.decision_rollups import GROUP_COLUMNS, apply_rollup_batch, bucket_count, query_rollups
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
+
+MAX_BUCKETS_PER_BATCH = 5000
+MAX_QUERY_BUCKETS = 1500
+# Window returned when 'since' is not given
+DEFAULT_WINDOWS = {"minute": timedelta(hours=1), "hour": timedelta(hours=24), "day": timedelta(days=30)}
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is None else value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def verify_ingest_credentials(
+    authorization: Optional[str] = Header(None),
+    api_key: Optional[APIKeyPrincipal] = Depends(get_optional_api_key)
+) -> None:
+    """Require a valid API key or the shared POLICY_FEED_TOKEN; ingestion is never open"""
+    check_feed_credentials(authorization, api_key, allow_anonymous=False)
+
+
+# ==================== SCHEMAS ====================
+
+class RollupBucket(BaseModel):
+    minute: datetime = Field(..., description="Start of the minute the decisions were made in (UTC)")
+    resource_type: str = Field(..., min_length=1, max_length=100)
+    action_type: str = Field(..., min_length=1, max_length=100)
+    allow: int = Field(0, ge=0)
+    deny: int = Field(0, ge=0)
+
+
+class RollupBatch(BaseModel):
+    batch_id: str = Field(..., min_length=1, max_length=36, description="Data plane id of the batch; repeats are ignored")
+    application_id: Optional[int] = Field(None, description="Only honored for the shared feed token; API key callers are attributed to the key's application")
+    buckets: List[RollupBucket] = Field(..., max_length=MAX_BUCKETS_PER_BATCH)
+
+
+# ==================== ENDPOINTS ====================
+
+@router.post("/decisions/ingest", dependencies=[Depends(verify_ingest_credentials)])
+def ingest_decision_rollups(
+    batch: RollupBatch,
+    api_key: Optional[APIKeyPrincipal] = Depends(get_optional_api_key),
+    db: Session = Depends(get_db)
+):
+    """
+    Add a data plane's per-minute decision counts to the minute, hour and day rollups
+
+    Requires an API key or the shared feed token, even when the policy
+    feed is open. A batch is applied once per ``batch_id``; a repeat is
+    acknowledged without counting again.
+    """
+    application_id = batch.application_id
+    if api_key is not None:
+        # The key's application is authoritative for what its data plane decided; a key whose
+        # application id does not fit the rollup key is counted unattributed, never as the body says
+        application_id = int(api_key.application_id) if str(api_key.application_id).isdigit() else 0
+
+    applied = apply_rollup_batch(
+        db, batch.batch_id, application_id or 0, [bucket.model_dump() for bucket in batch.buckets]
+    )
+    if not applied:
+        logger.info(f"Decision rollup batch {batch.batch_id} already applied, ignoring")
+    return {"batch_id": batch.batch_id, "applied": applied, "buckets": len(batch.buckets)}
+
+
+@router.get("/decisions")
+def get_decision_rollups(
+    granularity: str = Query("hour", pattern="^(minute|hour|day)$"),
+    since: Optional[datetime] = Query(None, description="Start of the window (UTC unless an offset is given)"),
+    until: Optional[datetime] = Query(None, description="End of the window, defaults to now"),
+    application_id: Optional[int] = Query(None),
+    resource_type: Optional[str] = Query(None),
+    action_type: Optional[str] = Query(None),
+    group_by: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(GROUP_COLUMNS)}"),
+    fill: bool = Query(True, description="Include empty buckets"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Allowed and denied decisions per bucket, optionally split by application, resource type and action type
+
+    Served from the rollup rows, so the cost grows with the number of
+    buckets in the window (at most MAX_QUERY_BUCKETS), not with traffic.
+    """
+    if not current_user.is_admin:
+        audit_denied(current_user, "analytics.read", "analytics")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can read decision analytics"
+        )
+
+    columns = tuple(dict.fromkeys(column.strip() for column in (group_by or "").split(",") if column.strip()))
+    unknown = [column for column in columns if column not in GROUP_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown group_by columns: {', '.join(unknown)}. Available: {', '.join(GROUP_COLUMNS)}"
+        )
+
+    until = _naive_utc(until) if until else datetime.utcnow()
+    since = _naive_utc(since) if since else until - DEFAULT_WINDOWS[granularity]
+    if since > until:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'since' must not be after 'until'"
+        )
+    buckets = bucket_count(since, until, granularity)
+    if buckets > MAX_QUERY_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Window spans {buckets} {granularity} buckets (max {MAX_QUERY_BUCKETS}); use a coarser granularity"
+        )
+
+    return query_rollups(
+        db, granularity, since, until,
+        application_id=application_id,
+        resource_type=resource_type,
+        action_type=action_type,
+        group_by=columns,
+        fill=fill
+    )
@@ -21,6 +21,8 @@ try:
         APIKeyListResponse
     )
     from ..dependencies import get_current_user
+    from ..services.api_key_auth import invalidate_api_key
+    from ..services.audit import audit_event
 except ImportError:
     from database_pg import get_db
     from models import Application, APIKey
@@ -35,6 +37,8 @@ except ImportError:
         APIKeyListResponse
     )
     from dependencies import get_current_user
+    from services.api_key_auth import invalidate_api_key
+    from services.audit import audit_event
 
 router = APIRouter(prefix="/applications", tags=["applications"])
 
@@ -72,6 +76,7 @@ def create_application(
     db.commit()
     db.refresh(db_application)
 
+    audit_event(current_user, "application.create", "application", db_application.id, slug=db_application.slug)
     return db_application
 
 
@@ -171,6 +176,7 @@ def update_application(
     db.commit()
     db.refresh(application)
 
+    audit_event(current_user, "application.update", "application", application_id, fields=sorted(update_data))
     return application
 
 
@@ -192,9 +198,13 @@ def delete_application(
             detail=f"Application with ID {application_id} not found"
         )
 
+    key_hashes = [api_key.key_hash for api_key in application.api_keys]
     db.delete(application)
     db.commit()
+    for key_hash in key_hashes:
+        invalidate_api_key(key_hash)
 
+    audit_event(current_user, "application.delete", "application", application_id, api_keys_revoked=len(key_hashes))
     return None
 
 
@@ -239,7 +249,9 @@ def create_api_key(
     db.add(db_api_key)
     db.commit()
     db.refresh(db_api_key)
+    invalidate_api_key(key_hash)
 
+    audit_event(current_user, "api_key.create", "api_key", db_api_key.id, application_id=str(application_id), name=db_api_key.name)
     # Return with plain key
     return APIKeyCreateResponse(
         id=db_api_key.id,
@@ -303,7 +315,9 @@ def delete_api_key(
 
     db.delete(api_key)
     db.commit()
+    invalidate_api_key(api_key.key_hash)
 
+    audit_event(current_user, "api_key.delete", "api_key", api_key_id, application_id=str(application_id))
     return None
 
 
@@ -331,5 +345,7 @@ def deactivate_api_key(
     api_key.is_active = False
     db.commit()
     db.refresh(api_key)
+    invalidate_api_key(api_key.key_hash)
 
+    audit_event(current_user, "api_key.deactivate", "api_key", api_key_id, application_id=str(application_id))
     return api_key.to_dict()
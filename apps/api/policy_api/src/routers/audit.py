@@ -0,0 +1,142 @@
+"""
+Audit router: investigation queries over audit events and authorization decisions (admin only)
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+import time
+
+from database_pg import get_db
+from models.user import User
+from dependencies import get_current_user
+from services.audit import AUDIT_DIR, AUDIT_SINK, AuditQuery, audit_denied, query_audit_files, query_audit_table
+from services.decision_log import DECISION_LOG_DIR, DecisionQuery, ScanStats, query_decisions
+from services.partitions import PruneStats
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1/audit", tags=["audit"])
+
+MAX_RESULTS = 1000
+
+
+def _require_admin(current_user: User, action: str) -> None:
+    if not current_user.is_admin:
+        audit_denied(current_user, f"audit.{action}", "audit")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can search the audit trail"
+        )
+
+
+def _check_window(since: Optional[datetime], until: Optional[datetime]) -> None:
+    if since and until and _utc(since) > _utc(until):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'since' must not be after 'until'"
+        )
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    return int(_utc(value).timestamp() * 1000) if value else None
+
+
+@router.get("/events")
+def search_audit_events(
+    since: Optional[datetime] = Query(None, description="Oldest event time (UTC unless an offset is given)"),
+    until: Optional[datetime] = Query(None, description="Newest event time"),
+    entity_type: Optional[str] = Query(None),
+    entity_id: Optional[str] = Query(None),
+    actor_id: Optional[str] = Query(None),
+    action: Optional[str] = Query(None),
+    outcome: Optional[str] = Query(None, pattern="^(success|denied|failure)$"),
+    limit: int = Query(100, ge=1, le=MAX_RESULTS),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Newest audit events matching the filters
+
+    With ``AUDIT_SINK=file`` only the partitions whose time range and bloom
+    filter may match are read; ``scan`` tells how many were pruned.
+    """
+    _require_admin(current_user, "search")
+    _check_window(since, until)
+
+    query = AuditQuery(
+        since=since, until=until, entity_type=entity_type, entity_id=entity_id,
+        actor_id=actor_id, action=action, outcome=outcome
+    )
+    start = time.perf_counter()
+    scan = None
+    if AUDIT_SINK == "file":
+        stats = PruneStats()
+        events = query_audit_files(AUDIT_DIR, query, limit=limit, stats=stats)
+        scan = stats.to_dict()
+    else:
+        events = query_audit_table(db, query, limit=limit)
+
+    return {
+        "source": AUDIT_SINK,
+        "events": events,
+        "count": len(events),
+        "scan": scan,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
+
+
+@router.get("/decisions")
+def search_decisions(
+    since: Optional[datetime] = Query(None, description="Oldest decision time (UTC unless an offset is given)"),
+    until: Optional[datetime] = Query(None, description="Newest decision time"),
+    principal: Optional[str] = Query(None, description='Exact entity, e.g. User::"alice"'),
+    action: Optional[str] = Query(None),
+    resource: Optional[str] = Query(None, description='Exact entity, e.g. Document::"123"'),
+    decision: Optional[str] = Query(None, pattern="^(allow|deny)$"),
+    limit: int = Query(100, ge=1, le=MAX_RESULTS),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Authorization decisions recorded by the Business API decision log, oldest first
+
+    Reads the segments under DECISION_LOG_DIR (shared with the Business
+    API). Segments are pruned by name and partition index, then blocks by
+    their headers and dictionaries, before any column is decompressed.
+    Allows may be sampled: ``weight`` is the number of decisions a record
+    stands for.
+    """
+    _require_admin(current_user, "decisions")
+    _check_window(since, until)
+
+    query = DecisionQuery(
+        since=_epoch_ms(since),
+        until=_epoch_ms(until),
+        principal=principal,
+        action=action,
+        resource=resource,
+        allow=None if decision is None else decision == "allow"
+    )
+    start = time.perf_counter()
+    stats = ScanStats()
+    decisions = [
+        {**record, "ts": datetime.fromtimestamp(record["ts"] / 1000, tz=timezone.utc).isoformat().replace("+00:00", "Z")}
+        for record in query_decisions(DECISION_LOG_DIR, query, limit=limit, stats=stats)
+    ]
+
+    return {
+        "decisions": decisions,
+        "count": len(decisions),
+        "scan": {
+            "segments": stats.prune.to_dict(),
+            "blocks_read": stats.blocks,
+            "blocks_skipped": stats.blocks_skipped,
+            "records_scanned": stats.records_scanned
+        },
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
@@ -10,7 +10,7 @@ import bcrypt
 from sqlalchemy.orm import Session
 
 from database_pg import get_db
-from models.user import User
+from models.user import KEYCLOAK_MANAGED_PASSWORD, User
 from auth.jwt import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from schemas.auth import LoginRequest, TokenResponse, UserResponse
 from dependencies import get_current_user
@@ -24,8 +24,13 @@ router = APIRouter(
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    """Verify password against hash (False for users without a local password)"""
+    if not hashed_password or hashed_password == KEYCLOAK_MANAGED_PASSWORD:
+        return False
+    try:
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except ValueError:
+        return False
 
 
 def authenticate_user_db(email: str, password: str, db: Session) -> User:
@@ -46,82 +51,10 @@ async def login(
     db: Session = Depends(get_db)
 ):
     """
-    Authenticate user and return JWT token (with Keycloak integration)
+    Authenticate user against the database and return JWT token
     """
     try:
-        # First try Keycloak authentication
-        import requests
-        import os
-        
-        keycloak_url = os.getenv("KEYCLOAK_URL", "http://localhost:8080")
-        realm = os.getenv("KEYCLOAK_REALM", "sentinela")
-        client_id = os.getenv("KEYCLOAK_CLIENT_ID", "sentinela-api")
-        client_secret = os.getenv("KEYCLOAK_CLIENT_SECRET", "sentinela-secret")
-        
-        # Try Keycloak authentication
-        try:
-            data = {
-                "grant_type": "password",
-                "client_id": client_id,
-                "client_secret": client_secret,
-                "username": credentials.email,
-                "password": credentials.password
-            }
-            
-            response = requests.post(
-                f"{keycloak_url}/realms/{realm}/protocol/openid-connect/token",
-                data=data,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                # Keycloak authentication successful
-                token_data = response.json()
-                
-                # Get or create user in local database
-                user = db.query(User).filter(User.email == credentials.email).first()
-                
-                if not user:
-                    # Create user in local database if not exists
-                    user = User(
-                        email=credentials.email,
-                        name=credentials.email.split("@")[0],  # Extract name from email
-                        status="active",
-                        role="user"  # Default role
-                    )
-                    db.add(user)
-                    db.commit()
-                    db.refresh(user)
-                
-                # Create our own JWT token for API access
-                access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-                access_token = create_access_token(
-                    data={"sub": str(user.id), "email": user.email, "role": user.role},
-                    expires_delta=access_token_expires
-                )
-                
-                # Prepare user response
-                user_response = UserResponse(
-                    email=user.email,
-                    username=user.email.split("@")[0],
-                    full_name=user.name,
-                    is_active=user.status == "active",
-                    is_superuser=user.role == "admin",
-                    groups=[]
-                )
-                
-                return TokenResponse(
-                    access_token=access_token,
-                    token_type="bearer",
-                    expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-                    user=user_response
-                )
-        
-        except Exception as e:
-            logger.warning(f"Keycloak authentication failed: {e}")
-        
-        # Fallback to database authentication
+        # Local provider: the database is the only source of credentials
         user = authenticate_user_db(credentials.email, credentials.password, db)
         if not user:
             raise HTTPException(
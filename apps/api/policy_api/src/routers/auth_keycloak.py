@@ -3,17 +3,15 @@ Keycloak Authentication Router
 Provides endpoints for user authentication using Keycloak
 """
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
 from datetime import timedelta
 import logging
-import os
 from sqlalchemy.orm import Session
 
 from database_pg import get_db
-from models.user import User
+from models.user import KEYCLOAK_MANAGED_PASSWORD, User
 from auth.jwt import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from schemas.auth import LoginRequest, TokenResponse, UserResponse
-from services.keycloak_service import KeycloakService
 from dependencies import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -23,17 +21,23 @@ router = APIRouter(
     tags=["Authentication"]
 )
 
-# Initialize Keycloak service
-keycloak_service = KeycloakService(
-    server_url=os.getenv("KEYCLOAK_URL", "http://localhost:8080"),
-    realm=os.getenv("KEYCLOAK_REALM", "sentinela")
-)
+
+def get_keycloak_service(request: Request):
+    """Keycloak client created by the application lifespan"""
+    keycloak_service = request.app.state.keycloak_service
+    if keycloak_service is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Keycloak authentication is not initialized"
+        )
+    return keycloak_service
 
 
 @router.post("/login", response_model=TokenResponse, status_code=status.HTTP_200_OK)
 async def login(
     credentials: LoginRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    keycloak_service=Depends(get_keycloak_service)
 ):
     """
     Authenticate user with Keycloak and return JWT token
@@ -60,6 +64,8 @@ async def login(
             user = User(
                 email=keycloak_auth["user"]["email"],
                 name=keycloak_auth["user"].get("name", ""),
+                password_hash=KEYCLOAK_MANAGED_PASSWORD,
+                keycloak_id=keycloak_auth["user"].get("id"),
                 status="active",
                 role="user"  # Default role
             )
@@ -145,7 +151,7 @@ async def logout(
 
 
 @router.get("/health", status_code=status.HTTP_200_OK)
-async def auth_health():
+async def auth_health(keycloak_service=Depends(get_keycloak_service)):
     """
     Health check for authentication service
     """
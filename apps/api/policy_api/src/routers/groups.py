@@ -20,6 +20,7 @@ from schemas.user_group import (
     BulkUserGroupOperation
 )
 from dependencies import get_current_user
+from services.audit import audit_denied, audit_event
 
 router = APIRouter(prefix="/api/v1/groups", tags=["groups"])
 
@@ -34,6 +35,7 @@ async def create_group(
     
     # Check if current user is admin
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "group.create", "group", name=group_data.name)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can create groups"
@@ -68,6 +70,7 @@ async def create_group(
     db.commit()
     db.refresh(db_group)
     
+    audit_event(current_user, "group.create", "group", db_group.id, name=db_group.name, parent_id=db_group.parent_id)
     return db_group
 
 
@@ -165,6 +168,7 @@ async def update_group(
     
     # Only admins can update groups
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "group.update", "group", group_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can update groups"
@@ -211,6 +215,7 @@ async def update_group(
     db.commit()
     db.refresh(group)
     
+    audit_event(current_user, "group.update", "group", group_id, fields=sorted(update_data))
     return group
 
 
@@ -224,6 +229,7 @@ async def delete_group(
     
     # Only admins can delete groups
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "group.delete", "group", group_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can delete groups"
@@ -256,6 +262,7 @@ async def delete_group(
     db.delete(group)
     db.commit()
     
+    audit_event(current_user, "group.delete", "group", group_id)
     return {"message": "Group deleted successfully"}
 
 
@@ -298,6 +305,7 @@ async def add_user_to_group(
     
     # Only admins can manage group memberships
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "group.add_member", "group", group_id, user_id=user_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can manage group memberships"
@@ -338,6 +346,7 @@ async def add_user_to_group(
             existing_membership.added_by = current_user.id
             db.commit()
             db.refresh(existing_membership)
+            audit_event(current_user, "group.add_member", "group", group_id, user_id=user_id, reactivated=True)
             return existing_membership
     
     # Create new user-group association
@@ -352,6 +361,7 @@ async def add_user_to_group(
     db.commit()
     db.refresh(user_group)
     
+    audit_event(current_user, "group.add_member", "group", group_id, user_id=user_id)
     return user_group
 
 
@@ -366,6 +376,7 @@ async def remove_user_from_group(
     
     # Only admins can manage group memberships
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "group.remove_member", "group", group_id, user_id=user_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can manage group memberships"
@@ -404,6 +415,7 @@ async def remove_user_from_group(
     user_group.is_active = 0
     db.commit()
     
+    audit_event(current_user, "group.remove_member", "group", group_id, user_id=user_id)
     return {"message": "User removed from group successfully"}
 
 
@@ -465,6 +477,7 @@ async def add_multiple_users_to_group(
     
     # Only admins can manage group memberships
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "group.add_members", "group", group_id, user_ids=operation.user_ids)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can manage group memberships"
@@ -527,6 +540,7 @@ async def add_multiple_users_to_group(
     
     db.commit()
     
+    audit_event(current_user, "group.add_members", "group", group_id, added=added_count, skipped=skipped_count)
     return {
         "message": f"Bulk operation completed",
         "added_count": added_count,
@@ -545,6 +559,7 @@ async def get_user_groups(
     
     # Users can view their own groups, admins can view any user's groups
     if current_user.role.value != 'admin' and current_user.id != user_id:
+        audit_denied(current_user, "group.list_user_groups", "user", user_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only view your own group memberships"
@@ -1,64 +1,93 @@
 """
-Health check router
+Health check router with liveness and readiness probes
 """
 
-import sys
-import os
-
-# Add parent directory to Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from datetime import datetime
+from typing import List, Optional
 import asyncio
 
-import database
+from database_pg import engine
+from services.resilience import CircuitBreaker
+from services.health import HEALTH_CHECK_TIMEOUT, HealthCheck, HealthProbe
+from services.keycloak_admin import get_shared_keycloak_admin
+from services.opal_publisher import get_policy_publisher
 
-router = APIRouter()
+router = APIRouter(prefix="/health", tags=["health"])
 
 
-@router.get("/")
-async def health_check(db: Session = Depends(database.get_db)):
-    """Basic health check"""
-    try:
-        # Test database connection
-        db.execute(text("SELECT 1"))
-        db_status = "healthy"
-    except Exception:
-        db_status = "unhealthy"
-    
+def _ping_database() -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def check_database() -> Optional[str]:
+    await asyncio.to_thread(_ping_database)
+    return None
+
+
+async def check_keycloak() -> Optional[str]:
+    keycloak_admin = get_shared_keycloak_admin()
+    # An open breaker already knows Keycloak is down; don't add to its load
+    if keycloak_admin.breaker.state == CircuitBreaker.OPEN:
+        raise RuntimeError("circuit breaker open")
+    response = await keycloak_admin.client.get(
+        f"{keycloak_admin.server_url}/realms/{keycloak_admin.realm}",
+        timeout=HEALTH_CHECK_TIMEOUT
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return None
+
+
+async def check_opal() -> Optional[str]:
+    if not await get_policy_publisher().opal.health_check():
+        raise RuntimeError("OPAL server unhealthy")
+    return None
+
+
+_probe: Optional[HealthProbe] = None
+
+
+def get_health_probe() -> HealthProbe:
+    """
+    Get the process-wide probe
+
+    Built on first use, after startup, so OPAL is only checked when the
+    publisher is running. Keycloak and OPAL are not critical: without them
+    policies can still be served, so they degrade but never fail readiness.
+    """
+    global _probe
+    if _probe is None:
+        checks: List[HealthCheck] = [
+            HealthCheck("database", check_database),
+            HealthCheck("keycloak", check_keycloak, critical=False),
+        ]
+        if get_policy_publisher() is not None:
+            checks.append(HealthCheck("opal", check_opal, critical=False))
+        _probe = HealthProbe(checks)
+    return _probe
+
+
+@router.get("/live")
+async def liveness():
+    """Liveness probe: the process is serving requests (no dependency checks)"""
     return {
-        "status": "healthy" if db_status == "healthy" else "unhealthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "services": {
-            "database": db_status
-        }
+        "status": "alive",
+        "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
 
-@router.get("/detailed")
-async def detailed_health_check(db: Session = Depends(database.get_db)):
-    """Detailed health check including external services"""
-    health_status = {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "services": {}
-    }
-    
-    # Check database
-    try:
-        db.execute(text("SELECT 1"))
-        health_status["services"]["database"] = "healthy"
-    except Exception as e:
-        health_status["services"]["database"] = f"unhealthy: {str(e)}"
-        health_status["status"] = "unhealthy"
-    
-    # Check OPAL service
-    health_status["services"]["opal"] = "not_initialized"
-    
-    # Check Keycloak service
-    health_status["services"]["keycloak"] = "not_initialized"
-    
-    return health_status
\ No newline at end of file
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: 503 while a critical dependency is down"""
+    result = await get_health_probe().readiness()
+    return JSONResponse(status_code=200 if result["ready"] else 503, content=result)
+
+
+@router.get("/")
+async def health_check():
+    """Basic health check (same result as the readiness probe)"""
+    return await readiness()
@@ -6,10 +6,9 @@ Exposes Keycloak group management via REST API
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-import os
 import logging
 
-from services.keycloak_admin import KeycloakAdminService
+from services.keycloak_admin import KeycloakAdminService, KeycloakUnavailableError, get_shared_keycloak_admin
 
 logger = logging.getLogger(__name__)
 
@@ -45,27 +44,8 @@ class GroupMembershipRequest(BaseModel):
 # ==================== DEPENDENCIES ====================
 
 async def get_keycloak_admin() -> KeycloakAdminService:
-    """Get Keycloak Admin Service instance"""
-    server_url = os.getenv("KEYCLOAK_URL", "http://localhost:8080")
-    realm = os.getenv("KEYCLOAK_REALM", "sentinela")
-    client_id = os.getenv("KEYCLOAK_CLIENT_ID", "sentinela-api")
-    client_secret = os.getenv("KEYCLOAK_CLIENT_SECRET", "sentinela-secret")
-    admin_username = os.getenv("KEYCLOAK_ADMIN_USERNAME", "admin")
-    admin_password = os.getenv("KEYCLOAK_ADMIN_PASSWORD", "admin123")
-
-    service = KeycloakAdminService(
-        server_url=server_url,
-        realm=realm,
-        client_id=client_id,
-        client_secret=client_secret,
-        admin_username=admin_username,
-        admin_password=admin_password
-    )
-
-    try:
-        yield service
-    finally:
-        await service.close()
+    """Get the shared Keycloak Admin Service (token, connections and read cache are reused)"""
+    return get_shared_keycloak_admin()
 
 
 # ==================== ENDPOINTS ====================
@@ -82,16 +62,16 @@ async def list_groups(
         # Calculate offset
         first = (page - 1) * perPage
 
-        # Get groups from Keycloak
-        groups_data = await keycloak.list_groups(
-            search=search,
-            first=first,
-            max=perPage
+        # Get groups and total count from Keycloak concurrently
+        groups_data, total = await keycloak.gather(
+            keycloak.list_groups(
+                search=search,
+                first=first,
+                max=perPage
+            ),
+            keycloak.get_group_count()
         )
 
-        # Get total count
-        total = await keycloak.get_group_count()
-
         # Convert to response model
         groups = [
             GroupResponse(
@@ -111,6 +91,8 @@ async def list_groups(
             "perPage": perPage
         }
 
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error listing groups: {e}")
         raise HTTPException(
@@ -119,6 +101,39 @@ async def list_groups(
         )
 
 
+@router.get("/members/batch")
+async def get_groups_members(
+    groupIds: List[str] = Query(..., description="Group IDs (repeat the parameter for each group)"),
+    perGroup: int = Query(50, ge=1, le=100, description="Members returned per group"),
+    keycloak: KeycloakAdminService = Depends(get_keycloak_admin)
+):
+    """Get members of several groups in one call"""
+    if len(groupIds) > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At most 100 groups can be requested at once"
+        )
+
+    try:
+        members = await keycloak.get_groups_members(groupIds, max=perGroup)
+
+        return {
+            "groups": [
+                {"groupId": group_id, "members": group_members, "total": len(group_members)}
+                for group_id, group_members in members.items()
+            ]
+        }
+
+    except KeycloakUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting members for groups {groupIds}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get group members: {str(e)}"
+        )
+
+
 @router.get("/{group_id}", response_model=GroupResponse)
 async def get_group(
     group_id: str,
@@ -144,6 +159,8 @@ async def get_group(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting group {group_id}: {e}")
         raise HTTPException(
@@ -178,6 +195,8 @@ async def create_group(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error creating group: {e}")
         raise HTTPException(
@@ -210,6 +229,8 @@ async def update_group(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error updating group {group_id}: {e}")
         raise HTTPException(
@@ -237,6 +258,8 @@ async def delete_group(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error deleting group {group_id}: {e}")
         raise HTTPException(
@@ -270,6 +293,8 @@ async def get_group_members(
             "perPage": perPage
         }
 
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting members for group {group_id}: {e}")
         raise HTTPException(
@@ -298,6 +323,8 @@ async def add_user_to_group(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error adding user {user_id} to group {group_id}: {e}")
         raise HTTPException(
@@ -326,6 +353,8 @@ async def remove_user_from_group(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error removing user {user_id} from group {group_id}: {e}")
         raise HTTPException(
@@ -340,12 +369,22 @@ async def get_group_stats(
 ):
     """Get group statistics"""
     try:
-        total_groups = await keycloak.get_group_count()
+        total_groups, groups = await keycloak.gather(
+            keycloak.get_group_count(),
+            keycloak.list_groups(first=0, max=1000)
+        )
+
+        # Members paged per group, groups counted concurrently
+        member_counts = await keycloak.count_groups_members([group["id"] for group in groups])
 
         return {
-            "totalGroups": total_groups
+            "totalGroups": total_groups,
+            "emptyGroups": sum(1 for count in member_counts.values() if not count),
+            "totalMemberships": sum(member_counts.values())
         }
 
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting group stats: {e}")
         raise HTTPException(
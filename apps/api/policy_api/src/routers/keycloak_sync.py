@@ -0,0 +1,58 @@
+"""
+Keycloak Sync Router
+Triggers and inspects the Keycloak-to-local reconciliation
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+
+from models.user import User, UserRole
+from dependencies import get_current_user
+from services.keycloak_admin import KeycloakUnavailableError
+from services.keycloak_sync import KeycloakSyncService, SyncAborted, get_sync_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/keycloak/sync", tags=["keycloak-sync"])
+
+
+@router.post("/")
+async def run_sync(
+    current_user: User = Depends(get_current_user),
+    sync_service: KeycloakSyncService = Depends(get_sync_service)
+):
+    """Run a Keycloak sync now and return its result"""
+
+    # Only admins can trigger a sync
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can trigger a Keycloak sync"
+        )
+
+    try:
+        result = await sync_service.sync()
+        return result.to_dict()
+
+    except SyncAborted as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Sync aborted: {str(e)}"
+        )
+    except KeycloakUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error running Keycloak sync: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to run Keycloak sync: {str(e)}"
+        )
+
+
+@router.get("/status")
+async def get_sync_status(
+    current_user: User = Depends(get_current_user),
+    sync_service: KeycloakSyncService = Depends(get_sync_service)
+):
+    """Get the state of the background sync and its last result"""
+    return sync_service.status()
@@ -6,10 +6,9 @@ Exposes Keycloak user management via REST API
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
-import os
 import logging
 
-from services.keycloak_admin import KeycloakAdminService
+from services.keycloak_admin import KeycloakAdminService, KeycloakUnavailableError, get_shared_keycloak_admin
 
 logger = logging.getLogger(__name__)
 
@@ -62,27 +61,8 @@ class UserListResponse(BaseModel):
 # ==================== DEPENDENCIES ====================
 
 async def get_keycloak_admin() -> KeycloakAdminService:
-    """Get Keycloak Admin Service instance"""
-    server_url = os.getenv("KEYCLOAK_URL", "http://localhost:8080")
-    realm = os.getenv("KEYCLOAK_REALM", "sentinela")
-    client_id = os.getenv("KEYCLOAK_CLIENT_ID", "sentinela-api")
-    client_secret = os.getenv("KEYCLOAK_CLIENT_SECRET", "sentinela-secret")
-    admin_username = os.getenv("KEYCLOAK_ADMIN_USERNAME", "admin")
-    admin_password = os.getenv("KEYCLOAK_ADMIN_PASSWORD", "admin123")
-
-    service = KeycloakAdminService(
-        server_url=server_url,
-        realm=realm,
-        client_id=client_id,
-        client_secret=client_secret,
-        admin_username=admin_username,
-        admin_password=admin_password
-    )
-
-    try:
-        yield service
-    finally:
-        await service.close()
+    """Get the shared Keycloak Admin Service (token, connections and read cache are reused)"""
+    return get_shared_keycloak_admin()
 
 
 # ==================== ENDPOINTS ====================
@@ -102,19 +82,19 @@ async def list_users(
         # Calculate offset
         first = (page - 1) * perPage
 
-        # Get users from Keycloak
-        users_data = await keycloak.list_users(
-            search=search,
-            first=first,
-            max=perPage,
-            email=email,
-            username=username,
-            enabled=enabled
+        # Get users and total count from Keycloak concurrently
+        users_data, total = await keycloak.gather(
+            keycloak.list_users(
+                search=search,
+                first=first,
+                max=perPage,
+                email=email,
+                username=username,
+                enabled=enabled
+            ),
+            keycloak.get_user_count()
         )
 
-        # Get total count
-        total = await keycloak.get_user_count()
-
         # Convert to response model
         users = [
             UserResponse(
@@ -137,6 +117,8 @@ async def list_users(
             perPage=perPage
         )
 
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error listing users: {e}")
         raise HTTPException(
@@ -173,6 +155,8 @@ async def get_user(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting user {user_id}: {e}")
         raise HTTPException(
@@ -212,6 +196,8 @@ async def create_user(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error creating user: {e}")
         raise HTTPException(
@@ -246,6 +232,8 @@ async def update_user(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error updating user {user_id}: {e}")
         raise HTTPException(
@@ -273,6 +261,8 @@ async def delete_user(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error deleting user {user_id}: {e}")
         raise HTTPException(
@@ -305,6 +295,8 @@ async def reset_password(
 
     except HTTPException:
         raise
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error resetting password for user {user_id}: {e}")
         raise HTTPException(
@@ -323,6 +315,8 @@ async def get_user_groups(
         groups = await keycloak.get_user_groups(user_id)
         return {"groups": groups}
 
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting groups for user {user_id}: {e}")
         raise HTTPException(
@@ -337,11 +331,12 @@ async def get_user_stats(
 ):
     """Get user statistics"""
     try:
-        total_users = await keycloak.get_user_count()
-
         # Get all users to calculate stats (for small datasets)
         # In production, consider caching or separate API calls
-        users = await keycloak.list_users(first=0, max=1000)
+        total_users, users = await keycloak.gather(
+            keycloak.get_user_count(),
+            keycloak.list_users(first=0, max=1000)
+        )
 
         active_users = sum(1 for u in users if u.get("enabled", False))
         inactive_users = total_users - active_users
@@ -352,6 +347,8 @@ async def get_user_stats(
             "inactiveUsers": inactive_users
         }
 
+    except KeycloakUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting user stats: {e}")
         raise HTTPException(
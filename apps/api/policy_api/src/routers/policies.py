@@ -9,13 +9,23 @@ from datetime import datetime
 import logging
 
 from database_pg import get_db
-from models.policy import Policy, PolicyStatus
+from models.policy import Policy, PolicyStatus, compute_content_hash
+from models.policy_version import PolicyVersion
 from models.user import User
 from schemas.policy import (
     PolicyCreate, PolicyUpdate, PolicyResponse, PolicyListResponse,
-    PolicyValidationRequest, PolicyValidationResponse
+    PolicyValidationRequest, PolicyValidationResponse,
+    PolicyVersionDetailResponse, PolicyVersionListResponse,
+    PolicyDiffResponse, PolicyRollbackRequest
 )
 from dependencies import get_current_user
+from services.opal_publisher import record_policy_event, notify_policy_publisher
+from services.audit import audit_denied, audit_event
+from services.policy_feed import notify_policy_feed
+from services.policy_versions import (
+    diff_versions, get_content, get_version, list_versions, next_version,
+    record_version, rollback_policy
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/policies", tags=["policies"])
@@ -31,6 +41,7 @@ async def create_policy(
     
     # Only admins can create policies
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "policy.create", "policy", name=policy_data.name)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can create policies"
@@ -49,14 +60,18 @@ async def create_policy(
         name=policy_data.name,
         description=policy_data.description,
         content=policy_data.content,
+        application_id=policy_data.application_id,
         version="1.0.0",
         status=PolicyStatus.DRAFT
     )
     
     db.add(db_policy)
+    db.flush()
+    record_version(db, db_policy, user_id=current_user.id)
     db.commit()
     db.refresh(db_policy)
     
+    audit_event(current_user, "policy.create", "policy", db_policy.id, name=db_policy.name, version=db_policy.version)
     logger.info(f"Policy {db_policy.id} created successfully")
     return db_policy
 
@@ -127,6 +142,7 @@ async def update_policy(
     
     # Only admins can update policies
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "policy.update", "policy", policy_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can update policies"
@@ -148,21 +164,36 @@ async def update_policy(
                 detail="Policy name already exists"
             )
     
+    was_active = policy.status == PolicyStatus.ACTIVE
+    content_changed = (
+        policy_data.content is not None
+        and compute_content_hash(policy_data.content) != policy.content_hash
+    )
+
     # Update fields
     update_data = policy_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(policy, field, value)
     
-    # Increment version if content changed
-    if policy_data.content:
-        current_version = policy.version.split(".")
-        current_version[-1] = str(int(current_version[-1]) + 1)
-        policy.version = ".".join(current_version)
+    # Append a new version if content changed
+    if content_changed:
+        policy.version = next_version(db, policy)
+        record_version(db, policy, user_id=current_user.id)
     
     policy.updated_at = datetime.utcnow()
+
+    # Data planes only hold active policies
+    if policy.status == PolicyStatus.ACTIVE:
+        record_policy_event(db, policy, "upsert")
+    elif was_active:
+        record_policy_event(db, policy, "delete")
+
     db.commit()
     db.refresh(policy)
+    notify_policy_publisher()
+    notify_policy_feed()
     
+    audit_event(current_user, "policy.update", "policy", policy_id, fields=sorted(update_data), version=policy.version)
     logger.info(f"Policy {policy_id} updated successfully")
     return policy
 
@@ -177,6 +208,7 @@ async def delete_policy(
     
     # Only admins can delete policies
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "policy.delete", "policy", policy_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can delete policies"
@@ -199,6 +231,7 @@ async def delete_policy(
     db.delete(policy)
     db.commit()
     
+    audit_event(current_user, "policy.delete", "policy", policy_id)
     logger.info(f"Policy {policy_id} deleted successfully")
 
 
@@ -212,6 +245,7 @@ async def publish_policy(
     
     # Only admins can publish policies
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "policy.publish", "policy", policy_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can publish policies"
@@ -226,9 +260,13 @@ async def publish_policy(
     
     policy.status = PolicyStatus.ACTIVE
     policy.updated_at = datetime.utcnow()
+    record_policy_event(db, policy, "upsert")
     db.commit()
     db.refresh(policy)
+    notify_policy_publisher()
+    notify_policy_feed()
     
+    audit_event(current_user, "policy.publish", "policy", policy_id, version=policy.version)
     logger.info(f"Policy {policy_id} published successfully")
     return policy
 
@@ -243,6 +281,7 @@ async def deactivate_policy(
     
     # Only admins can deactivate policies
     if current_user.role.value != 'admin':
+        audit_denied(current_user, "policy.deactivate", "policy", policy_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can deactivate policies"
@@ -255,15 +294,143 @@ async def deactivate_policy(
             detail="Policy not found"
         )
     
+    was_active = policy.status == PolicyStatus.ACTIVE
     policy.status = PolicyStatus.INACTIVE
     policy.updated_at = datetime.utcnow()
+    if was_active:
+        record_policy_event(db, policy, "delete")
     db.commit()
     db.refresh(policy)
+    notify_policy_publisher()
+    notify_policy_feed()
     
+    audit_event(current_user, "policy.deactivate", "policy", policy_id)
     logger.info(f"Policy {policy_id} deactivated successfully")
     return policy
 
 
+# ==================== VERSIONS ====================
+
+def _get_policy_or_404(db: Session, policy_id: int) -> Policy:
+    policy = db.query(Policy).filter(Policy.id == policy_id).first()
+    if not policy:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Policy not found"
+        )
+    return policy
+
+
+def _get_version_or_404(db: Session, policy_id: int, version: str) -> PolicyVersion:
+    policy_version = get_version(db, policy_id, version)
+    if not policy_version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Version {version} not found"
+        )
+    return policy_version
+
+
+def _version_response(policy: Policy, policy_version: PolicyVersion) -> dict:
+    return {**policy_version.to_dict(), "is_current": policy_version.id == policy.current_version_id}
+
+
+@router.get("/{policy_id}/versions", response_model=PolicyVersionListResponse)
+async def list_policy_versions(
+    policy_id: int,
+    skip: int = Query(0, ge=0, description="Number of versions to skip"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of versions to return"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Version history of a policy, newest first"""
+    
+    policy = _get_policy_or_404(db, policy_id)
+    versions = list_versions(db, policy_id, skip=skip, limit=limit)
+    
+    return PolicyVersionListResponse(
+        versions=[_version_response(policy, v) for v in versions],
+        current_version=policy.version,
+        skip=skip,
+        limit=limit
+    )
+
+
+@router.get("/{policy_id}/versions/{version}", response_model=PolicyVersionDetailResponse)
+async def get_policy_version(
+    policy_id: int,
+    version: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get one version of a policy with its content"""
+    
+    policy = _get_policy_or_404(db, policy_id)
+    policy_version = _get_version_or_404(db, policy_id, version)
+    
+    return {**_version_response(policy, policy_version), "content": get_content(db, policy_version.content_hash)}
+
+
+@router.get("/{policy_id}/diff", response_model=PolicyDiffResponse)
+async def diff_policy_versions(
+    policy_id: int,
+    from_version: str = Query(..., description="Base version"),
+    to_version: Optional[str] = Query(None, description="Compared version (defaults to the current one)"),
+    context: int = Query(3, ge=0, le=50, description="Lines of context around changes"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Unified diff between two versions of a policy"""
+    
+    policy = _get_policy_or_404(db, policy_id)
+    old = _get_version_or_404(db, policy_id, from_version)
+    new = _get_version_or_404(db, policy_id, to_version or policy.version)
+    
+    return diff_versions(db, old, new, context=context)
+
+
+@router.post("/{policy_id}/rollback", response_model=PolicyResponse)
+async def rollback_policy_version(
+    policy_id: int,
+    rollback_request: PolicyRollbackRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Roll a policy back to a previous version
+
+    Moves the current-version pointer without writing new history, and
+    publishes the change to data planes without waiting for the debounce.
+    """
+    
+    # Only admins can roll back policies
+    if not current_user.is_admin:
+        audit_denied(current_user, "policy.rollback", "policy", policy_id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can roll back policies"
+        )
+    
+    policy = _get_policy_or_404(db, policy_id)
+    target = _get_version_or_404(db, policy_id, rollback_request.version)
+    if target.id == policy.current_version_id:
+        return policy
+    
+    previous_version = policy.version
+    rollback_policy(db, policy, target)
+    policy.updated_at = datetime.utcnow()
+    if policy.status == PolicyStatus.ACTIVE:
+        record_policy_event(db, policy, "upsert")
+    db.commit()
+    db.refresh(policy)
+    notify_policy_publisher(immediate=True)
+    notify_policy_feed()
+    
+    audit_event(current_user, "policy.rollback", "policy", policy_id, from_version=previous_version, to_version=target.version)
+    logger.info(f"Policy {policy_id} rolled back from {previous_version} to {target.version}")
+    return policy
+
+
 @router.post("/validate", response_model=PolicyValidationResponse)
 async def validate_policy(
     validation_request: PolicyValidationRequest,
@@ -0,0 +1,214 @@
+"""
+Policy changeset router for atomic multi-policy changes
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+import logging
+
+from database_pg import get_db
+from models.policy_changeset import PolicyChangeset
+from models.user import User
+from schemas.policy_changeset import (
+    ChangesetCreate, ChangesetOperationsAppend, ChangesetResponse,
+    ChangesetListResponse, ChangesetValidationResponse
+)
+from dependencies import get_current_user
+from services.audit import audit_denied, audit_event
+from services.opal_publisher import notify_policy_publisher
+from services.policy_changesets import ChangesetError, commit_changeset, validate_operations
+from services.policy_feed import notify_policy_feed
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/v1/policy-changesets", tags=["policy-changesets"])
+
+
+def _require_admin(current_user: User, action: str) -> None:
+    if not current_user.is_admin:
+        audit_denied(current_user, f"policy_changeset.{action}", "policy_changeset")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Only admins can {action} changesets"
+        )
+
+
+def _get_changeset_or_404(db: Session, changeset_id: int) -> PolicyChangeset:
+    changeset = db.query(PolicyChangeset).filter(PolicyChangeset.id == changeset_id).first()
+    if not changeset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Changeset not found"
+        )
+    return changeset
+
+
+def _require_draft(changeset: PolicyChangeset) -> None:
+    if changeset.status != "draft":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Changeset is {changeset.status}"
+        )
+
+
+@router.post("/", response_model=ChangesetResponse, status_code=status.HTTP_201_CREATED)
+async def create_changeset(
+    changeset_data: ChangesetCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create a draft changeset, optionally with its operations"""
+
+    _require_admin(current_user, "create")
+
+    changeset = PolicyChangeset(
+        name=changeset_data.name,
+        description=changeset_data.description,
+        operations=[op.model_dump(exclude_none=True) for op in changeset_data.operations],
+        status="draft",
+        created_by=current_user.id
+    )
+    db.add(changeset)
+    db.commit()
+    db.refresh(changeset)
+
+    audit_event(current_user, "policy_changeset.create", "policy_changeset", changeset.id, operations=len(changeset.operations))
+    logger.info(f"Changeset {changeset.id} created with {len(changeset.operations)} operations")
+    return changeset
+
+
+@router.get("/", response_model=ChangesetListResponse)
+async def list_changesets(
+    skip: int = Query(0, ge=0, description="Number of changesets to skip"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of changesets to return"),
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(draft|committed|discarded)$", description="Filter by status"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List changesets, newest first"""
+
+    query = db.query(PolicyChangeset)
+    if status_filter:
+        query = query.filter(PolicyChangeset.status == status_filter)
+
+    total = query.count()
+    changesets = query.order_by(PolicyChangeset.id.desc()).offset(skip).limit(limit).all()
+
+    return ChangesetListResponse(
+        changesets=changesets,
+        total=total,
+        skip=skip,
+        limit=limit
+    )
+
+
+@router.get("/{changeset_id}", response_model=ChangesetResponse)
+async def get_changeset(
+    changeset_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get changeset by ID"""
+    return _get_changeset_or_404(db, changeset_id)
+
+
+@router.post("/{changeset_id}/operations", response_model=ChangesetResponse)
+async def append_operations(
+    changeset_id: int,
+    operations_data: ChangesetOperationsAppend,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stage more operations on a draft changeset"""
+
+    _require_admin(current_user, "edit")
+
+    changeset = _get_changeset_or_404(db, changeset_id)
+    _require_draft(changeset)
+
+    # Reassign (not append in place) so the JSON column is flagged dirty
+    staged = [op.model_dump(exclude_none=True) for op in operations_data.operations]
+    changeset.operations = list(changeset.operations or []) + staged
+    db.commit()
+    db.refresh(changeset)
+    audit_event(current_user, "policy_changeset.edit", "policy_changeset", changeset_id, operations_added=len(staged))
+    return changeset
+
+
+@router.post("/{changeset_id}/validate", response_model=ChangesetValidationResponse)
+async def validate_changeset(
+    changeset_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Validate all staged operations together without applying them"""
+
+    changeset = _get_changeset_or_404(db, changeset_id)
+    errors = validate_operations(db, changeset.operations or [])
+    return ChangesetValidationResponse(valid=not errors, errors=errors)
+
+
+@router.post("/{changeset_id}/commit", response_model=ChangesetResponse)
+async def commit_changeset_endpoint(
+    changeset_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Commit a changeset as a single policy-set version
+
+    All operations are applied in one transaction with one distribution
+    event; if any operation is invalid nothing is applied.
+    """
+
+    _require_admin(current_user, "commit")
+    _get_changeset_or_404(db, changeset_id)
+
+    try:
+        changeset = commit_changeset(db, changeset_id, user_id=current_user.id)
+        db.commit()
+    except ChangesetError as e:
+        db.rollback()
+        audit_event(current_user, "policy_changeset.commit", "policy_changeset", changeset_id, outcome="failure", error=str(e))
+        if e.errors:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"message": str(e), "errors": e.errors}
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error committing changeset {changeset_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to commit changeset"
+        )
+
+    db.refresh(changeset)
+    notify_policy_publisher()
+    notify_policy_feed()
+    audit_event(current_user, "policy_changeset.commit", "policy_changeset", changeset_id, operations=len(changeset.operations or []))
+    return changeset
+
+
+@router.post("/{changeset_id}/discard", response_model=ChangesetResponse)
+async def discard_changeset(
+    changeset_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Discard a draft changeset"""
+
+    _require_admin(current_user, "discard")
+
+    changeset = _get_changeset_or_404(db, changeset_id)
+    _require_draft(changeset)
+
+    changeset.status = "discarded"
+    db.commit()
+    db.refresh(changeset)
+    audit_event(current_user, "policy_changeset.discard", "policy_changeset", changeset_id)
+    return changeset
@@ -0,0 +1,262 @@
+"""
+Policy Feed Router
+Policy distribution to data planes: manifest and blobs, SSE stream and long-poll
+"""
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+import gzip
+import hmac
+import json
+import logging
+import os
+
+from dependencies import get_optional_api_key
+from services.api_key_auth import APIKeyPrincipal
+from services.policy_feed import MAX_BLOBS_PER_REQUEST, CursorExpired, PolicyFeed, get_policy_feed
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/policy-feed", tags=["policy-feed"])
+
+HEARTBEAT_SECONDS = float(os.getenv("POLICY_FEED_HEARTBEAT", "15"))
+MAX_WAIT_SECONDS = 60
+# Responses smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+# Serve the feed without credentials (local development only)
+POLICY_FEED_ALLOW_ANONYMOUS = os.getenv("POLICY_FEED_ALLOW_ANONYMOUS", "false").lower() == "true"
+
+
+# ==================== SCHEMAS ====================
+
+class BlobRequest(BaseModel):
+    hashes: List[str] = Field(..., max_length=MAX_BLOBS_PER_REQUEST, description="Content hashes to fetch")
+
+
+class BlobResponse(BaseModel):
+    blobs: Dict[str, str]
+    missing: List[str]
+
+
+# ==================== DEPENDENCIES ====================
+
+def check_feed_credentials(
+    authorization: Optional[str],
+    api_key: Optional[APIKeyPrincipal],
+    allow_anonymous: bool = False
+) -> None:
+    """
+    Accept a valid API key or the shared POLICY_FEED_TOKEN, and nothing else
+
+    With neither configured nor sent the request is refused, unless
+    ``allow_anonymous`` (an explicit opt-in) says otherwise.
+    """
+    if api_key is not None:
+        return
+
+    expected = os.getenv("POLICY_FEED_TOKEN")
+    token = authorization[7:] if authorization and authorization.startswith("Bearer ") else ""
+    if expected and token and hmac.compare_digest(token.encode(), expected.encode()):
+        return
+    if allow_anonymous and not token:
+        return
+
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid feed token" if token else "API key or feed token required",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def verify_feed_token(
+    authorization: Optional[str] = Header(None),
+    api_key: Optional[APIKeyPrincipal] = Depends(get_optional_api_key)
+) -> None:
+    """Require a valid API key or the shared POLICY_FEED_TOKEN (POLICY_FEED_ALLOW_ANONYMOUS=true opens the feed)"""
+    check_feed_credentials(authorization, api_key, allow_anonymous=POLICY_FEED_ALLOW_ANONYMOUS)
+
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _parse_cursor(value: Optional[str]) -> Optional[int]:
+    """Parse a cursor from a query value, Last-Event-ID or an ETag"""
+    if value is None:
+        return None
+    try:
+        return int(value.strip().strip('W/').strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {value}"
+        )
+
+
+def _gone(e: CursorExpired) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+
+
+def _encoded_response(
+    request: Request,
+    body: bytes,
+    media_type: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Gzip the body when the client accepts it and it is large enough to matter"""
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    if len(body) >= GZIP_MIN_SIZE and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+# ==================== ENDPOINTS ====================
+
+@router.get("/snapshot", dependencies=[Depends(verify_feed_token)])
+async def get_snapshot(response: Response, feed: PolicyFeed = Depends(get_policy_feed)):
+    """Full set of active policies and the version it corresponds to"""
+    snapshot = await feed.snapshot()
+    response.headers["ETag"] = _etag(snapshot["version"])
+    return snapshot
+
+
+@router.get("/manifest", dependencies=[Depends(verify_feed_token)])
+async def get_manifest(
+    request: Request,
+    application_id: Optional[int] = Query(None, description="Application (global policies are always included)"),
+    if_none_match: Optional[str] = Header(None),
+    feed: PolicyFeed = Depends(get_policy_feed)
+):
+    """
+    Content-addressed manifest of the active policy set
+
+    Maps policy id to content hash under a root hash (also the ETag). Data
+    planes diff it against their local manifest and fetch only the blobs
+    they lack; an unchanged set answers 304.
+    """
+    manifest = await feed.manifest(application_id)
+    headers = {"ETag": f'"{manifest["root"]}"', "X-Policy-Version": str(manifest["version"])}
+    if if_none_match and if_none_match.strip('W/').strip('"') == manifest["root"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return _encoded_response(request, json.dumps(manifest).encode(), "application/json", headers)
+
+
+@router.post("/blobs", response_model=BlobResponse, dependencies=[Depends(verify_feed_token)])
+async def get_blobs(
+    request: Request,
+    blob_request: BlobRequest,
+    feed: PolicyFeed = Depends(get_policy_feed)
+):
+    """Fetch several policy contents by content hash in one compressed response"""
+    blobs = await feed.blobs(blob_request.hashes)
+    payload = {"blobs": blobs, "missing": [h for h in blob_request.hashes if h not in blobs]}
+    return _encoded_response(request, json.dumps(payload).encode(), "application/json")
+
+
+@router.get("/blobs/{content_hash}", dependencies=[Depends(verify_feed_token)])
+async def get_blob(
+    request: Request,
+    content_hash: str,
+    feed: PolicyFeed = Depends(get_policy_feed)
+):
+    """Fetch one policy content by hash; content-addressed, so cacheable forever"""
+    blobs = await feed.blobs([content_hash])
+    if content_hash not in blobs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Blob not found"
+        )
+
+    headers = {"ETag": f'"{content_hash}"', "Cache-Control": "public, max-age=31536000, immutable"}
+    return _encoded_response(request, blobs[content_hash].encode("utf-8"), "text/plain; charset=utf-8", headers)
+
+
+@router.get("/events", dependencies=[Depends(verify_feed_token)])
+async def poll_events(
+    response: Response,
+    after: Optional[int] = Query(None, ge=0, description="Version cursor (defaults to If-None-Match)"),
+    wait: float = Query(25, ge=0, le=MAX_WAIT_SECONDS, description="Seconds to hold the request open"),
+    if_none_match: Optional[str] = Header(None),
+    feed: PolicyFeed = Depends(get_policy_feed)
+):
+    """
+    Long-poll for changes after a version cursor
+
+    Returns 304 when nothing changed within ``wait`` seconds, otherwise the
+    coalesced delta with the new version as ETag.
+    """
+    cursor = after if after is not None else _parse_cursor(if_none_match)
+    if cursor is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A cursor is required (after or If-None-Match)"
+        )
+
+    try:
+        latest = await feed.wait_for_version(cursor, timeout=wait)
+        delta = await feed.delta_since(cursor) if latest > cursor else None
+    except CursorExpired as e:
+        raise _gone(e)
+
+    if delta is None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": _etag(cursor)})
+
+    response.headers["ETag"] = _etag(delta["version"])
+    return delta
+
+
+@router.get("/stream", dependencies=[Depends(verify_feed_token)])
+async def stream_events(
+    request: Request,
+    after: Optional[int] = Query(None, ge=0, description="Version cursor (defaults to Last-Event-ID)"),
+    last_event_id: Optional[str] = Header(None),
+    feed: PolicyFeed = Depends(get_policy_feed)
+):
+    """
+    Server-Sent Events stream of deltas
+
+    Each event's id is the version it brings the client to, so a client
+    reconnecting with Last-Event-ID resumes exactly where it stopped.
+    """
+    cursor = after if after is not None else _parse_cursor(last_event_id)
+    if cursor is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A cursor is required (after or Last-Event-ID)"
+        )
+
+    # Validate the cursor before committing to a 200 stream
+    try:
+        first_delta = await feed.delta_since(cursor)
+    except CursorExpired as e:
+        raise _gone(e)
+
+    async def event_stream():
+        position = cursor
+        delta = first_delta
+        yield f"retry: {int(HEARTBEAT_SECONDS * 1000)}\n\n"
+
+        while not await request.is_disconnected():
+            if delta is not None:
+                position = delta["version"]
+                yield f"id: {position}\nevent: delta\ndata: {json.dumps(delta)}\n\n"
+            else:
+                yield ": keepalive\n\n"
+
+            latest = await feed.wait_for_version(position, timeout=HEARTBEAT_SECONDS)
+            try:
+                delta = await feed.delta_since(position) if latest > position else None
+            except CursorExpired as e:
+                yield f"event: reset\ndata: {json.dumps({'detail': str(e)})}\n\n"
+                return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -2,21 +2,25 @@
 User router for IAM system
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import bcrypt
 import os
 from datetime import datetime
 
-from database_pg import get_db
-from models.user import User, UserStatus, UserRole
+from database_pg import get_db, SessionLocal
+from models.user import KEYCLOAK_MANAGED_PASSWORD, User, UserStatus, UserRole
 from schemas.user import (
     UserCreate, UserUpdate, UserResponse, UserListResponse,
     UserStatusUpdate, PasswordReset, PasswordChange, PhotoUpload,
-    UserSummary
+    UserSummary, UserImportProgress
 )
 from dependencies import get_current_user
+from services import user_import
+from services.audit import audit_denied, audit_event
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
@@ -28,8 +32,13 @@ def hash_password(password: str) -> str:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    """Verify password against hash (False for users without a local password)"""
+    if not hashed_password or hashed_password == KEYCLOAK_MANAGED_PASSWORD:
+        return False
+    try:
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except ValueError:
+        return False
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -42,6 +51,7 @@ async def create_user(
     
     # Check if current user is admin
     if current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.create", "user", email=user_data.email)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can create users"
@@ -73,6 +83,7 @@ async def create_user(
     db.commit()
     db.refresh(db_user)
     
+    audit_event(current_user, "user.create", "user", db_user.id, email=db_user.email, role=db_user.role.value)
     return db_user
 
 
@@ -121,6 +132,109 @@ async def list_users(
     )
 
 
+@router.post("/import")
+async def import_users(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Upload format: ndjson or csv"),
+    chunk_size: int = Query(user_import.IMPORT_CHUNK_SIZE, ge=1, le=5000, description="Records per batch"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Bulk import users from an NDJSON or CSV request body
+
+    The body is spooled (to disk past a few MB, ``413`` past
+    USER_IMPORT_MAX_BYTES), then parsed incrementally and
+    processed in chunks: each chunk is
+    validated, its passwords are hashed on a worker pool and the rows are
+    inserted with a single executemany. Progress is streamed back as NDJSON,
+    one event per chunk followed by a final ``complete`` event.
+    """
+
+    # Only admins can import users
+    if current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.import", "user")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can import users"
+        )
+
+    created_by = current_user.id
+    parser = user_import.iter_csv_records if format == "csv" else user_import.iter_ndjson_records
+
+    try:
+        body = await user_import.spool_body(request.stream())
+    except user_import.ImportTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+
+    async def progress_events():
+        totals = {"chunk": 0, "processed": 0, "created": 0, "failed": 0}
+        seen_emails = set()
+        db = SessionLocal()
+        try:
+            records = parser(user_import.iter_lines(user_import.iter_file(body)))
+            async for chunk in user_import.iter_chunks(records, chunk_size):
+                valid, errors = user_import.validate_chunk(chunk, seen_emails)
+                valid, existing_errors = await run_in_threadpool(user_import.filter_existing, db, valid)
+                errors.extend(existing_errors)
+
+                password_hashes = await user_import.hash_passwords([user.password for _, user in valid])
+                created, insert_errors = await run_in_threadpool(
+                    user_import.insert_users, db, valid, password_hashes, created_by
+                )
+                errors.extend(insert_errors)
+
+                totals["chunk"] += 1
+                totals["processed"] += len(chunk)
+                totals["created"] += created
+                totals["failed"] += len(errors)
+                yield UserImportProgress(event="progress", errors=errors, **totals).model_dump_json() + "\n"
+
+            audit_event(current_user, "user.import", "user", format=format, **totals)
+            yield UserImportProgress(event="complete", **totals).model_dump_json() + "\n"
+        finally:
+            db.close()
+            body.close()
+
+    return StreamingResponse(progress_events(), media_type="application/x-ndjson")
+
+
+@router.get("/export")
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all users as NDJSON or CSV without loading the table into memory"""
+
+    # Only admins can export users
+    if current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.export", "user")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can export users"
+        )
+
+    audit_event(current_user, "user.export", "user", format=format)
+    serializer = user_import.iter_export_csv if format == "csv" else user_import.iter_export_ndjson
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+
+    def rows():
+        # Runs in the threadpool; owns its session for the lifetime of the stream
+        db = SessionLocal()
+        try:
+            yield from serializer(db)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'}
+    )
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
@@ -131,6 +245,7 @@ async def get_user(
     
     # Users can view their own profile, admins can view any
     if current_user.id != user_id and current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.read", "user", user_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Can only view own profile or need admin privileges"
@@ -157,6 +272,7 @@ async def update_user(
     
     # Users can update their own profile (except role), admins can update any
     if current_user.id != user_id and current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.update", "user", user_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Can only update own profile or need admin privileges"
@@ -171,6 +287,7 @@ async def update_user(
     
     # Only admins can change roles
     if user_data.role and current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.change_role", "user", user_id, role=user_data.role.value)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can change user roles"
@@ -185,6 +302,7 @@ async def update_user(
     db.commit()
     db.refresh(user)
     
+    audit_event(current_user, "user.update", "user", user_id, fields=sorted(update_data))
     return user
 
 
@@ -198,6 +316,7 @@ async def delete_user(
     
     # Only admins can delete users
     if current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.delete", "user", user_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can delete users"
@@ -222,6 +341,7 @@ async def delete_user(
     user.updated_at = datetime.utcnow()
     db.commit()
     
+    audit_event(current_user, "user.delete", "user", user_id)
     return {"message": "User deleted successfully"}
 
 
@@ -236,6 +356,7 @@ async def update_user_status(
     
     # Only admins can change user status
     if current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.change_status", "user", user_id, status=status_data.status.value)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can change user status"
@@ -260,6 +381,7 @@ async def update_user_status(
     db.commit()
     db.refresh(user)
     
+    audit_event(current_user, "user.change_status", "user", user_id, status=status_data.status.value)
     return user
 
 
@@ -274,6 +396,7 @@ async def reset_user_password(
     
     # Only admins can reset passwords
     if current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.reset_password", "user", user_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can reset passwords"
@@ -292,6 +415,7 @@ async def reset_user_password(
     user.updated_at = datetime.utcnow()
     db.commit()
     
+    audit_event(current_user, "user.reset_password", "user", user_id)
     return {"message": "Password reset successfully"}
 
 
@@ -303,8 +427,15 @@ async def change_own_password(
 ):
     """Change own password"""
     
+    if current_user.password_hash == KEYCLOAK_MANAGED_PASSWORD:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Password is managed by Keycloak"
+        )
+    
     # Verify current password
     if not verify_password(password_data.current_password, current_user.password_hash):
+        audit_event(current_user, "user.change_password", "user", current_user.id, outcome="failure", reason="wrong current password")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -316,6 +447,7 @@ async def change_own_password(
     current_user.updated_at = datetime.utcnow()
     db.commit()
     
+    audit_event(current_user, "user.change_password", "user", current_user.id)
     return {"message": "Password changed successfully"}
 
 
@@ -330,6 +462,7 @@ async def upload_user_photo(
     
     # Users can upload their own photo, admins can upload any
     if current_user.id != user_id and current_user.role != UserRole.ADMIN:
+        audit_denied(current_user, "user.upload_photo", "user", user_id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Can only upload own photo or need admin privileges"
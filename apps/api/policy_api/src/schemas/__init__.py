@@ -53,6 +53,8 @@ from .user import (
     PasswordChange,
     PhotoUpload,
     UserSummary,
+    UserImportError,
+    UserImportProgress,
     UserStatus,
     UserRole
 )
@@ -75,7 +77,21 @@ from .policy import (
     PolicyListResponse,
     PolicyStatus,
     PolicyValidationRequest,
-    PolicyValidationResponse
+    PolicyValidationResponse,
+    PolicyVersionResponse,
+    PolicyVersionDetailResponse,
+    PolicyVersionListResponse,
+    PolicyDiffResponse,
+    PolicyRollbackRequest
+)
+
+from .policy_changeset import (
+    ChangesetOperation,
+    ChangesetCreate,
+    ChangesetOperationsAppend,
+    ChangesetResponse,
+    ChangesetListResponse,
+    ChangesetValidationResponse
 )
 
 from .user_group import (
@@ -130,6 +146,8 @@ __all__ = [
     'PasswordChange',
     'PhotoUpload',
     'UserSummary',
+    'UserImportError',
+    'UserImportProgress',
     'UserStatus',
     'UserRole',
     # Group schemas
@@ -149,6 +167,18 @@ __all__ = [
     'PolicyStatus',
     'PolicyValidationRequest',
     'PolicyValidationResponse',
+    'PolicyVersionResponse',
+    'PolicyVersionDetailResponse',
+    'PolicyVersionListResponse',
+    'PolicyDiffResponse',
+    'PolicyRollbackRequest',
+    # PolicyChangeset schemas
+    'ChangesetOperation',
+    'ChangesetCreate',
+    'ChangesetOperationsAppend',
+    'ChangesetResponse',
+    'ChangesetListResponse',
+    'ChangesetValidationResponse',
     # UserGroup schemas
     'UserGroupBase',
     'UserGroupCreate',
@@ -41,6 +41,7 @@ class APIKeyResponse(BaseModel):
     name: str
     key_prefix: str
     last_used_at: Optional[datetime] = None
+    request_count: int = 0
     expires_at: Optional[datetime] = None
     is_active: bool
     is_expired: bool
@@ -25,7 +25,7 @@ class PolicyBase(BaseModel):
 
 class PolicyCreate(PolicyBase):
     """Schema for creating a policy"""
-    pass
+    application_id: Optional[int] = Field(None, description="Application the policy applies to (all when omitted)")
 
 
 class PolicyUpdate(BaseModel):
@@ -34,6 +34,7 @@ class PolicyUpdate(BaseModel):
     description: Optional[str] = Field(None, description="Policy description")
     content: Optional[str] = Field(None, description="Cedar policy content")
     status: Optional[PolicyStatus] = Field(None, description="Policy status")
+    application_id: Optional[int] = Field(None, description="Application the policy applies to")
 
 
 class PolicyResponse(PolicyBase):
@@ -41,6 +42,9 @@ class PolicyResponse(PolicyBase):
     id: int = Field(..., description="Policy ID")
     version: str = Field(..., description="Policy version")
     status: PolicyStatus = Field(..., description="Policy status")
+    application_id: Optional[int] = Field(None, description="Application the policy applies to")
+    content_hash: Optional[str] = Field(None, description="SHA-256 of the policy content")
+    current_version_id: Optional[int] = Field(None, description="History entry currently in effect")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
     
@@ -56,6 +60,49 @@ class PolicyListResponse(BaseModel):
     limit: int = Field(..., description="Maximum number of policies returned")
 
 
+class PolicyVersionResponse(BaseModel):
+    """Schema for a policy history entry"""
+    id: int = Field(..., description="Version entry ID")
+    policy_id: int = Field(..., description="Policy ID")
+    version: str = Field(..., description="Version label")
+    content_hash: str = Field(..., description="SHA-256 of the version content")
+    created_at: datetime = Field(..., description="Creation timestamp")
+    created_by: Optional[int] = Field(None, description="User who created the version")
+    comment: Optional[str] = Field(None, description="Version note")
+    is_current: bool = Field(False, description="Whether this version is in effect")
+
+    class Config:
+        from_attributes = True
+
+
+class PolicyVersionDetailResponse(PolicyVersionResponse):
+    """Schema for a policy history entry with its content"""
+    content: str = Field(..., description="Cedar policy content of this version")
+
+
+class PolicyVersionListResponse(BaseModel):
+    """Schema for a policy's version history"""
+    versions: List[PolicyVersionResponse] = Field(..., description="Versions, newest first")
+    current_version: Optional[str] = Field(None, description="Version currently in effect")
+    skip: int = Field(..., description="Number of versions skipped")
+    limit: int = Field(..., description="Maximum number of versions returned")
+
+
+class PolicyDiffResponse(BaseModel):
+    """Schema for a diff between two policy versions"""
+    from_version: str = Field(..., description="Base version")
+    to_version: str = Field(..., description="Compared version")
+    from_hash: str = Field(..., description="Content hash of the base version")
+    to_hash: str = Field(..., description="Content hash of the compared version")
+    identical: bool = Field(..., description="Whether both versions have the same content")
+    diff: str = Field(..., description="Unified diff")
+
+
+class PolicyRollbackRequest(BaseModel):
+    """Schema for rolling a policy back to a previous version"""
+    version: str = Field(..., min_length=1, max_length=50, description="Version to make current")
+
+
 class PolicyValidationRequest(BaseModel):
     """Policy validation request model"""
     content: str = Field(..., description="Cedar policy content to validate")
@@ -0,0 +1,67 @@
+"""
+Pydantic schemas for PolicyChangeset
+"""
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime
+
+
+class ChangesetOperation(BaseModel):
+    """
+    One staged policy change
+
+    ``create`` needs name and content (``activate`` publishes it in the same
+    commit); ``update``, ``activate`` and ``deactivate`` need policy_id.
+    """
+    op: Literal["create", "update", "activate", "deactivate"] = Field(..., description="Operation")
+    policy_id: Optional[int] = Field(None, description="Existing policy (update/activate/deactivate)")
+    name: Optional[str] = Field(None, min_length=1, max_length=255, description="Policy name")
+    description: Optional[str] = Field(None, description="Policy description")
+    content: Optional[str] = Field(None, description="Cedar policy content")
+    application_id: Optional[int] = Field(None, description="Application the policy applies to")
+    activate: bool = Field(False, description="Activate a created policy in the same commit")
+
+
+class ChangesetCreate(BaseModel):
+    """Schema for creating a changeset"""
+    name: str = Field(..., min_length=1, max_length=255, description="Changeset name")
+    description: Optional[str] = Field(None, description="Changeset description")
+    operations: List[ChangesetOperation] = Field(default_factory=list, max_length=500, description="Staged operations")
+
+
+class ChangesetOperationsAppend(BaseModel):
+    """Schema for staging more operations"""
+    operations: List[ChangesetOperation] = Field(..., min_length=1, max_length=500, description="Operations to append")
+
+
+class ChangesetResponse(BaseModel):
+    """Schema for changeset response"""
+    id: int = Field(..., description="Changeset ID")
+    name: str = Field(..., description="Changeset name")
+    description: Optional[str] = Field(None, description="Changeset description")
+    status: str = Field(..., description="Changeset status")
+    operations: List[ChangesetOperation] = Field(..., description="Staged operations")
+    committed_version: Optional[int] = Field(None, description="Policy-set version produced by the commit")
+    result: Optional[Dict[str, Any]] = Field(None, description="Policies touched by the commit")
+    created_by: Optional[int] = Field(None, description="User who created the changeset")
+    created_at: datetime = Field(..., description="Creation timestamp")
+    updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
+    committed_at: Optional[datetime] = Field(None, description="Commit timestamp")
+
+    class Config:
+        from_attributes = True
+
+
+class ChangesetListResponse(BaseModel):
+    """Schema for paginated changeset list"""
+    changesets: List[ChangesetResponse] = Field(..., description="List of changesets")
+    total: int = Field(..., description="Total number of changesets")
+    skip: int = Field(..., description="Number of changesets skipped")
+    limit: int = Field(..., description="Maximum number of changesets returned")
+
+
+class ChangesetValidationResponse(BaseModel):
+    """Schema for changeset validation"""
+    valid: bool = Field(..., description="Whether the changeset can be committed")
+    errors: List[str] = Field(default_factory=list, description="Validation errors (prefixed by operation index)")
@@ -126,4 +126,20 @@ class UserSummary(BaseModel):
 class PhotoUpload(BaseModel):
     """Photo upload response schema"""
     photo_url: str = Field(..., description="Uploaded photo URL")
-    message: str = Field(..., description="Upload result message")
\ No newline at end of file
+    message: str = Field(..., description="Upload result message")
+
+class UserImportError(BaseModel):
+    """Rejected record in a bulk import"""
+    line: int = Field(..., description="Line number of the record in the upload")
+    email: Optional[str] = Field(None, description="Email of the rejected record, if parsed")
+    error: str = Field(..., description="Reason the record was rejected")
+
+
+class UserImportProgress(BaseModel):
+    """Progress event streamed by the bulk import endpoint"""
+    event: str = Field(..., description="Event type: progress or complete")
+    chunk: int = Field(..., description="Number of chunks processed so far")
+    processed: int = Field(..., description="Records processed so far")
+    created: int = Field(..., description="Users created so far")
+    failed: int = Field(..., description="Records rejected so far")
+    errors: List[UserImportError] = Field(default_factory=list, description="Errors in this chunk")
@@ -0,0 +1,139 @@
+"""
+API Key Authentication Service
+Verifies presented API keys by indexed hash lookup behind positive/negative caches
+"""
+
+import asyncio
+import hmac
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from database_pg import SessionLocal
+from models.api_key import APIKey
+from services.cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+API_KEY_HEADER = "X-API-Key"
+API_KEY_CACHE_TTL = float(os.getenv("API_KEY_CACHE_TTL", "30"))
+API_KEY_NEGATIVE_CACHE_TTL = float(os.getenv("API_KEY_NEGATIVE_CACHE_TTL", "5"))
+API_KEY_CACHE_MAX_ENTRIES = int(os.getenv("API_KEY_CACHE_MAX_ENTRIES", "10000"))
+# Generated keys are 68 characters; anything far longer is not a key
+MAX_KEY_LENGTH = 256
+
+
+@dataclass(frozen=True)
+class APIKeyPrincipal:
+    """Identity of a verified API key (never holds the key or its hash)"""
+    id: str
+    application_id: str
+    name: str
+    key_prefix: str
+    expires_at: Optional[datetime] = None
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return self.expires_at is not None and (now or datetime.utcnow()) > self.expires_at
+
+
+class _KeyRejected(Exception):
+    """Raised inside a cache load so that rejections are never cached as valid"""
+
+
+class APIKeyAuthenticator:
+    """
+    Resolves presented API keys to principals
+
+    The key is hashed and looked up through the unique index on
+    ``api_keys.key_hash``. Valid keys are cached for ``positive_ttl`` and
+    unknown or inactive ones for ``negative_ttl``, in separate caches so a
+    flood of bogus keys cannot evict the valid ones. Expiry is re-checked on
+    every hit, so a cached key stops working exactly at ``expires_at``; a
+    deactivation in this process invalidates immediately, in other workers
+    within ``positive_ttl``.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        positive_ttl: float = API_KEY_CACHE_TTL,
+        negative_ttl: float = API_KEY_NEGATIVE_CACHE_TTL,
+        max_entries: int = API_KEY_CACHE_MAX_ENTRIES
+    ):
+        self.session_factory = session_factory
+        self._valid = TTLCache(max_entries=max_entries, default_ttl=positive_ttl)
+        self._rejected = TTLCache(max_entries=max_entries, default_ttl=negative_ttl)
+
+    def _lookup(self, key_hash: str) -> Optional[APIKeyPrincipal]:
+        db = self.session_factory()
+        try:
+            api_key = db.query(APIKey).filter(APIKey.key_hash == key_hash).first()
+        finally:
+            db.close()
+
+        if api_key is None or not api_key.is_active:
+            return None
+        if not hmac.compare_digest(api_key.key_hash, key_hash):
+            return None
+        return APIKeyPrincipal(
+            id=str(api_key.id),
+            application_id=str(api_key.application_id),
+            name=api_key.name,
+            key_prefix=api_key.key_prefix,
+            expires_at=api_key.expires_at
+        )
+
+    async def authenticate(self, plain_key: Optional[str]) -> Optional[APIKeyPrincipal]:
+        """Return the principal for a presented key, or None when it is not valid"""
+        if not plain_key or len(plain_key) > MAX_KEY_LENGTH:
+            return None
+
+        key = ("api_key", APIKey.hash_key(plain_key))
+        if self._rejected.get(key) is not MISSING:
+            return None
+
+        async def load() -> APIKeyPrincipal:
+            principal = await asyncio.to_thread(self._lookup, key[1])
+            if principal is None:
+                raise _KeyRejected()
+            return principal
+
+        try:
+            principal = await self._valid.get_or_load(key, load)
+        except _KeyRejected:
+            self._rejected.set(key, True)
+            return None
+
+        if principal.is_expired():
+            return None
+        return principal
+
+    def invalidate(self, key_hash: str) -> None:
+        """Forget a key after it was created, deactivated or deleted"""
+        self._valid.invalidate(("api_key", key_hash))
+        self._rejected.invalidate(("api_key", key_hash))
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        return {"valid": self._valid.stats(), "rejected": self._rejected.stats()}
+
+
+_authenticator: Optional[APIKeyAuthenticator] = None
+
+
+def get_api_key_authenticator() -> APIKeyAuthenticator:
+    """Get the process-wide authenticator"""
+    global _authenticator
+    if _authenticator is None:
+        _authenticator = APIKeyAuthenticator()
+    return _authenticator
+
+
+def invalidate_api_key(key_hash: str) -> None:
+    """Drop a key from the authenticator's caches (no-op before first use)"""
+    if _authenticator is not None:
+        _authenticator.invalidate(key_hash)
@@ -0,0 +1,216 @@
+"""
+API Key Usage Tracker
+Buffers API key usage in memory and writes it behind in bulk
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, or_, text
+from sqlalchemy.orm import Session
+
+from database_pg import SessionLocal
+from models.api_key import APIKey
+
+logger = logging.getLogger(__name__)
+
+USAGE_FLUSH_INTERVAL = float(os.getenv("API_KEY_USAGE_FLUSH_INTERVAL", "10"))
+USAGE_FLUSH_BATCH_SIZE = 1000
+
+# (last used, requests since last flush) per key id
+Usage = Tuple[datetime, int]
+
+
+class APIKeyUsageTracker:
+    """
+    Write-behind tracker for ``api_keys.last_used_at`` and ``request_count``
+
+    ``record`` only touches an in-memory dict, so the request path never
+    writes to the database. Every ``flush_interval`` the buffer is swapped
+    out and applied with one bulk UPDATE per batch; timestamps only move
+    forward (max semantics), counters are added. A failed flush merges its
+    batch back into the buffer, so usage is not lost while the database is
+    unavailable (only on a crash between flushes).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: float = USAGE_FLUSH_INTERVAL,
+        batch_size: int = USAGE_FLUSH_BATCH_SIZE
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: Dict[str, Usage] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Requests per key since process start, for analytics
+        self.request_counts: Dict[str, int] = {}
+        self.last_flush_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.stats = {"recorded": 0, "flushes": 0, "rows_updated": 0, "flush_failures": 0}
+
+    def record(self, key_id: str, used_at: Optional[datetime] = None) -> None:
+        """Note one request made with a key"""
+        used_at = used_at or datetime.utcnow()
+        last_used, count = self._pending.get(key_id, (used_at, 0))
+        self._pending[key_id] = (max(last_used, used_at), count + 1)
+        self.request_counts[key_id] = self.request_counts.get(key_id, 0) + 1
+        self.stats["recorded"] += 1
+
+    def _merge_back(self, batch: Dict[str, Usage]) -> None:
+        for key_id, (used_at, count) in batch.items():
+            last_used, pending = self._pending.get(key_id, (used_at, 0))
+            self._pending[key_id] = (max(last_used, used_at), pending + count)
+
+    # ==================== DATABASE ====================
+
+    def _write(self, rows: List[Tuple[str, datetime, int]]) -> int:
+        db = self.session_factory()
+        try:
+            updated = 0
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                if db.bind.dialect.name == "postgresql":
+                    updated += self._write_postgres(db, chunk)
+                else:
+                    updated += self._write_generic(db, chunk)
+            db.commit()
+            return updated
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _write_postgres(db: Session, rows: List[Tuple[str, datetime, int]]) -> int:
+        """One UPDATE ... FROM (VALUES ...) for the whole chunk"""
+        values = []
+        params: Dict[str, Any] = {}
+        for index, (key_id, used_at, count) in enumerate(rows):
+            values.append(f"(CAST(:id{index} AS uuid), CAST(:ts{index} AS timestamp), CAST(:n{index} AS bigint))")
+            params.update({f"id{index}": key_id, f"ts{index}": used_at, f"n{index}": count})
+
+        result = db.execute(
+            text(
+                "UPDATE api_keys AS k "
+                "SET last_used_at = GREATEST(COALESCE(k.last_used_at, v.used_at), v.used_at), "
+                "request_count = k.request_count + v.requests "
+                f"FROM (VALUES {', '.join(values)}) AS v(id, used_at, requests) "
+                "WHERE k.id = v.id"
+            ),
+            params
+        )
+        return result.rowcount
+
+    @staticmethod
+    def _write_generic(db: Session, rows: List[Tuple[str, datetime, int]]) -> int:
+        """Executemany fallback for databases without UPDATE ... FROM"""
+        table = APIKey.__table__
+        used_at = bindparam("used_at")
+        statement = (
+            table.update()
+            .where(table.c.id == bindparam("key_id"))
+            .values(
+                last_used_at=case(
+                    (or_(table.c.last_used_at.is_(None), table.c.last_used_at < used_at), used_at),
+                    else_=table.c.last_used_at
+                ),
+                request_count=table.c.request_count + bindparam("requests")
+            )
+        )
+        result = db.execute(
+            statement,
+            [{"key_id": uuid.UUID(key_id), "used_at": ts, "requests": count} for key_id, ts, count in rows]
+        )
+        return result.rowcount
+
+    # ==================== FLUSHING ====================
+
+    async def flush(self) -> int:
+        """Write buffered usage now; returns the number of rows updated"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            batch, self._pending = self._pending, {}
+            rows = [(key_id, used_at, count) for key_id, (used_at, count) in batch.items()]
+            try:
+                updated = await asyncio.to_thread(self._write, rows)
+            except Exception as e:
+                self._merge_back(batch)
+                self.stats["flush_failures"] += 1
+                self.last_error = str(e)
+                logger.error(f"API key usage flush failed ({len(rows)} keys pending): {e}")
+                raise
+
+            self.stats["flushes"] += 1
+            self.stats["rows_updated"] += updated
+            self.last_flush_at = datetime.utcnow()
+            self.last_error = None
+            return updated
+
+    async def run_forever(self) -> None:
+        """Flush every ``flush_interval`` until cancelled"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Already logged; the batch was merged back for the next round
+                pass
+
+    def start(self) -> None:
+        """Start the background flusher"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+
+    def status(self) -> Dict[str, Any]:
+        """Current state of the tracker"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "pending_keys": len(self._pending),
+            "tracked_keys": len(self.request_counts),
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+            "last_error": self.last_error,
+            **self.stats,
+        }
+
+
+_tracker: Optional[APIKeyUsageTracker] = None
+
+
+def get_api_key_usage_tracker() -> APIKeyUsageTracker:
+    """Get the process-wide usage tracker"""
+    global _tracker
+    if _tracker is None:
+        _tracker = APIKeyUsageTracker()
+    return _tracker
+
+
+async def stop_api_key_usage_tracker() -> None:
+    """Stop the process-wide tracker, flushing buffered usage"""
+    if _tracker is not None:
+        await _tracker.stop()
@@ -0,0 +1,492 @@
+"""
+Audit Log
+Structured audit events, queued in memory and written behind in batches
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database_pg import SessionLocal
+from models.audit_event import AuditEvent
+from models.user import User
+from services.api_key_auth import APIKeyPrincipal
+from services.partitions import PartitionIndex, PruneStats, load_index, save_index, should_scan
+from services.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))
+# What a full queue gives up: the event being recorded (drop_newest) or the oldest queued one (drop_oldest)
+AUDIT_OVERFLOW = os.getenv("AUDIT_OVERFLOW", "drop_newest").lower()
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest")
+AUDIT_SINK = os.getenv("AUDIT_SINK", "sql").lower()
+AUDIT_DIR = os.getenv("AUDIT_DIR", "./audit")
+
+Event = Dict[str, Any]
+
+
+def _actor_fields(actor: Any) -> Tuple[str, Optional[str], Optional[str]]:
+    """(actor_type, actor_id, actor_name) of a user, API key, component name or None"""
+    if isinstance(actor, User):
+        return "user", str(actor.id), actor.email
+    if isinstance(actor, APIKeyPrincipal):
+        return "api_key", actor.id, actor.name
+    if isinstance(actor, str):
+        return "system", None, actor
+    return "anonymous", None, None
+
+
+def build_event(
+    actor: Any,
+    action: str,
+    entity_type: Optional[str] = None,
+    entity_id: Any = None,
+    outcome: str = "success",
+    details: Optional[Dict[str, Any]] = None
+) -> Event:
+    """Audit event for ``actor`` doing ``action`` on an entity, stamped with the time and trace"""
+    actor_type, actor_id, actor_name = _actor_fields(actor)
+    context = current_span().context
+    return {
+        "occurred_at": datetime.utcnow(),
+        "action": action,
+        "outcome": outcome,
+        "actor_type": actor_type,
+        "actor_id": actor_id,
+        "actor_name": actor_name,
+        "entity_type": entity_type,
+        "entity_id": str(entity_id) if entity_id is not None else None,
+        "details": details or None,
+        "trace_id": context.trace_id if context is not None else None,
+    }
+
+
+# ==================== SINKS ====================
+
+class AuditSink:
+    """Destination of audit batches; ``write`` runs in a worker thread"""
+
+    def write(self, events: List[Event]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLAuditSink(AuditSink):
+    """Appends each batch to the ``audit_events`` table with one multi-row INSERT"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def write(self, events: List[Event]) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(insert(AuditEvent.__table__), events)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def _epoch_ms(value: datetime) -> int:
+    """Epoch milliseconds of a datetime (naive values are UTC, like every stored timestamp)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _index_keys(event: Event) -> List[str]:
+    """Bloom filter keys of an event: the entity and actor it can be searched by"""
+    keys = []
+    if event.get("entity_id") is not None:
+        keys.append(f"entity:{event['entity_id']}")
+    if event.get("actor_id") is not None:
+        keys.append(f"actor:{event['actor_id']}")
+    return keys
+
+
+class FileAuditSink(AuditSink):
+    """
+    Appends JSON lines to day-partitioned files
+
+    Each worker writes its own file, ``<directory>/date=YYYY-MM-DD/audit-<pid>.jsonl``,
+    so several workers never interleave partial lines. Every file is a
+    partition with an index (time range and bloom filter of entity and
+    actor ids, see ``services.partitions``) rewritten after each batch, so
+    ``query_audit_files`` only opens files that may hold matching events.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.pid = os.getpid()
+        self._indexes: Dict[str, PartitionIndex] = {}
+
+    def path_for(self, occurred_at: datetime) -> str:
+        return os.path.join(self.directory, f"date={occurred_at:%Y-%m-%d}", f"audit-{self.pid}.jsonl")
+
+    def _index_for(self, path: str) -> PartitionIndex:
+        index = self._indexes.get(path)
+        if index is None:
+            index = load_index(path)
+            if index is None:
+                # A file left without a valid index (e.g. by a crash) is indexed again from its lines
+                index = PartitionIndex()
+                for record in _read_events(path) if os.path.exists(path) else ():
+                    index.add(_epoch_ms(_parse_time(record["occurred_at"])), _index_keys(record))
+            # Only the current day's files are written to; keep the others out of memory
+            self._indexes = {p: i for p, i in self._indexes.items() if os.path.dirname(p) == os.path.dirname(path)}
+            self._indexes[path] = index
+        return index
+
+    def write(self, events: List[Event]) -> None:
+        partitions: Dict[str, List[Event]] = {}
+        for event in events:
+            partitions.setdefault(self.path_for(event["occurred_at"]), []).append(event)
+        for path, chunk in partitions.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            index = self._index_for(path)
+            lines = [json.dumps({**event, "occurred_at": event["occurred_at"].isoformat() + "Z"}, default=str) for event in chunk]
+            with open(path, "a", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+            for event in chunk:
+                index.add(_epoch_ms(event["occurred_at"]), _index_keys(event))
+            save_index(path, index)
+
+
+def create_audit_sink_from_env() -> AuditSink:
+    """Build the sink selected by AUDIT_SINK (sql, the default, or file under AUDIT_DIR)"""
+    if AUDIT_SINK == "file":
+        return FileAuditSink(AUDIT_DIR)
+    return SQLAuditSink()
+
+
+# ==================== QUERIES ====================
+
+@dataclass
+class AuditQuery:
+    """Filters of an audit search (``since``/``until`` inclusive, naive values are UTC)"""
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    entity_type: Optional[str] = None
+    entity_id: Optional[str] = None
+    actor_id: Optional[str] = None
+    action: Optional[str] = None
+    outcome: Optional[str] = None
+
+    def matches(self, record: Dict[str, Any]) -> bool:
+        return all(
+            expected is None or record.get(name) == expected
+            for name, expected in (
+                ("entity_type", self.entity_type), ("entity_id", self.entity_id), ("actor_id", self.actor_id),
+                ("action", self.action), ("outcome", self.outcome)
+            )
+        )
+
+    def index_keys(self) -> List[str]:
+        return _index_keys({"entity_id": self.entity_id, "actor_id": self.actor_id})
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.rstrip("Z"))
+
+
+def _read_events(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash; the events after it are still readable
+                    continue
+
+
+def query_audit_files(
+    directory: str,
+    query: AuditQuery,
+    limit: int = 100,
+    stats: Optional[PruneStats] = None
+) -> List[Dict[str, Any]]:
+    """
+    Newest events under a FileAuditSink ``directory`` matching ``query``
+
+    Day directories outside the window are skipped by name, then files
+    whose index rules out the window or the entity/actor ids are skipped
+    without being opened.
+    """
+    stats = stats if stats is not None else PruneStats()
+    since = _epoch_ms(query.since) if query.since else None
+    until = _epoch_ms(query.until) if query.until else None
+    first_day = f"{_naive_utc(query.since):%Y-%m-%d}" if query.since else None
+    last_day = f"{_naive_utc(query.until):%Y-%m-%d}" if query.until else None
+
+    if not os.path.isdir(directory):
+        return []
+    days = sorted((name for name in os.listdir(directory) if name.startswith("date=")), reverse=True)
+    results: List[Dict[str, Any]] = []
+    for day_name in days:
+        day = day_name[len("date="):]
+        files = [
+            os.path.join(directory, day_name, name)
+            for name in sorted(os.listdir(os.path.join(directory, day_name)))
+            if name.endswith(".jsonl")
+        ]
+        if (first_day and day < first_day) or (last_day and day > last_day):
+            stats.partitions += len(files)
+            stats.pruned_by_name += len(files)
+            continue
+        matches = []
+        for path in files:
+            if not should_scan(path, stats, since, until, query.index_keys()):
+                continue
+            for record in _read_events(path):
+                ts = _epoch_ms(_parse_time(record["occurred_at"]))
+                if (since is None or ts >= since) and (until is None or ts <= until) and query.matches(record):
+                    matches.append(record)
+        # Days are visited newest first; within a day several workers' files are merged
+        matches.sort(key=lambda record: record["occurred_at"], reverse=True)
+        results.extend(matches[:limit - len(results)])
+        if len(results) >= limit:
+            break
+    return results
+
+
+def query_audit_table(db: Session, query: AuditQuery, limit: int = 100) -> List[Dict[str, Any]]:
+    """Newest ``audit_events`` rows matching ``query`` (served by the entity and actor indexes)"""
+    statement = db.query(AuditEvent)
+    for column, value in (
+        (AuditEvent.entity_type, query.entity_type), (AuditEvent.entity_id, query.entity_id),
+        (AuditEvent.actor_id, query.actor_id), (AuditEvent.action, query.action), (AuditEvent.outcome, query.outcome)
+    ):
+        if value is not None:
+            statement = statement.filter(column == value)
+    if query.since is not None:
+        statement = statement.filter(AuditEvent.occurred_at >= _naive_utc(query.since))
+    if query.until is not None:
+        statement = statement.filter(AuditEvent.occurred_at <= _naive_utc(query.until))
+    return [event.to_dict() for event in statement.order_by(AuditEvent.occurred_at.desc()).limit(limit)]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# ==================== WRITER ====================
+
+class AuditLog:
+    """
+    Bounded in-memory queue of audit events drained by a background writer
+
+    ``record`` appends to a deque under a short lock and never waits for
+    I/O, so auditing adds no latency to the request path. The writer wakes
+    every ``flush_interval`` seconds, or as soon as a full batch is queued,
+    and hands batches of ``batch_size`` events to the sink in a worker
+    thread. When the queue holds ``max_size`` events the overflow policy
+    drops the newest or the oldest event, and counts it. A batch the sink
+    rejects is put back at the head of the queue (as far as room allows)
+    and retried on the next round.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[AuditSink] = None,
+        max_size: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        overflow: str = AUDIT_OVERFLOW
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy '{overflow}' (expected one of: {', '.join(OVERFLOW_POLICIES)})")
+        self.sink = sink
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._queue: Deque[Event] = deque()
+        # Sync endpoints record from the threadpool, so the queue is shared across threads
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_flush_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.stats = {"recorded": 0, "dropped": 0, "written": 0, "batches": 0, "flush_failures": 0}
+
+    def record(self, event: Event) -> bool:
+        """Queue an event; False when it was dropped because the queue is full"""
+        with self._lock:
+            if len(self._queue) >= self.max_size:
+                self.stats["dropped"] += 1
+                if self.overflow == "drop_newest":
+                    return False
+                self._queue.popleft()
+            self._queue.append(event)
+            self.stats["recorded"] += 1
+            full_batch = len(self._queue) >= self.batch_size
+        if full_batch:
+            self._wake_writer()
+        return True
+
+    def _wake_writer(self) -> None:
+        if self._loop is None or self._wake is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _take_batch(self) -> List[Event]:
+        with self._lock:
+            return [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+    def _put_back(self, batch: List[Event]) -> None:
+        with self._lock:
+            room = max(0, self.max_size - len(self._queue))
+            self._queue.extendleft(reversed(batch[:room]))
+            self.stats["dropped"] += len(batch) - min(room, len(batch))
+
+    async def flush(self) -> int:
+        """Write everything queued so far; returns the number of events written"""
+        if self.sink is None:
+            return 0
+        async with self._flush_lock:
+            written = 0
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return written
+                try:
+                    await asyncio.to_thread(self.sink.write, batch)
+                except Exception as e:
+                    self._put_back(batch)
+                    self.stats["flush_failures"] += 1
+                    self.last_error = str(e)
+                    logger.error(f"Audit flush failed ({len(self._queue)} events queued): {e}")
+                    raise
+                written += len(batch)
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                self.last_flush_at = datetime.utcnow()
+                self.last_error = None
+
+    async def run_forever(self) -> None:
+        """Flush on every interval or full batch until cancelled"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Already logged; the batch was put back for the next round
+                pass
+
+    def start(self, sink: Optional[AuditSink] = None) -> None:
+        """Start the background writer (events recorded before this are kept)"""
+        if sink is not None:
+            self.sink = sink
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        """Stop the background writer and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+        if self.sink is not None:
+            self.sink.close()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def status(self) -> Dict[str, Any]:
+        """Current state of the writer"""
+        return {
+            "enabled": AUDIT_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "sink": type(self.sink).__name__ if self.sink else None,
+            "queued": self.queued,
+            "max_size": self.max_size,
+            "overflow": self.overflow,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+            "last_error": self.last_error,
+            **self.stats,
+        }
+
+
+_audit_log: Optional[AuditLog] = None
+
+
+def get_audit_log() -> AuditLog:
+    """Get the process-wide audit log"""
+    global _audit_log
+    if _audit_log is None:
+        _audit_log = AuditLog()
+    return _audit_log
+
+
+async def stop_audit_log() -> None:
+    """Stop the process-wide audit log, writing queued events"""
+    if _audit_log is not None:
+        await _audit_log.stop()
+
+
+def audit_event(
+    actor: Any,
+    action: str,
+    entity_type: Optional[str] = None,
+    entity_id: Any = None,
+    outcome: str = "success",
+    **details
+) -> None:
+    """
+    Record an audit event: ``audit_event(current_user, "policy.update", "policy", policy.id, version=3)``
+
+    ``actor`` is the acting User, an APIKeyPrincipal, a component name or None.
+    """
+    if AUDIT_ENABLED:
+        get_audit_log().record(build_event(actor, action, entity_type, entity_id, outcome, details))
+
+
+def audit_denied(actor: Any, action: str, entity_type: Optional[str] = None, entity_id: Any = None, **details) -> None:
+    """Record a request refused by an authorization check"""
+    audit_event(actor, action, entity_type, entity_id, outcome="denied", **details)
@@ -0,0 +1,171 @@
+"""
+In-process TTL cache
+Namespaced, size-bounded cache with single-flight loading and hit/miss counters
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+CacheKey = Tuple[Hashable, ...]
+
+MISSING = object()
+# Result of a load whose leader was cancelled; waiting callers retry the load
+_ABANDONED = object()
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries expire after a TTL
+
+    Keys are tuples whose first item is a namespace (e.g. ``("user", user_id)``)
+    so that a whole family of keys can be invalidated without scanning the
+    rest of the cache. The cache is per process: in a multi-worker deployment
+    other workers only see a write once their own entry expires.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        default_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._namespaces: Dict[Hashable, Set[CacheKey]] = {}
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        # Bumped by every invalidation so loads racing a write are not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey, default: Any = MISSING) -> Any:
+        """Return the cached value, or ``default`` when absent or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: CacheKey, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value; a TTL of zero or less disables caching for the call"""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        self._namespaces.setdefault(key[0], set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Return the cached value or load it, coalescing concurrent misses
+
+        Only one loader runs per key at a time; other callers await its
+        result. Exceptions raised by the loader are propagated and not cached,
+        and neither is a result whose load overlapped an invalidation. If the
+        caller running the loader is cancelled (e.g. its client went away),
+        the waiting callers start the load again instead of failing with it.
+        """
+        while True:
+            value = self.get(key)
+            if value is not MISSING:
+                return value
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            value = await asyncio.shield(inflight)
+            if value is not _ABANDONED:
+                return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # The cancellation belongs to this caller, not to the ones waiting on the load
+            future.set_result(_ABANDONED)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            if generation == self._generation:
+                self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, key: CacheKey) -> None:
+        """Drop a single key"""
+        self._generation += 1
+        self._remove(key)
+
+    def invalidate_prefix(self, *prefix: Hashable) -> int:
+        """Drop every key starting with ``prefix`` (at least the namespace)"""
+        self._generation += 1
+        keys = self._namespaces.get(prefix[0])
+        if not keys:
+            return 0
+
+        matching = [key for key in keys if key[:len(prefix)] == prefix]
+        for key in matching:
+            self._remove(key)
+        return len(matching)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        self._generation += 1
+        self._entries.clear()
+        self._namespaces.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remove(self, key: CacheKey) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        keys = self._namespaces.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._namespaces[key[0]]
@@ -0,0 +1,738 @@
+"""
+Decision Log
+Authorization decisions written behind to rotating binary segment files
+
+Segment layout (little-endian)::
+
+    segment  := SEGMENT_HEADER block*
+    block    := BLOCK_HEADER dictionary columns
+    dictionary := (u16 length, utf-8 bytes) * dict_entries
+    columns  := zlib(ts_offset u32[n] | principal u32[n] | action u32[n] |
+                     resource u32[n] | reason u32[n] | duration_us u32[n] | allow u8[n])
+
+Principals, actions, resources and reasons are dictionary-encoded per
+segment: every string gets an id the first time it appears, and the block
+that first uses it carries the new entries, so a segment is readable on its
+own. Block headers hold the time range and deny count of the block, which
+lets a query skip blocks (and the decompression of their columns) that
+cannot match. A closed segment also gets a partition index (see
+``services.partitions``) with its time range and a bloom filter of its
+dictionary, so whole segments are pruned without being opened.
+
+Query from the command line (run from ``src``)::
+
+    python -m services.decision_log query --dir ./decision-log --decision deny --since 2025-11-01T00:00
+    python -m services.decision_log segments --dir ./decision-log
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from services.partitions import BloomFilter, PartitionIndex, PruneStats, save_index, should_scan
+
+logger = logging.getLogger(__name__)
+
+DECISION_LOG_ENABLED = os.getenv("DECISION_LOG_ENABLED", "false").lower() == "true"
+DECISION_LOG_DIR = os.getenv("DECISION_LOG_DIR", "./decision-log")
+# Share of allow decisions kept (denies are always kept)
+DECISION_LOG_ALLOW_SAMPLE_RATE = float(os.getenv("DECISION_LOG_ALLOW_SAMPLE_RATE", "1.0"))
+DECISION_LOG_SEGMENT_BYTES = int(os.getenv("DECISION_LOG_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+DECISION_LOG_SEGMENT_SECONDS = float(os.getenv("DECISION_LOG_SEGMENT_SECONDS", "3600"))
+DECISION_LOG_QUEUE_SIZE = int(os.getenv("DECISION_LOG_QUEUE_SIZE", "100000"))
+DECISION_LOG_BATCH_SIZE = int(os.getenv("DECISION_LOG_BATCH_SIZE", "4096"))
+DECISION_LOG_FLUSH_INTERVAL = float(os.getenv("DECISION_LOG_FLUSH_INTERVAL", "1"))
+DECISION_LOG_FSYNC = os.getenv("DECISION_LOG_FSYNC", "false").lower() == "true"
+
+SEGMENT_MAGIC = b"SDLS"
+BLOCK_MAGIC = b"SDLB"
+FORMAT_VERSION = 1
+SEGMENT_SUFFIX = ".dlog"
+# magic, version, created_at (epoch ms), allow sample rate, pid
+SEGMENT_HEADER = struct.Struct("<4sB3xQdI")
+# magic, records, denies, min_ts, max_ts, dict_base, dict_entries, dict_bytes, payload_bytes, crc32
+BLOCK_HEADER = struct.Struct("<4sIIQQIIIII")
+DICT_ENTRY = struct.Struct("<H")
+MAX_ENTRY_BYTES = 0xFFFF
+NO_REASON = 0xFFFFFFFF
+MAX_U32 = 0xFFFFFFFF
+
+U32 = "I" if array("I").itemsize == 4 else "L"
+ID_COLUMNS = ("ts_offset", "principal", "action", "resource", "reason", "duration_us")
+SWAP_BYTES = sys.byteorder == "big"
+
+# (epoch ms, principal, action, resource, allow, reason, duration in seconds)
+Decision = Tuple[int, str, str, str, bool, Optional[str], float]
+
+
+# ==================== WRITER ====================
+
+class SegmentWriter:
+    """
+    Appends blocks of decisions to the current segment and rotates it
+
+    A segment is closed once it reaches ``max_bytes`` or ``max_age``
+    seconds, writing its partition index; the next block opens a new one
+    with a fresh dictionary. A failed write truncates the segment back to
+    its last complete block and closes it, so readers never see a torn
+    block.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = DECISION_LOG_SEGMENT_BYTES,
+        max_age: float = DECISION_LOG_SEGMENT_SECONDS,
+        allow_sample_rate: float = DECISION_LOG_ALLOW_SAMPLE_RATE,
+        fsync: bool = DECISION_LOG_FSYNC
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.allow_sample_rate = allow_sample_rate
+        self.fsync = fsync
+        self.pid = os.getpid()
+        self.path: Optional[str] = None
+        self._handle = None
+        self._opened_at = 0.0
+        self._size = 0
+        self._seq = 0
+        self._ids: Dict[str, int] = {}
+        self._range: Optional[Tuple[int, int]] = None
+        self._records = 0
+        self.stats = {"segments": 0, "blocks": 0, "bytes": 0}
+
+    def _open(self, first_ts: int) -> None:
+        """Start a segment named after the oldest decision of its first block"""
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        self._seq += 1
+        name = f"decisions-{datetime.utcfromtimestamp(first_ts / 1000):%Y%m%dT%H%M%S}-{self.pid}-{self._seq:04d}{SEGMENT_SUFFIX}"
+        self.path = os.path.join(self.directory, name)
+        self._handle = open(self.path, "ab")
+        header = SEGMENT_HEADER.pack(SEGMENT_MAGIC, FORMAT_VERSION, int(now * 1000), self.allow_sample_rate, self.pid)
+        self._handle.write(header)
+        self._handle.flush()
+        self._opened_at = now
+        self._size = len(header)
+        self._ids = {}
+        self._range = None
+        self._records = 0
+        self.stats["segments"] += 1
+        logger.info(f"Opened decision log segment {self.path}")
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._write_index()
+            logger.info(f"Closed decision log segment {self.path} ({self._size} bytes)")
+
+    def _write_index(self) -> None:
+        if self._range is None:
+            return
+        index = PartitionIndex(self._range[0], self._range[1], self._records, bloom=BloomFilter.for_capacity(len(self._ids)))
+        for value in self._ids:
+            index.bloom.add(value)
+        try:
+            save_index(self.path, index)
+        except OSError as e:
+            # The segment stays readable, it just cannot be pruned without opening it
+            logger.warning(f"Could not write the index of {self.path}: {e}")
+
+    def _should_rotate(self) -> bool:
+        return self._size >= self.max_bytes or time.time() - self._opened_at >= self.max_age
+
+    def write(self, decisions: List[Decision]) -> None:
+        """Append ``decisions`` as one block"""
+        if not decisions:
+            return
+        if self._handle is not None and self._should_rotate():
+            self.close()
+        if self._handle is None:
+            self._open(min(decision[0] for decision in decisions))
+
+        offset = self._size
+        try:
+            block = self._encode_block(decisions)
+            self._handle.write(block)
+            self._handle.flush()
+            if self.fsync:
+                os.fsync(self._handle.fileno())
+        except Exception:
+            # Drop the partial block and start over in a new segment (its dictionary state is gone too)
+            try:
+                self._handle.truncate(offset)
+            finally:
+                self.close()
+            raise
+        self._size += len(block)
+        self._records += len(decisions)
+        block_range = (min(decision[0] for decision in decisions), max(decision[0] for decision in decisions))
+        self._range = block_range if self._range is None else (min(self._range[0], block_range[0]), max(self._range[1], block_range[1]))
+        self.stats["blocks"] += 1
+        self.stats["bytes"] += len(block)
+
+    def _encode_block(self, decisions: List[Decision]) -> bytes:
+        ids = self._ids
+        dict_base = len(ids)
+        entries: List[bytes] = []
+
+        def encode(value: str) -> int:
+            key = ids.get(value)
+            if key is None:
+                key = ids[value] = len(ids)
+                data = value.encode("utf-8")[:MAX_ENTRY_BYTES]
+                entries.append(DICT_ENTRY.pack(len(data)) + data)
+            return key
+
+        timestamps = [decision[0] for decision in decisions]
+        min_ts, max_ts = min(timestamps), max(timestamps)
+        columns = [
+            array(U32, [ts - min_ts for ts in timestamps]),
+            array(U32, [encode(decision[1]) for decision in decisions]),
+            array(U32, [encode(decision[2]) for decision in decisions]),
+            array(U32, [encode(decision[3]) for decision in decisions]),
+            array(U32, [NO_REASON if decision[5] is None else encode(decision[5]) for decision in decisions]),
+            array(U32, [min(int(decision[6] * 1_000_000), MAX_U32) for decision in decisions]),
+        ]
+        allow = bytes(1 if decision[4] else 0 for decision in decisions)
+        if SWAP_BYTES:
+            for column in columns:
+                column.byteswap()
+
+        dictionary = b"".join(entries)
+        payload = zlib.compress(b"".join(column.tobytes() for column in columns) + allow, 1)
+        header = BLOCK_HEADER.pack(
+            BLOCK_MAGIC, len(decisions), len(decisions) - sum(allow), min_ts, max_ts,
+            dict_base, len(entries), len(dictionary), len(payload),
+            zlib.crc32(payload, zlib.crc32(dictionary))
+        )
+        return header + dictionary + payload
+
+
+class DecisionLog:
+    """
+    Bounded in-memory queue of decisions drained into segment files
+
+    ``record`` samples allows, appends a tuple under a short lock and never
+    waits for I/O; dictionary encoding, compression and writes happen in a
+    worker thread, one block per ``batch_size`` decisions, every
+    ``flush_interval`` seconds or as soon as a full batch is queued.
+    Allows are dropped once ``max_size`` decisions are queued; denies keep
+    being queued up to twice that, so a slow disk loses sampled-away
+    traffic before it loses refusals.
+    """
+
+    def __init__(
+        self,
+        writer: Optional[SegmentWriter] = None,
+        allow_sample_rate: float = DECISION_LOG_ALLOW_SAMPLE_RATE,
+        max_size: int = DECISION_LOG_QUEUE_SIZE,
+        batch_size: int = DECISION_LOG_BATCH_SIZE,
+        flush_interval: float = DECISION_LOG_FLUSH_INTERVAL
+    ):
+        if not 0.0 <= allow_sample_rate <= 1.0:
+            raise ValueError(f"Allow sample rate must be between 0 and 1, got {allow_sample_rate}")
+        self.writer = writer
+        self.allow_sample_rate = allow_sample_rate
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Deque[Decision] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_flush_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.stats = {
+            "allows": 0, "denies": 0, "sampled_out": 0, "dropped": 0,
+            "written": 0, "flush_failures": 0
+        }
+
+    def record(
+        self,
+        principal: str,
+        action: str,
+        resource: str,
+        allow: bool,
+        reason: Optional[str] = None,
+        duration: float = 0.0
+    ) -> bool:
+        """Queue a decision; False when it was sampled out or dropped"""
+        if allow and self.allow_sample_rate < 1.0 and random.random() >= self.allow_sample_rate:
+            self.stats["sampled_out"] += 1
+            return False
+        decision = (int(time.time() * 1000), principal, action, resource, allow, reason, duration)
+        with self._lock:
+            limit = self.max_size if allow else self.max_size * 2
+            if len(self._queue) >= limit:
+                self.stats["dropped"] += 1
+                return False
+            self._queue.append(decision)
+            self.stats["allows" if allow else "denies"] += 1
+            full_batch = len(self._queue) >= self.batch_size
+        if full_batch:
+            self._wake_writer()
+        return True
+
+    def _wake_writer(self) -> None:
+        if self._loop is None or self._wake is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _take_batch(self) -> List[Decision]:
+        with self._lock:
+            return [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+    def _put_back(self, batch: List[Decision]) -> None:
+        with self._lock:
+            self._queue.extendleft(reversed(batch))
+
+    async def flush(self) -> int:
+        """Write everything queued so far; returns the number of decisions written"""
+        if self.writer is None:
+            return 0
+        async with self._flush_lock:
+            written = 0
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return written
+                try:
+                    await asyncio.to_thread(self.writer.write, batch)
+                except Exception as e:
+                    self._put_back(batch)
+                    self.stats["flush_failures"] += 1
+                    self.last_error = str(e)
+                    logger.error(f"Decision log flush failed ({len(self._queue)} decisions queued): {e}")
+                    raise
+                written += len(batch)
+                self.stats["written"] += len(batch)
+                self.last_flush_at = datetime.utcnow()
+                self.last_error = None
+
+    async def run_forever(self) -> None:
+        """Flush on every interval or full batch until cancelled"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Already logged; the batch was put back for the next round
+                pass
+
+    def start(self, writer: Optional[SegmentWriter] = None) -> None:
+        """Start the background writer (decisions recorded before this are kept)"""
+        if writer is not None:
+            self.writer = writer
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self.run_forever())
+
+    async def stop(self) -> None:
+        """Stop the background writer, write what is left and close the segment"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+        try:
+            await self.flush()
+        except Exception:
+            pass
+        if self.writer is not None:
+            self.writer.close()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def status(self) -> Dict[str, Any]:
+        """Current state of the writer"""
+        return {
+            "enabled": DECISION_LOG_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "segment": self.writer.path if self.writer else None,
+            "allow_sample_rate": self.allow_sample_rate,
+            "queued": self.queued,
+            "max_size": self.max_size,
+            "last_flush_at": self.last_flush_at.isoformat() if self.last_flush_at else None,
+            "last_error": self.last_error,
+            **self.stats,
+            **(self.writer.stats if self.writer else {}),
+        }
+
+
+_decision_log: Optional[DecisionLog] = None
+
+
+def get_decision_log() -> DecisionLog:
+    """Get the process-wide decision log"""
+    global _decision_log
+    if _decision_log is None:
+        _decision_log = DecisionLog()
+    return _decision_log
+
+
+def start_decision_log() -> DecisionLog:
+    """Start the process-wide decision log writing to DECISION_LOG_DIR"""
+    decision_log = get_decision_log()
+    decision_log.start(SegmentWriter(DECISION_LOG_DIR, allow_sample_rate=decision_log.allow_sample_rate))
+    return decision_log
+
+
+async def stop_decision_log() -> None:
+    """Stop the process-wide decision log, writing queued decisions"""
+    if _decision_log is not None:
+        await _decision_log.stop()
+
+
+def log_decision(
+    principal: str,
+    action: str,
+    resource: str,
+    allow: bool,
+    reason: Optional[str] = None,
+    duration: float = 0.0
+) -> None:
+    """Record an authorization decision when DECISION_LOG_ENABLED"""
+    if DECISION_LOG_ENABLED:
+        get_decision_log().record(principal, action, resource, allow, reason, duration)
+
+
+# ==================== READER ====================
+
+@dataclass
+class DecisionQuery:
+    """Predicates of a decision search; ``since``/``until`` are epoch milliseconds (inclusive)"""
+    since: Optional[int] = None
+    until: Optional[int] = None
+    principal: Optional[str] = None
+    action: Optional[str] = None
+    resource: Optional[str] = None
+    allow: Optional[bool] = None
+
+    def entities(self) -> Dict[str, str]:
+        return {
+            column: value
+            for column, value in (("principal", self.principal), ("action", self.action), ("resource", self.resource))
+            if value is not None
+        }
+
+
+@dataclass
+class ScanStats:
+    """How much of the log a query had to read"""
+    segments: int = 0
+    prune: PruneStats = field(default_factory=PruneStats)
+    blocks: int = 0
+    blocks_skipped: int = 0
+    records_scanned: int = 0
+    matched: int = 0
+
+
+def segment_started_at(path: str) -> Optional[int]:
+    """Epoch ms encoded in a segment file name (no file access)"""
+    try:
+        stamp = os.path.basename(path).split("-")[1]
+        started = datetime.strptime(stamp, "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+    except (IndexError, ValueError):
+        return None
+    return int(started.timestamp() * 1000)
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segment files of ``directory`` in creation order"""
+    if not os.path.isdir(directory):
+        return []
+    names = [name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)]
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+
+def _read_u32(payload: bytes, start: int, count: int) -> array:
+    column = array(U32)
+    column.frombytes(payload[start:start + 4 * count])
+    if SWAP_BYTES:
+        column.byteswap()
+    return column
+
+
+def read_segment_header(handle) -> Dict[str, Any]:
+    data = handle.read(SEGMENT_HEADER.size)
+    if len(data) < SEGMENT_HEADER.size:
+        raise ValueError("truncated segment header")
+    magic, version, created_at, sample_rate, pid = SEGMENT_HEADER.unpack(data)
+    if magic != SEGMENT_MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"not a version {FORMAT_VERSION} decision log segment")
+    return {"created_at": created_at, "allow_sample_rate": sample_rate, "pid": pid}
+
+
+def _blocks(handle, path: str) -> Iterator[Tuple[tuple, bytes, int]]:
+    """(header fields, dictionary bytes, payload offset) of each complete block"""
+    while True:
+        data = handle.read(BLOCK_HEADER.size)
+        if not data:
+            return
+        if len(data) < BLOCK_HEADER.size:
+            logger.warning(f"{path}: truncated block header, stopping")
+            return
+        fields = BLOCK_HEADER.unpack(data)
+        if fields[0] != BLOCK_MAGIC:
+            logger.warning(f"{path}: bad block magic, stopping")
+            return
+        dictionary = handle.read(fields[7])
+        payload_offset = handle.tell()
+        yield fields, dictionary, payload_offset
+        handle.seek(payload_offset + fields[8])
+
+
+def scan_segment(path: str, query: DecisionQuery, stats: Optional[ScanStats] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Decisions of one segment matching ``query``
+
+    Blocks outside the time range, without denies when only denies are
+    wanted, or whose dictionary does not (yet) contain a requested
+    principal/action/resource are skipped without decompressing their
+    columns. Only the columns the predicates need are decoded before
+    filtering; the rest are decoded for matching rows only.
+    """
+    stats = stats if stats is not None else ScanStats()
+    entities = query.entities()
+    strings: List[str] = []
+    ids: Dict[str, int] = {}
+
+    with open(path, "rb") as handle:
+        try:
+            header = read_segment_header(handle)
+        except ValueError as e:
+            logger.warning(f"{path}: {e}, skipping")
+            return
+        stats.segments += 1
+        # Decisions each kept allow stands for, to scale sampled counts back up
+        allow_weight = 1.0 / header["allow_sample_rate"] if header["allow_sample_rate"] > 0 else 1.0
+
+        for fields, dictionary, payload_offset in _blocks(handle, path):
+            _, count, denies, min_ts, max_ts, dict_base, dict_entries, _, payload_bytes, crc = fields
+            # The dictionary is cumulative, so it is read even for blocks that are skipped
+            if dict_base != len(strings) or len(dictionary) != fields[7]:
+                logger.warning(f"{path}: dictionary out of sequence, stopping")
+                return
+            position = 0
+            for _ in range(dict_entries):
+                (length,) = DICT_ENTRY.unpack_from(dictionary, position)
+                position += DICT_ENTRY.size
+                value = dictionary[position:position + length].decode("utf-8", errors="replace")
+                position += length
+                ids.setdefault(value, len(strings))
+                strings.append(value)
+
+            if (
+                (query.since is not None and max_ts < query.since)
+                or (query.until is not None and min_ts > query.until)
+                or (query.allow is False and denies == 0)
+                or (query.allow is True and denies == count)
+                or any(value not in ids for value in entities.values())
+            ):
+                stats.blocks_skipped += 1
+                continue
+
+            handle.seek(payload_offset)
+            compressed = handle.read(payload_bytes)
+            if len(compressed) < payload_bytes or zlib.crc32(compressed, zlib.crc32(dictionary)) != crc:
+                logger.warning(f"{path}: torn or corrupt block, stopping")
+                return
+            payload = zlib.decompress(compressed)
+            stats.blocks += 1
+            stats.records_scanned += count
+
+            columns: Dict[str, Any] = {}
+
+            def column(name: str):
+                if name not in columns:
+                    if name == "allow":
+                        columns[name] = payload[len(ID_COLUMNS) * 4 * count:]
+                    else:
+                        columns[name] = _read_u32(payload, ID_COLUMNS.index(name) * 4 * count, count)
+                return columns[name]
+
+            rows = range(count)
+            if query.since is not None and min_ts < query.since:
+                offsets = column("ts_offset")
+                rows = [row for row in rows if min_ts + offsets[row] >= query.since]
+            if query.until is not None and max_ts > query.until:
+                offsets = column("ts_offset")
+                rows = [row for row in rows if min_ts + offsets[row] <= query.until]
+            for name, value in entities.items():
+                wanted, values = ids[value], column(name)
+                rows = [row for row in rows if values[row] == wanted]
+            if query.allow is not None:
+                flags = column("allow")
+                rows = [row for row in rows if bool(flags[row]) is query.allow]
+
+            for row in rows:
+                reason = column("reason")[row]
+                allowed = bool(column("allow")[row])
+                stats.matched += 1
+                yield {
+                    "ts": min_ts + column("ts_offset")[row],
+                    "principal": strings[column("principal")[row]],
+                    "action": strings[column("action")[row]],
+                    "resource": strings[column("resource")[row]],
+                    "allow": allowed,
+                    "reason": None if reason == NO_REASON else strings[reason],
+                    "duration_us": column("duration_us")[row],
+                    "weight": allow_weight if allowed else 1.0,
+                }
+
+
+def query_decisions(
+    directory: str,
+    query: DecisionQuery,
+    limit: Optional[int] = None,
+    stats: Optional[ScanStats] = None
+) -> Iterator[Dict[str, Any]]:
+    """Decisions of every segment in ``directory`` matching ``query``, oldest segment first"""
+    stats = stats if stats is not None else ScanStats()
+    matched = 0
+    for path in list_segments(directory):
+        started_at = segment_started_at(path)
+        # Decisions are queued in order, so a segment holds nothing older than its name (to the second)
+        if query.until is not None and started_at is not None and started_at > query.until:
+            stats.prune.partitions += 1
+            stats.prune.pruned_by_name += 1
+            continue
+        if not should_scan(path, stats.prune, query.since, query.until, query.entities().values()):
+            continue
+        for record in scan_segment(path, query, stats):
+            yield record
+            matched += 1
+            if limit is not None and matched >= limit:
+                return
+
+
+def describe_segment(path: str) -> Dict[str, Any]:
+    """Header and block summary of a segment, read without decompressing any block"""
+    summary: Dict[str, Any] = {"path": path, "bytes": os.path.getsize(path), "blocks": 0, "records": 0, "denies": 0}
+    with open(path, "rb") as handle:
+        summary.update(read_segment_header(handle))
+        entries = 0
+        for fields, _, _ in _blocks(handle, path):
+            summary["blocks"] += 1
+            summary["records"] += fields[1]
+            summary["denies"] += fields[2]
+            summary["min_ts"] = min(summary.get("min_ts", fields[3]), fields[3])
+            summary["max_ts"] = max(summary.get("max_ts", fields[4]), fields[4])
+            entries += fields[6]
+        summary["dictionary_entries"] = entries
+    return summary
+
+
+# ==================== CLI ====================
+
+def _parse_time(value: str) -> int:
+    """Epoch ms from an ISO 8601 timestamp (UTC when no offset is given)"""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def _format_ts(ts: int) -> str:
+    return datetime.fromtimestamp(ts / 1000, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m services.decision_log", description="Query the decision log")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = commands.add_parser("query", help="print matching decisions as JSON lines")
+    query_parser.add_argument("--dir", default=DECISION_LOG_DIR)
+    query_parser.add_argument("--since", type=_parse_time, help="ISO 8601 start (inclusive)")
+    query_parser.add_argument("--until", type=_parse_time, help="ISO 8601 end (inclusive)")
+    query_parser.add_argument("--principal", help='exact entity, e.g. User::"alice"')
+    query_parser.add_argument("--action")
+    query_parser.add_argument("--resource")
+    query_parser.add_argument("--decision", choices=("allow", "deny"))
+    query_parser.add_argument("--limit", type=int)
+    query_parser.add_argument("--count", action="store_true", help="print counts instead of decisions")
+
+    segments_parser = commands.add_parser("segments", help="summarize segment files")
+    segments_parser.add_argument("--dir", default=DECISION_LOG_DIR)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "segments":
+        for path in list_segments(args.dir):
+            summary = describe_segment(path)
+            for key in ("created_at", "min_ts", "max_ts"):
+                if key in summary:
+                    summary[key] = _format_ts(summary[key])
+            print(json.dumps(summary))
+        return 0
+
+    query = DecisionQuery(
+        since=args.since,
+        until=args.until,
+        principal=args.principal,
+        action=args.action,
+        resource=args.resource,
+        allow=None if args.decision is None else args.decision == "allow"
+    )
+    stats = ScanStats()
+    allows = denies = 0
+    estimated_allows = 0.0
+    for record in query_decisions(args.dir, query, limit=args.limit, stats=stats):
+        if args.count:
+            if record["allow"]:
+                allows += 1
+                estimated_allows += record["weight"]
+            else:
+                denies += 1
+            continue
+        print(json.dumps({**record, "ts": _format_ts(record["ts"])}))
+
+    if args.count:
+        print(json.dumps({"allows": allows, "denies": denies, "estimated_allows": round(estimated_allows)}))
+    print(
+        f"scanned {stats.blocks} blocks ({stats.records_scanned} decisions) of {stats.segments} segments, "
+        f"skipped {stats.blocks_skipped} blocks; segments pruned: {stats.prune.to_dict()}",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
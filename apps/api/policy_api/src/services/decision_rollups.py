@@ -0,0 +1,245 @@
+"""
+Decision Rollups
+Incremental minute/hour/day decision counts fed by data plane batches
+"""
+
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.decision_rollup import DecisionRollup, DecisionRollupBatch
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES: Dict[str, timedelta] = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+# How long buckets of each granularity are kept (0 keeps them forever)
+ROLLUP_RETENTION_DAYS: Dict[str, int] = {
+    "minute": int(os.getenv("ROLLUP_MINUTE_RETENTION_DAYS", "7")),
+    "hour": int(os.getenv("ROLLUP_HOUR_RETENTION_DAYS", "90")),
+    "day": int(os.getenv("ROLLUP_DAY_RETENTION_DAYS", "0")),
+}
+# Applied batch ids are remembered this long; data planes stop retrying well before
+BATCH_ID_RETENTION = timedelta(days=2)
+PRUNE_INTERVAL = 3600.0
+GROUP_COLUMNS = ("application_id", "resource_type", "action_type")
+KEY_COLUMNS = ("granularity", "bucket_start", "application_id", "resource_type", "action_type")
+
+# (granularity, bucket start, application id, resource type, action type)
+RollupKey = Tuple[str, datetime, int, str, str]
+
+_last_prune = 0.0
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Start of the ``granularity`` bucket holding ``value`` (naive UTC)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    if granularity == "minute":
+        return value.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity '{granularity}' (expected one of: {', '.join(GRANULARITIES)})")
+
+
+def bucket_count(since: datetime, until: datetime, granularity: str) -> int:
+    """Number of ``granularity`` buckets from ``since`` to ``until`` (inclusive)"""
+    return int((bucket_start(until, granularity) - bucket_start(since, granularity)) / GRANULARITIES[granularity]) + 1
+
+
+# ==================== INGESTION ====================
+
+def _increments(application_id: int, buckets: Iterable[Dict[str, Any]]) -> Dict[RollupKey, List[int]]:
+    """Per-minute counts folded into the minute, hour and day rows they add to"""
+    increments: Dict[RollupKey, List[int]] = {}
+    for bucket in buckets:
+        if not bucket["allow"] and not bucket["deny"]:
+            continue
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(bucket["minute"], granularity), application_id, bucket["resource_type"], bucket["action_type"])
+            counts = increments.setdefault(key, [0, 0])
+            counts[0] += bucket["allow"]
+            counts[1] += bucket["deny"]
+    return increments
+
+
+def _upsert(db: Session, rows: List[Dict[str, Any]]) -> None:
+    table = DecisionRollup.__table__
+    dialect = db.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table).values(rows)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={
+                "allow_count": table.c.allow_count + statement.excluded.allow_count,
+                "deny_count": table.c.deny_count + statement.excluded.deny_count,
+                "updated_at": statement.excluded.updated_at,
+            }
+        ))
+        return
+
+    # Databases without ON CONFLICT: increment, then insert the rows that did not exist
+    for row in rows:
+        result = db.execute(
+            table.update()
+            .where(*(table.c[column] == row[column] for column in KEY_COLUMNS))
+            .values(
+                allow_count=table.c.allow_count + row["allow_count"],
+                deny_count=table.c.deny_count + row["deny_count"],
+                updated_at=row["updated_at"]
+            )
+        )
+        if result.rowcount == 0:
+            db.execute(table.insert().values(row))
+
+
+def apply_rollup_batch(db: Session, batch_id: str, application_id: int, buckets: Sequence[Dict[str, Any]]) -> bool:
+    """
+    Add a data plane batch of per-minute counts to every granularity
+
+    The batch id is recorded in the same transaction as the increments, so
+    a batch is applied exactly once however often it is retried. Returns
+    False for a batch that was already applied.
+    """
+    db.add(DecisionRollupBatch(batch_id=batch_id))
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return False
+
+    now = datetime.utcnow()
+    # Sorted so concurrent batches lock rows in the same order
+    rows = [
+        dict(zip(KEY_COLUMNS, key), allow_count=allows, deny_count=denies, updated_at=now)
+        for key, (allows, denies) in sorted(_increments(application_id, buckets).items())
+    ]
+    try:
+        for start in range(0, len(rows), 1000):
+            _upsert(db, rows[start:start + 1000])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    _maybe_prune(db)
+    return True
+
+
+def prune_rollups(db: Session, now: Optional[datetime] = None) -> int:
+    """Delete buckets past their retention and forgotten batch ids; returns the rows deleted"""
+    now = now or datetime.utcnow()
+    deleted = 0
+    for granularity, days in ROLLUP_RETENTION_DAYS.items():
+        if days > 0:
+            deleted += db.query(DecisionRollup).filter(
+                DecisionRollup.granularity == granularity,
+                DecisionRollup.bucket_start < bucket_start(now - timedelta(days=days), granularity)
+            ).delete(synchronize_session=False)
+    deleted += db.query(DecisionRollupBatch).filter(
+        DecisionRollupBatch.applied_at < now - BATCH_ID_RETENTION
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def _maybe_prune(db: Session) -> None:
+    global _last_prune
+    if time.monotonic() - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = time.monotonic()
+    try:
+        deleted = prune_rollups(db)
+        if deleted:
+            logger.info(f"Pruned {deleted} expired decision rollup rows")
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Decision rollup pruning failed: {e}")
+
+
+# ==================== QUERIES ====================
+
+def query_rollups(
+    db: Session,
+    granularity: str,
+    since: datetime,
+    until: datetime,
+    application_id: Optional[int] = None,
+    resource_type: Optional[str] = None,
+    action_type: Optional[str] = None,
+    group_by: Sequence[str] = (),
+    fill: bool = True
+) -> Dict[str, Any]:
+    """
+    Decision counts per bucket from ``since`` to ``until``, one series per ``group_by`` key
+
+    Reads one pre-aggregated row per bucket and key through the rollup
+    indexes, so the cost follows the number of buckets, not of decisions.
+    With ``fill`` every series has a (zero) entry for each bucket.
+    """
+    first, last = bucket_start(since, granularity), bucket_start(until, granularity)
+    group_columns = [getattr(DecisionRollup, column) for column in group_by]
+    statement = db.query(
+        DecisionRollup.bucket_start,
+        *group_columns,
+        func.sum(DecisionRollup.allow_count),
+        func.sum(DecisionRollup.deny_count)
+    ).filter(
+        DecisionRollup.granularity == granularity,
+        DecisionRollup.bucket_start >= first,
+        DecisionRollup.bucket_start <= last
+    )
+    for column, value in (
+        (DecisionRollup.application_id, application_id),
+        (DecisionRollup.resource_type, resource_type),
+        (DecisionRollup.action_type, action_type)
+    ):
+        if value is not None:
+            statement = statement.filter(column == value)
+    statement = statement.group_by(DecisionRollup.bucket_start, *group_columns).order_by(DecisionRollup.bucket_start)
+
+    series: Dict[Tuple, Dict[datetime, Tuple[int, int]]] = {}
+    for row in statement:
+        key = tuple(row[1:1 + len(group_by)])
+        series.setdefault(key, {})[row[0]] = (int(row[-2] or 0), int(row[-1] or 0))
+
+    step = GRANULARITIES[granularity]
+    starts = [first + step * index for index in range(bucket_count(first, last, granularity))] if fill else None
+    result = []
+    for key in sorted(series, key=lambda k: tuple(str(part) for part in k)):
+        counts = series[key]
+        buckets = [
+            {"start": start.isoformat() + "Z", "allow": counts.get(start, (0, 0))[0], "deny": counts.get(start, (0, 0))[1]}
+            for start in (starts if fill else sorted(counts))
+        ]
+        result.append({
+            "key": dict(zip(group_by, key)),
+            "allow": sum(allows for allows, _ in counts.values()),
+            "deny": sum(denies for _, denies in counts.values()),
+            "buckets": buckets,
+        })
+
+    return {
+        "granularity": granularity,
+        "since": first.isoformat() + "Z",
+        "until": last.isoformat() + "Z",
+        "group_by": list(group_by),
+        "allow": sum(item["allow"] for item in result),
+        "deny": sum(item["deny"] for item in result),
+        "series": result,
+    }
@@ -3,18 +3,77 @@ Keycloak Admin API Service
 Complete service for managing users and groups via Keycloak Admin REST API
 """
 
+import asyncio
 import httpx
 import logging
-from typing import Dict, Any, List, Optional
+import os
+from typing import Dict, Any, List, Optional, Awaitable, Callable, Iterable
 from datetime import datetime, timedelta
 
+from services.cache import TTLCache
+from services.metrics import REGISTRY
+from services.tracing import tracer
+from services.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, hedged
+
 logger = logging.getLogger(__name__)
 
+# Seconds each kind of read stays cached; 0 disables caching for that kind
+DEFAULT_CACHE_TTLS = {
+    "users": 15.0,
+    "user": 60.0,
+    "user_groups": 30.0,
+    "user_count": 30.0,
+    "groups": 30.0,
+    "group": 60.0,
+    "group_members": 30.0,
+    "group_count": 30.0,
+}
+
+
+# Total timeout in seconds per kind of request (see _request_kind)
+DEFAULT_TIMEOUTS = {
+    "token": 5.0,
+    "count": 3.0,
+    "read": 5.0,
+    "write": 10.0,
+}
+CONNECT_TIMEOUT = 2.0
+
+# Methods that can be replayed safely after a timeout or a gateway error
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+RETRYABLE_STATUSES = {502, 503, 504}
+# Errors raised before the request reached Keycloak, so any method can be retried
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+KEYCLOAK_REQUEST_DURATION = REGISTRY.histogram(
+    "keycloak_request_duration_seconds", "Keycloak admin API latency per attempt by request kind"
+)
+
+
+class KeycloakRequestError(Exception):
+    """A Keycloak read failed; raised internally so failures are never cached"""
+
+
+class KeycloakUnavailableError(Exception):
+    """Keycloak cannot be reached (circuit open, or retries exhausted)"""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _request_kind(method: str, endpoint: str) -> str:
+    if endpoint.endswith("/count"):
+        return "count"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
 
 class KeycloakAdminService:
     """Service for Keycloak Admin REST API operations"""
 
-    def __init__(self, server_url: str, realm: str, client_id: str, client_secret: str, admin_username: str = "admin", admin_password: str = "admin123"):
+    def __init__(self, server_url: str, realm: str, client_id: str, client_secret: str, admin_username: str = "admin", admin_password: str = "admin123", max_concurrency: int = 8, cache_ttls: Optional[Dict[str, float]] = None, cache_max_entries: int = 10000, timeouts: Optional[Dict[str, float]] = None, retry_policy: Optional[RetryPolicy] = None, breaker: Optional[CircuitBreaker] = None, hedge_delay: Optional[float] = None):
         self.server_url = server_url.rstrip('/')
         self.realm = realm
         self.client_id = client_id
@@ -22,15 +81,46 @@ class KeycloakAdminService:
         self.admin_username = admin_username
         self.admin_password = admin_password
         self.client = httpx.AsyncClient(timeout=30.0)
+        # Resilience: per-kind timeouts, retries, circuit breaker and optional hedged GETs
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker("keycloak")
+        self.hedge_delay = hedge_delay
+        self.request_stats = {
+            "requests": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+        }
         self.admin_token = None
         self.token_expires = None
+        # Caps in-flight requests issued through gather() and the batch helpers
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._token_lock = asyncio.Lock()
+        # Read-through cache; writes below invalidate the keys they affect
+        self.cache_ttls = {**DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
+        self.cache = TTLCache(max_entries=cache_max_entries)
+
+    def _has_valid_token(self) -> bool:
+        return bool(self.admin_token and self.token_expires and datetime.utcnow() < self.token_expires)
 
     async def get_admin_token(self) -> Optional[str]:
         """Get admin access token for Keycloak Admin API"""
         # Check if we have a valid cached token
-        if self.admin_token and self.token_expires and datetime.utcnow() < self.token_expires:
+        if self._has_valid_token():
             return self.admin_token
 
+        # Concurrent callers share a single token refresh
+        async with self._token_lock:
+            if self._has_valid_token():
+                return self.admin_token
+            return await self._fetch_admin_token()
+
+    async def _fetch_admin_token(self) -> Optional[str]:
+        """Request a new admin token from the master realm"""
         try:
             # Get token using admin credentials
             data = {
@@ -40,8 +130,10 @@ class KeycloakAdminService:
                 "password": self.admin_password
             }
 
-            response = await self.client.post(
+            response = await self._send(
+                "POST",
                 f"{self.server_url}/realms/master/protocol/openid-connect/token",
+                "token",
                 data=data,
                 headers={"Content-Type": "application/x-www-form-urlencoded"}
             )
@@ -57,29 +149,243 @@ class KeycloakAdminService:
                 logger.error(f"Failed to get admin token: {response.status_code} - {response.text}")
                 return None
 
+        except KeycloakUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting admin token: {e}")
             return None
 
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> Optional[httpx.Response]:
-        """Make authenticated request to Keycloak Admin API"""
-        token = await self.get_admin_token()
-        if not token:
-            raise Exception("Failed to get admin token")
-
-        headers = kwargs.get("headers", {})
-        headers["Authorization"] = f"Bearer {token}"
-        headers["Content-Type"] = "application/json"
-        kwargs["headers"] = headers
+        """
+        Make authenticated request to Keycloak Admin API
 
+        Raises KeycloakUnavailableError when Keycloak cannot be reached, so an
+        outage is not mistaken for an empty result.
+        """
         url = f"{self.server_url}/admin/realms/{self.realm}{endpoint}"
+        kind = _request_kind(method, endpoint)
 
-        try:
-            response = await self.client.request(method, url, **kwargs)
+        for attempt in range(2):
+            token = await self.get_admin_token()
+            if not token:
+                raise Exception("Failed to get admin token")
+
+            headers = dict(kwargs.get("headers", {}))
+            headers["Authorization"] = f"Bearer {token}"
+            headers["Content-Type"] = "application/json"
+
+            try:
+                response = await self._send(method, url, kind, **{**kwargs, "headers": headers})
+            except KeycloakUnavailableError:
+                raise
+            except Exception as e:
+                logger.error(f"Request failed: {e}")
+                return None
+
+            # The token was revoked or expired early: fetch a new one and retry once
+            if response.status_code == 401 and attempt == 0:
+                self.admin_token = None
+                continue
             return response
-        except Exception as e:
-            logger.error(f"Request failed: {e}")
-            return None
+
+    # ==================== RESILIENCE ====================
+
+    def _timeout(self, kind: str) -> httpx.Timeout:
+        total = self.timeouts.get(kind, DEFAULT_TIMEOUTS["read"])
+        return httpx.Timeout(total, connect=min(total, CONNECT_TIMEOUT))
+
+    async def _dispatch(self, method: str, url: str, kind: str, **kwargs) -> httpx.Response:
+        """Send one attempt, hedging GETs that are slower than hedge_delay"""
+        kwargs["timeout"] = self._timeout(kind)
+
+        def call():
+            self.request_stats["requests"] += 1
+            return self.client.request(method, url, **kwargs)
+
+        if method != "GET" or not self.hedge_delay or self.breaker.state != CircuitBreaker.CLOSED:
+            return await call()
+
+        response, was_hedged, hedge_won = await hedged(call, self.hedge_delay)
+        if was_hedged:
+            self.request_stats["hedges"] += 1
+        if hedge_won:
+            self.request_stats["hedge_wins"] += 1
+        return response
+
+    async def _send(self, method: str, url: str, kind: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the circuit breaker, retrying with backoff
+
+        Idempotent methods are retried on transport errors and gateway
+        statuses; other methods only when the connection was never made.
+        """
+        idempotent = method in IDEMPOTENT_METHODS
+        last_error: Optional[Exception] = None
+
+        for attempt in range(self.retry_policy.max_attempts):
+            if attempt:
+                self.request_stats["retries"] += 1
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as e:
+                raise KeycloakUnavailableError(str(e), retry_after=e.retry_after) from e
+
+            try:
+                with KEYCLOAK_REQUEST_DURATION.time(kind=kind), tracer.start_span(
+                    "keycloak.request", kind="CLIENT",
+                    attributes={"http.method": method, "keycloak.kind": kind, "retry.attempt": attempt}
+                ) as span:
+                    response = await self._dispatch(method, url, kind, **kwargs)
+                    span.set_attribute("http.status_code", response.status_code)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                self.request_stats["failures"] += 1
+                if isinstance(e, httpx.TimeoutException):
+                    self.request_stats["timeouts"] += 1
+                last_error = e
+                if idempotent or isinstance(e, CONNECT_ERRORS):
+                    continue
+                break
+
+            if response.status_code in RETRYABLE_STATUSES:
+                self.breaker.record_failure()
+                self.request_stats["failures"] += 1
+                if idempotent and attempt + 1 < self.retry_policy.max_attempts:
+                    continue
+                return response
+
+            self.breaker.record_success()
+            return response
+
+        logger.error(f"Keycloak {method} {url} failed: {last_error!r}")
+        raise KeycloakUnavailableError(
+            f"Keycloak unavailable: {type(last_error).__name__}",
+            retry_after=self.breaker.retry_after()
+        )
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        """Request, retry and hedge counters plus circuit breaker state"""
+        return {**self.request_stats, "breaker": self.breaker.stats()}
+
+    # ==================== CACHE ====================
+
+    async def _cached(self, key: tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve a read from the cache, loading it once on a miss"""
+        return await self.cache.get_or_load(key, loader, ttl=self.cache_ttls.get(key[0], 0))
+
+    async def _get_json(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET an endpoint and decode the body, raising on any failure"""
+        response = await self._make_request("GET", endpoint, params=params)
+        if not response or response.status_code != 200:
+            raise KeycloakRequestError(response.status_code if response else "No response")
+        return response.json()
+
+    async def _get_count(self, endpoint: str) -> int:
+        """GET a count endpoint, raising on any failure"""
+        response = await self._make_request("GET", endpoint)
+        if not response or response.status_code != 200:
+            raise KeycloakRequestError(response.status_code if response else "No response")
+        try:
+            # Try to parse as JSON first (newer Keycloak versions)
+            data = response.json()
+            if isinstance(data, dict) and 'count' in data:
+                return data['count']
+            # Fallback to direct int conversion (older versions)
+            return int(response.text)
+        except (ValueError, KeyError):
+            raise KeycloakRequestError(f"Unparseable count: {response.text}")
+
+    def _invalidate_user(self, user_id: Optional[str] = None, count: bool = False) -> None:
+        """Drop cached user listings, and optionally one user and the user count"""
+        self.cache.invalidate_prefix("users")
+        if user_id:
+            self.cache.invalidate(("user", user_id))
+        if count:
+            self.cache.invalidate(("user_count",))
+
+    def _invalidate_group(self, group_id: Optional[str] = None, count: bool = False) -> None:
+        """Drop cached group listings, and optionally one group and the group count"""
+        self.cache.invalidate_prefix("groups")
+        if group_id:
+            self.cache.invalidate(("group", group_id))
+        if count:
+            self.cache.invalidate(("group_count",))
+
+    def _invalidate_membership(self, user_id: Optional[str] = None, group_id: Optional[str] = None) -> None:
+        """Drop cached memberships of a user and/or group (all of them when omitted)"""
+        if user_id:
+            self.cache.invalidate(("user_groups", user_id))
+        else:
+            self.cache.invalidate_prefix("user_groups")
+        if group_id:
+            self.cache.invalidate_prefix("group_members", group_id)
+        else:
+            self.cache.invalidate_prefix("group_members")
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters"""
+        return self.cache.stats()
+
+    # ==================== CONCURRENCY ====================
+
+    async def _bounded(self, awaitable: Awaitable[Any]) -> Any:
+        """Await a call while holding one of the concurrency slots"""
+        async with self._semaphore:
+            return await awaitable
+
+    async def gather(self, *awaitables: Awaitable[Any], return_exceptions: bool = False) -> List[Any]:
+        """
+        Run independent calls concurrently, at most max_concurrency at a time
+
+        Latency becomes that of the slowest call instead of the sum of all of
+        them, without letting a large fan-out flood Keycloak.
+        """
+        return await asyncio.gather(
+            *(self._bounded(awaitable) for awaitable in awaitables),
+            return_exceptions=return_exceptions
+        )
+
+    async def get_users(self, user_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get several users by ID"""
+        user_ids = list(dict.fromkeys(user_ids))
+        users = await self.gather(*(self.get_user(user_id) for user_id in user_ids))
+        return dict(zip(user_ids, users))
+
+    async def get_users_groups(self, user_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get group memberships for several users"""
+        user_ids = list(dict.fromkeys(user_ids))
+        groups = await self.gather(*(self.get_user_groups(user_id) for user_id in user_ids))
+        return dict(zip(user_ids, groups))
+
+    async def get_groups_members(
+        self,
+        group_ids: Iterable[str],
+        first: int = 0,
+        max: int = 100
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get members for several groups"""
+        group_ids = list(dict.fromkeys(group_ids))
+        members = await self.gather(
+            *(self.get_group_members(group_id, first=first, max=max) for group_id in group_ids)
+        )
+        return dict(zip(group_ids, members))
+
+    async def count_groups_members(self, group_ids: Iterable[str], page_size: int = 500) -> Dict[str, int]:
+        """Count the members of several groups, paging through groups of any size"""
+        async def count(group_id: str) -> int:
+            total, first = 0, 0
+            while True:
+                page = await self.get_group_members(group_id, first=first, max=page_size)
+                total += len(page)
+                if len(page) < page_size:
+                    return total
+                first += page_size
+
+        group_ids = list(dict.fromkeys(group_ids))
+        counts = await self.gather(*(count(group_id) for group_id in group_ids))
+        return dict(zip(group_ids, counts))
 
     # ==================== USER MANAGEMENT ====================
 
@@ -107,21 +413,18 @@ class KeycloakAdminService:
         if enabled is not None:
             params["enabled"] = str(enabled).lower()
 
-        response = await self._make_request("GET", "/users", params=params)
-
-        if response and response.status_code == 200:
-            return response.json()
-        else:
-            logger.error(f"Failed to list users: {response.status_code if response else 'No response'}")
+        key = ("users",) + tuple(sorted(params.items()))
+        try:
+            return await self._cached(key, lambda: self._get_json("/users", params=params))
+        except KeycloakRequestError as e:
+            logger.error(f"Failed to list users: {e}")
             return []
 
     async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
-        response = await self._make_request("GET", f"/users/{user_id}")
-
-        if response and response.status_code == 200:
-            return response.json()
-        else:
+        try:
+            return await self._cached(("user", user_id), lambda: self._get_json(f"/users/{user_id}"))
+        except KeycloakRequestError:
             logger.error(f"Failed to get user {user_id}")
             return None
 
@@ -156,6 +459,7 @@ class KeycloakAdminService:
         if response and response.status_code == 201:
             # Get user ID from Location header
             location = response.headers.get("Location")
+            self._invalidate_user(count=True)
             if location:
                 user_id = location.split("/")[-1]
                 logger.info(f"User created successfully: {user_id}")
@@ -175,10 +479,11 @@ class KeycloakAdminService:
         enabled: Optional[bool] = None
     ) -> bool:
         """Update user information"""
-        # Get current user data
+        # Get current user data (copied, the cached representation is shared)
         current_user = await self.get_user(user_id)
         if not current_user:
             return False
+        current_user = dict(current_user)
 
         # Update only provided fields
         if email is not None:
@@ -193,6 +498,9 @@ class KeycloakAdminService:
         response = await self._make_request("PUT", f"/users/{user_id}", json=current_user)
 
         if response and response.status_code == 204:
+            # Member listings embed the user representation
+            self._invalidate_user(user_id)
+            self.cache.invalidate_prefix("group_members")
             logger.info(f"User {user_id} updated successfully")
             return True
         else:
@@ -204,6 +512,8 @@ class KeycloakAdminService:
         response = await self._make_request("DELETE", f"/users/{user_id}")
 
         if response and response.status_code == 204:
+            self._invalidate_user(user_id, count=True)
+            self._invalidate_membership(user_id)
             logger.info(f"User {user_id} deleted successfully")
             return True
         else:
@@ -233,31 +543,21 @@ class KeycloakAdminService:
 
     async def get_user_groups(self, user_id: str) -> List[Dict[str, Any]]:
         """Get groups that user belongs to"""
-        response = await self._make_request("GET", f"/users/{user_id}/groups")
-
-        if response and response.status_code == 200:
-            return response.json()
-        else:
+        try:
+            return await self._cached(
+                ("user_groups", user_id),
+                lambda: self._get_json(f"/users/{user_id}/groups")
+            )
+        except KeycloakRequestError:
             logger.error(f"Failed to get groups for user {user_id}")
             return []
 
     async def get_user_count(self) -> int:
         """Get total user count"""
-        response = await self._make_request("GET", "/users/count")
-
-        if response and response.status_code == 200:
-            try:
-                # Try to parse as JSON first (newer Keycloak versions)
-                data = response.json()
-                if isinstance(data, dict) and 'count' in data:
-                    return data['count']
-                # Fallback to direct int conversion (older versions)
-                return int(response.text)
-            except (ValueError, KeyError):
-                logger.error(f"Failed to parse user count: {response.text}")
-                return 0
-        else:
-            logger.error("Failed to get user count")
+        try:
+            return await self._cached(("user_count",), lambda: self._get_count("/users/count"))
+        except KeycloakRequestError as e:
+            logger.error(f"Failed to get user count: {e}")
             return 0
 
     # ==================== GROUP MANAGEMENT ====================
@@ -277,21 +577,18 @@ class KeycloakAdminService:
         if search:
             params["search"] = search
 
-        response = await self._make_request("GET", "/groups", params=params)
-
-        if response and response.status_code == 200:
-            return response.json()
-        else:
+        key = ("groups",) + tuple(sorted(params.items()))
+        try:
+            return await self._cached(key, lambda: self._get_json("/groups", params=params))
+        except KeycloakRequestError:
             logger.error("Failed to list groups")
             return []
 
     async def get_group(self, group_id: str) -> Optional[Dict[str, Any]]:
         """Get group by ID"""
-        response = await self._make_request("GET", f"/groups/{group_id}")
-
-        if response and response.status_code == 200:
-            return response.json()
-        else:
+        try:
+            return await self._cached(("group", group_id), lambda: self._get_json(f"/groups/{group_id}"))
+        except KeycloakRequestError:
             logger.error(f"Failed to get group {group_id}")
             return None
 
@@ -311,6 +608,7 @@ class KeycloakAdminService:
         if response and response.status_code == 201:
             # Get group ID from Location header
             location = response.headers.get("Location")
+            self._invalidate_group(count=True)
             if location:
                 group_id = location.split("/")[-1]
                 logger.info(f"Group created successfully: {group_id}")
@@ -327,10 +625,11 @@ class KeycloakAdminService:
         attributes: Optional[Dict] = None
     ) -> bool:
         """Update group information"""
-        # Get current group data
+        # Get current group data (copied, the cached representation is shared)
         current_group = await self.get_group(group_id)
         if not current_group:
             return False
+        current_group = dict(current_group)
 
         # Update only provided fields
         if name is not None:
@@ -341,6 +640,9 @@ class KeycloakAdminService:
         response = await self._make_request("PUT", f"/groups/{group_id}", json=current_group)
 
         if response and response.status_code == 204:
+            # User group listings embed the group name and path
+            self._invalidate_group(group_id)
+            self.cache.invalidate_prefix("user_groups")
             logger.info(f"Group {group_id} updated successfully")
             return True
         else:
@@ -352,6 +654,9 @@ class KeycloakAdminService:
         response = await self._make_request("DELETE", f"/groups/{group_id}")
 
         if response and response.status_code == 204:
+            self._invalidate_group(group_id, count=True)
+            self._invalidate_membership(group_id=group_id)
+            self.cache.invalidate_prefix("user_groups")
             logger.info(f"Group {group_id} deleted successfully")
             return True
         else:
@@ -365,11 +670,12 @@ class KeycloakAdminService:
             "max": max
         }
 
-        response = await self._make_request("GET", f"/groups/{group_id}/members", params=params)
-
-        if response and response.status_code == 200:
-            return response.json()
-        else:
+        try:
+            return await self._cached(
+                ("group_members", group_id, first, max),
+                lambda: self._get_json(f"/groups/{group_id}/members", params=params)
+            )
+        except KeycloakRequestError:
             logger.error(f"Failed to get members for group {group_id}")
             return []
 
@@ -378,6 +684,7 @@ class KeycloakAdminService:
         response = await self._make_request("PUT", f"/users/{user_id}/groups/{group_id}")
 
         if response and response.status_code == 204:
+            self._invalidate_membership(user_id, group_id)
             logger.info(f"User {user_id} added to group {group_id}")
             return True
         else:
@@ -389,6 +696,7 @@ class KeycloakAdminService:
         response = await self._make_request("DELETE", f"/users/{user_id}/groups/{group_id}")
 
         if response and response.status_code == 204:
+            self._invalidate_membership(user_id, group_id)
             logger.info(f"User {user_id} removed from group {group_id}")
             return True
         else:
@@ -397,23 +705,76 @@ class KeycloakAdminService:
 
     async def get_group_count(self) -> int:
         """Get total group count"""
-        response = await self._make_request("GET", "/groups/count")
-
-        if response and response.status_code == 200:
-            try:
-                # Try to parse as JSON first (newer Keycloak versions)
-                data = response.json()
-                if isinstance(data, dict) and 'count' in data:
-                    return data['count']
-                # Fallback to direct int conversion (older versions)
-                return int(response.text)
-            except (ValueError, KeyError):
-                logger.error(f"Failed to parse group count: {response.text}")
-                return 0
-        else:
-            logger.error("Failed to get group count")
+        try:
+            return await self._cached(("group_count",), lambda: self._get_count("/groups/count"))
+        except KeycloakRequestError as e:
+            logger.error(f"Failed to get group count: {e}")
             return 0
 
     async def close(self):
         """Close HTTP client"""
         await self.client.aclose()
+
+
+def _cache_ttls_from_env() -> Dict[str, float]:
+    """Per-kind TTLs from KEYCLOAK_CACHE_TTL_<KIND>; KEYCLOAK_CACHE_ENABLED=false disables all"""
+    if os.getenv("KEYCLOAK_CACHE_ENABLED", "true").lower() != "true":
+        return {kind: 0 for kind in DEFAULT_CACHE_TTLS}
+    return {
+        kind: float(os.getenv(f"KEYCLOAK_CACHE_TTL_{kind.upper()}", str(ttl)))
+        for kind, ttl in DEFAULT_CACHE_TTLS.items()
+    }
+
+
+def create_keycloak_admin_from_env(cache: bool = True) -> KeycloakAdminService:
+    """Create a Keycloak Admin Service configured from environment variables"""
+    hedge_delay_ms = float(os.getenv("KEYCLOAK_HEDGE_DELAY_MS", "0"))
+    return KeycloakAdminService(
+        server_url=os.getenv("KEYCLOAK_URL", "http://localhost:8080"),
+        realm=os.getenv("KEYCLOAK_REALM", "sentinela"),
+        client_id=os.getenv("KEYCLOAK_CLIENT_ID", "sentinela-api"),
+        client_secret=os.getenv("KEYCLOAK_CLIENT_SECRET", "sentinela-secret"),
+        admin_username=os.getenv("KEYCLOAK_ADMIN_USERNAME", "admin"),
+        admin_password=os.getenv("KEYCLOAK_ADMIN_PASSWORD", "admin123"),
+        max_concurrency=int(os.getenv("KEYCLOAK_MAX_CONCURRENCY", "8")),
+        cache_ttls=_cache_ttls_from_env() if cache else {kind: 0 for kind in DEFAULT_CACHE_TTLS},
+        cache_max_entries=int(os.getenv("KEYCLOAK_CACHE_MAX_ENTRIES", "10000")),
+        timeouts={
+            kind: float(os.getenv(f"KEYCLOAK_TIMEOUT_{kind.upper()}", str(timeout)))
+            for kind, timeout in DEFAULT_TIMEOUTS.items()
+        },
+        retry_policy=RetryPolicy(
+            max_attempts=int(os.getenv("KEYCLOAK_RETRY_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("KEYCLOAK_RETRY_BASE_DELAY", "0.1"))
+        ),
+        breaker=CircuitBreaker(
+            "keycloak",
+            failure_threshold=int(os.getenv("KEYCLOAK_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("KEYCLOAK_BREAKER_RESET_TIMEOUT", "30"))
+        ),
+        hedge_delay=hedge_delay_ms / 1000 if hedge_delay_ms > 0 else None
+    )
+
+
+_shared_service: Optional[KeycloakAdminService] = None
+
+
+def get_shared_keycloak_admin() -> KeycloakAdminService:
+    """
+    Get the process-wide Keycloak Admin Service
+
+    Sharing one instance lets requests reuse the admin token, the connection
+    pool and the read cache instead of starting cold every time.
+    """
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = create_keycloak_admin_from_env()
+    return _shared_service
+
+
+async def close_shared_keycloak_admin():
+    """Close the process-wide service (called on application shutdown)"""
+    global _shared_service
+    if _shared_service is not None:
+        await _shared_service.close()
+        _shared_service = None
@@ -0,0 +1,449 @@
+"""
+Keycloak Sync Service
+Mirrors Keycloak users, groups and memberships into the local database
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database_pg import SessionLocal
+from models.user import KEYCLOAK_MANAGED_PASSWORD, User, UserStatus
+from models.group import Group
+from models.user_group import UserGroup
+from services.keycloak_admin import create_keycloak_admin_from_env
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVAL_SECONDS = int(os.getenv("KEYCLOAK_SYNC_INTERVAL", "300"))
+SYNC_PAGE_SIZE = int(os.getenv("KEYCLOAK_SYNC_PAGE_SIZE", "100"))
+SYNC_MAX_CONCURRENCY = int(os.getenv("KEYCLOAK_SYNC_CONCURRENCY", "4"))
+
+
+class SyncAborted(Exception):
+    """Raised when Keycloak returned an incomplete snapshot"""
+
+
+@dataclass
+class SyncStats:
+    """Counters for one entity type in a sync run"""
+    fetched: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+
+@dataclass
+class SyncResult:
+    """Outcome of a full sync run"""
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    users: SyncStats = field(default_factory=SyncStats)
+    groups: SyncStats = field(default_factory=SyncStats)
+    memberships_changed: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["started_at"] = self.started_at.isoformat()
+        data["finished_at"] = self.finished_at.isoformat() if self.finished_at else None
+        return data
+
+
+def content_hash(data: Dict[str, Any]) -> str:
+    """Stable SHA-256 over the canonical JSON form of a representation"""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def user_fingerprint(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a Keycloak user that are mirrored locally"""
+    return {
+        "id": user.get("id"),
+        "username": user.get("username"),
+        "email": (user.get("email") or "").lower(),
+        "firstName": user.get("firstName") or "",
+        "lastName": user.get("lastName") or "",
+        "enabled": bool(user.get("enabled", True)),
+    }
+
+
+def group_fingerprint(group: Dict[str, Any], member_ids: List[str]) -> Dict[str, Any]:
+    """Fields of a Keycloak group (including its members) that are mirrored locally"""
+    return {
+        "id": group.get("id"),
+        "name": group.get("name"),
+        "path": group.get("path"),
+        "parent": group.get("parentId"),
+        "attributes": group.get("attributes") or {},
+        "members": sorted(member_ids),
+    }
+
+
+def flatten_groups(groups: List[Dict[str, Any]], parent_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Flatten Keycloak's nested subGroups, recording each group's parent"""
+    flat = []
+    for group in groups:
+        flat.append({**group, "parentId": parent_id})
+        flat.extend(flatten_groups(group.get("subGroups") or [], group.get("id")))
+    return flat
+
+
+class KeycloakSyncService:
+    """
+    Incremental Keycloak-to-local reconciliation
+
+    Each run pages through Keycloak with bounded concurrency, hashes every
+    user and group representation and only writes rows whose hash differs
+    from the one stored locally. Users and groups that disappeared from
+    Keycloak are deactivated or removed. Any object exposing the
+    ``KeycloakAdminService`` list/count/member methods can be used as the
+    source, which keeps the engine testable against a mock Keycloak.
+    """
+
+    def __init__(
+        self,
+        keycloak,
+        session_factory: Callable[[], Session] = SessionLocal,
+        page_size: int = SYNC_PAGE_SIZE,
+        max_concurrency: int = SYNC_MAX_CONCURRENCY
+    ):
+        self.keycloak = keycloak
+        self.session_factory = session_factory
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.last_result: Optional[SyncResult] = None
+        self.last_error: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    # ==================== FETCHING ====================
+
+    async def _fetch_all(
+        self,
+        list_page: Callable[..., Awaitable[List[Dict[str, Any]]]],
+        count: Callable[[], Awaitable[int]]
+    ) -> List[Dict[str, Any]]:
+        """Fetch every page of a listing, several pages at a time"""
+        total = await count()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(first: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await list_page(first=first, max=self.page_size)
+
+        offsets = list(range(0, max(total, 1), self.page_size))
+        pages = await asyncio.gather(*(fetch(first) for first in offsets))
+
+        # Only the last page may be short; anything else means a failed request
+        for first, page in zip(offsets[:-1], pages[:-1]):
+            if len(page) < self.page_size:
+                raise SyncAborted(f"Incomplete page at offset {first}: {len(page)} items")
+
+        items = [item for page in pages for item in page]
+
+        # The realm may have grown since the count was taken
+        first = offsets[-1] + self.page_size
+        while pages[-1] and len(pages[-1]) == self.page_size:
+            pages = [await list_page(first=first, max=self.page_size)]
+            items.extend(pages[-1])
+            first += self.page_size
+
+        unique = {item["id"]: item for item in items if item.get("id")}
+        return list(unique.values())
+
+    async def _fetch_memberships(self, groups: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Fetch member IDs for every group with bounded concurrency"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(group_id: str) -> List[str]:
+            member_ids: List[str] = []
+            first = 0
+            while True:
+                async with semaphore:
+                    page = await self.keycloak.get_group_members(group_id, first=first, max=self.page_size)
+                member_ids.extend(member["id"] for member in page if member.get("id"))
+                if len(page) < self.page_size:
+                    return member_ids
+                first += self.page_size
+
+        group_ids = [group["id"] for group in groups]
+        members = await asyncio.gather(*(fetch(group_id) for group_id in group_ids))
+        return dict(zip(group_ids, members))
+
+    # ==================== APPLYING ====================
+
+    def _apply_users(self, db: Session, remote_users: List[Dict[str, Any]], stats: SyncStats) -> None:
+        """Insert, update or deactivate local users whose hash changed"""
+        now = datetime.utcnow()
+        local = {
+            user.keycloak_id: user
+            for user in db.query(User).filter(User.keycloak_id.isnot(None))
+        }
+        if local and not remote_users:
+            raise SyncAborted("Keycloak returned no users; refusing to deactivate every mirrored user")
+
+        remote_ids = set()
+        unlinked = []
+        for remote in remote_users:
+            fingerprint = user_fingerprint(remote)
+            if not fingerprint["email"]:
+                continue
+            remote_ids.add(fingerprint["id"])
+            digest = content_hash(fingerprint)
+            user = local.get(fingerprint["id"])
+            if user is None:
+                unlinked.append((fingerprint, digest))
+            elif user.sync_hash == digest:
+                stats.unchanged += 1
+            else:
+                self._update_user(user, fingerprint, digest, now)
+                stats.updated += 1
+
+        # Adopt existing local accounts with the same email before inserting: unlinked ones, and
+        # ones linked to a Keycloak user that is gone (deleted and recreated with the same email)
+        if unlinked:
+            emails = [fingerprint["email"] for fingerprint, _ in unlinked]
+            stale_ids = [keycloak_id for keycloak_id in local if keycloak_id not in remote_ids]
+            by_email = {
+                user.email.lower(): user
+                for user in db.query(User).filter(
+                    func.lower(User.email).in_(emails),
+                    or_(User.keycloak_id.is_(None), User.keycloak_id.in_(stale_ids))
+                )
+            }
+            for fingerprint, digest in unlinked:
+                user = by_email.get(fingerprint["email"])
+                if user is None:
+                    user = User(
+                        email=fingerprint["email"],
+                        password_hash=KEYCLOAK_MANAGED_PASSWORD,
+                        keycloak_id=fingerprint["id"]
+                    )
+                    db.add(user)
+                    stats.created += 1
+                else:
+                    user.keycloak_id = fingerprint["id"]
+                    stats.updated += 1
+                self._update_user(user, fingerprint, digest, now)
+
+        # Rows relinked above now carry their new id and are left alone
+        for user in local.values():
+            if user.keycloak_id not in remote_ids and user.status == UserStatus.ACTIVE:
+                user.status = UserStatus.INACTIVE
+                user.sync_hash = None
+                user.synced_at = now
+                stats.removed += 1
+
+    @staticmethod
+    def _update_user(user: User, fingerprint: Dict[str, Any], digest: str, now: datetime) -> None:
+        full_name = f"{fingerprint['firstName']} {fingerprint['lastName']}".strip()
+        user.email = fingerprint["email"]
+        user.name = full_name or fingerprint["username"] or fingerprint["email"]
+        user.status = UserStatus.ACTIVE if fingerprint["enabled"] else UserStatus.INACTIVE
+        user.sync_hash = digest
+        user.synced_at = now
+
+    def _apply_groups(
+        self,
+        db: Session,
+        remote_groups: List[Dict[str, Any]],
+        memberships: Dict[str, List[str]],
+        stats: SyncStats
+    ) -> int:
+        """Insert, update or remove local groups and reconcile changed memberships"""
+        now = datetime.utcnow()
+        local = {
+            group.keycloak_id: group
+            for group in db.query(Group).filter(Group.keycloak_id.isnot(None))
+        }
+        if local and not remote_groups:
+            raise SyncAborted("Keycloak returned no groups; refusing to remove every mirrored group")
+        by_name = {
+            group.name: group
+            for group in db.query(Group).filter(Group.keycloak_id.is_(None))
+        }
+
+        changed: List[Group] = []
+        remote_ids = set()
+        for remote in remote_groups:
+            fingerprint = group_fingerprint(remote, memberships.get(remote["id"], []))
+            remote_ids.add(fingerprint["id"])
+            digest = content_hash(fingerprint)
+            group = local.get(fingerprint["id"])
+            if group is not None and group.sync_hash == digest:
+                stats.unchanged += 1
+                continue
+
+            if group is None:
+                group = by_name.get(fingerprint["name"])
+                if group is None:
+                    group = Group(name=fingerprint["name"])
+                    db.add(group)
+                    stats.created += 1
+                else:
+                    stats.updated += 1
+                group.keycloak_id = fingerprint["id"]
+            else:
+                stats.updated += 1
+
+            # Keycloak stores free-form attributes as lists of strings
+            description = fingerprint["attributes"].get("description") or []
+            if description:
+                group.description = description[0]
+            group.name = fingerprint["name"]
+            group.sync_hash = digest
+            group.synced_at = now
+            changed.append(group)
+
+        for keycloak_id, group in local.items():
+            if keycloak_id not in remote_ids:
+                db.delete(group)
+                stats.removed += 1
+
+        db.flush()
+
+        # Parents may have been inserted in this run, so link them after the flush
+        if changed:
+            group_ids = dict(db.query(Group.keycloak_id, Group.id).filter(Group.keycloak_id.isnot(None)))
+            parents = {group["id"]: group.get("parentId") for group in remote_groups}
+            for group in changed:
+                group.parent_id = group_ids.get(parents.get(group.keycloak_id))
+
+        return self._apply_memberships(db, changed, memberships, now)
+
+    @staticmethod
+    def _apply_memberships(
+        db: Session,
+        groups: List[Group],
+        memberships: Dict[str, List[str]],
+        now: datetime
+    ) -> int:
+        """Rewrite memberships for groups whose content hash changed"""
+        if not groups:
+            return 0
+
+        member_keycloak_ids = {member_id for group in groups for member_id in memberships.get(group.keycloak_id, [])}
+        user_ids = dict(
+            db.query(User.keycloak_id, User.id).filter(User.keycloak_id.in_(member_keycloak_ids))
+        ) if member_keycloak_ids else {}
+
+        changes = 0
+        for group in groups:
+            desired = {user_ids[member_id] for member_id in memberships.get(group.keycloak_id, []) if member_id in user_ids}
+            existing = {
+                membership.user_id: membership
+                for membership in db.query(UserGroup).filter(UserGroup.group_id == group.id)
+            }
+            for user_id, membership in existing.items():
+                active = 1 if user_id in desired else 0
+                if membership.is_active != active:
+                    membership.is_active = active
+                    changes += 1
+            for user_id in desired - existing.keys():
+                db.add(UserGroup(user_id=user_id, group_id=group.id, added_at=now, is_active=1))
+                changes += 1
+        return changes
+
+    def _apply(
+        self,
+        result: SyncResult,
+        remote_users: List[Dict[str, Any]],
+        remote_groups: List[Dict[str, Any]],
+        memberships: Dict[str, List[str]]
+    ) -> None:
+        """Apply a complete snapshot in a single transaction"""
+        db = self.session_factory()
+        try:
+            self._apply_users(db, remote_users, result.users)
+            db.flush()
+            result.memberships_changed = self._apply_groups(db, remote_groups, memberships, result.groups)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    # ==================== RUNNING ====================
+
+    async def sync(self) -> SyncResult:
+        """Run one full reconciliation"""
+        async with self._lock:
+            result = SyncResult(started_at=datetime.utcnow())
+            try:
+                remote_users, top_level_groups = await asyncio.gather(
+                    self._fetch_all(self.keycloak.list_users, self.keycloak.get_user_count),
+                    self._fetch_all(self.keycloak.list_groups, self.keycloak.get_group_count)
+                )
+                remote_groups = flatten_groups(top_level_groups)
+                memberships = await self._fetch_memberships(remote_groups)
+                result.users.fetched = len(remote_users)
+                result.groups.fetched = len(remote_groups)
+
+                await asyncio.to_thread(self._apply, result, remote_users, remote_groups, memberships)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Keycloak sync failed: {e}")
+                raise
+
+            result.finished_at = datetime.utcnow()
+            self.last_result = result
+            self.last_error = None
+            logger.info(f"Keycloak sync finished: {result.to_dict()}")
+            return result
+
+    async def run_forever(self, interval: int = SYNC_INTERVAL_SECONDS) -> None:
+        """Sync periodically until cancelled"""
+        while True:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # already logged; retry on the next tick
+            await asyncio.sleep(interval)
+
+    def start(self, interval: int = SYNC_INTERVAL_SECONDS) -> None:
+        """Start the background sync loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever(interval))
+
+    async def stop(self) -> None:
+        """Stop the background sync loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        """Current state of the sync engine"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "in_progress": self._lock.locked(),
+            "last_result": self.last_result.to_dict() if self.last_result else None,
+            "last_error": self.last_error,
+        }
+
+
+_sync_service: Optional[KeycloakSyncService] = None
+
+
+def get_sync_service() -> KeycloakSyncService:
+    """Get the process-wide sync service"""
+    global _sync_service
+    if _sync_service is None:
+        # Uncached client: the sync must always see Keycloak's current state
+        _sync_service = KeycloakSyncService(create_keycloak_admin_from_env(cache=False))
+    return _sync_service
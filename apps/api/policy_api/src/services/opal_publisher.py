@@ -0,0 +1,353 @@
+"""
+OPAL Policy Publisher
+Delivers policy changes from the policy_events outbox to OPAL as coalesced deltas
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text, update
+from sqlalchemy.orm import Session
+
+from database_pg import SessionLocal
+from models.policy import Policy
+from models.policy_event import PolicyEvent
+from services.opal_service import OPALService
+from services.resilience import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOPIC = "policy_data"
+PUBLISH_DEBOUNCE_SECONDS = float(os.getenv("OPAL_PUBLISH_DEBOUNCE_MS", "500")) / 1000
+PUBLISH_POLL_INTERVAL = float(os.getenv("OPAL_PUBLISH_POLL_INTERVAL", "5"))
+PUBLISH_BATCH_SIZE = int(os.getenv("OPAL_PUBLISH_BATCH_SIZE", "1000"))
+MAX_BACKOFF_SECONDS = 60.0
+# Advisory lock serializing transactions that write policy events (PostgreSQL)
+EVENT_ORDER_LOCK_KEY = 0x706f6c6576
+
+
+# ==================== OUTBOX ====================
+
+def policy_snapshot(policy: Policy) -> Dict[str, Any]:
+    """Representation of a policy shipped to data planes"""
+    return {
+        "id": policy.id,
+        "name": policy.name,
+        "content": policy.content,
+        "content_hash": policy.content_hash,
+        "application_id": policy.application_id,
+        "version": policy.version,
+        "status": policy.status.value if policy.status else None,
+    }
+
+
+def policy_change(policy: Policy, op: str) -> Dict[str, Any]:
+    """
+    Change entry for an outbox payload
+
+    ``op`` is "upsert" (the policy is active with this content) or "delete"
+    (the policy no longer applies).
+    """
+    change: Dict[str, Any] = {"op": op, "policy_id": policy.id}
+    if op == "upsert":
+        change["policy"] = policy_snapshot(policy)
+    return change
+
+
+def lock_event_order(db: Session) -> None:
+    """
+    Make policy event ids follow commit order
+
+    Ids come from a sequence, so two transactions could otherwise commit
+    out of id order and a feed reader past id N+1 would never see id N.
+    The lock is taken before the event id is allocated and held until the
+    transaction ends, so event writers commit one after the other. SQLite
+    already serializes writers; other databases are not covered.
+
+    Callers that also lock rows take this lock first, so every event
+    writer acquires locks in the same order. Taking it again in the same
+    transaction is a no-op.
+    """
+    if db.bind.dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": EVENT_ORDER_LOCK_KEY})
+
+
+def record_policy_event(
+    db: Session,
+    policy: Policy,
+    op: str,
+    topic: str = DEFAULT_TOPIC
+) -> PolicyEvent:
+    """
+    Add an outbox event for a policy change to the current transaction
+
+    The caller commits the event together with the change itself, so a
+    change is never lost nor published twice.
+    """
+    lock_event_order(db)
+    event = PolicyEvent(topic=topic, policy_id=policy.id, payload={"changes": [policy_change(policy, op)]})
+    db.add(event)
+    return event
+
+
+def record_policy_set_event(
+    db: Session,
+    changes: List[Dict[str, Any]],
+    topic: str = DEFAULT_TOPIC
+) -> PolicyEvent:
+    """Add one outbox event covering several policy changes (one policy-set version)"""
+    policy_ids = {change["policy_id"] for change in changes}
+    lock_event_order(db)
+    event = PolicyEvent(
+        topic=topic,
+        policy_id=next(iter(policy_ids)) if len(policy_ids) == 1 else None,
+        payload={"changes": changes}
+    )
+    db.add(event)
+    return event
+
+
+def coalesce_changes(events: List[PolicyEvent]) -> List[Dict[str, Any]]:
+    """Keep only the last change per policy, ordered by when it was last touched"""
+    latest: Dict[Any, Dict[str, Any]] = {}
+    for event in events:
+        for change in (event.payload or {}).get("changes", []):
+            key = change.get("policy_id")
+            latest.pop(key, None)
+            latest[key] = change
+    return list(latest.values())
+
+
+# ==================== PUBLISHER ====================
+
+class OPALPublisher:
+    """
+    Background worker draining the policy_events outbox
+
+    Wakes up when notified (or every ``poll_interval``), waits ``debounce``
+    seconds so bursts of edits collapse into one delta, then sends one
+    versioned delta per topic. Events are locked while being published so
+    concurrent workers cannot reorder them, and a topic's events stay
+    pending until OPAL accepts them.
+    """
+
+    def __init__(
+        self,
+        opal: OPALService,
+        session_factory: Callable[[], Session] = SessionLocal,
+        debounce: float = PUBLISH_DEBOUNCE_SECONDS,
+        poll_interval: float = PUBLISH_POLL_INTERVAL,
+        batch_size: int = PUBLISH_BATCH_SIZE,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
+        self.opal = opal
+        self.session_factory = session_factory
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=3, base_delay=0.5)
+        self._wakeup = asyncio.Event()
+        self._immediate = False
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._consecutive_failures = 0
+        self.last_versions: Dict[str, int] = {}
+        self.last_published_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.stats = {"events_published": 0, "deltas_sent": 0, "delivery_failures": 0}
+
+    def notify(self, immediate: bool = False) -> None:
+        """Signal that new events were committed (``immediate`` skips the debounce)"""
+        self._immediate = self._immediate or immediate
+        self._wakeup.set()
+
+    # ==================== DATABASE ====================
+
+    def _claim(self, db: Session) -> Dict[str, Tuple[Optional[int], List[PolicyEvent]]]:
+        """Lock pending events in id order and group them by topic"""
+        events = (
+            db.query(PolicyEvent)
+            .filter(PolicyEvent.published_at.is_(None))
+            .order_by(PolicyEvent.id)
+            .limit(self.batch_size)
+            .with_for_update()
+            .all()
+        )
+
+        batches: Dict[str, Tuple[Optional[int], List[PolicyEvent]]] = {}
+        for event in events:
+            if event.topic not in batches:
+                previous = (
+                    db.query(func.max(PolicyEvent.id))
+                    .filter(PolicyEvent.topic == event.topic, PolicyEvent.published_at.isnot(None))
+                    .scalar()
+                )
+                batches[event.topic] = (previous, [])
+            batches[event.topic][1].append(event)
+        return batches
+
+    def _mark(self, db: Session, event_ids: List[int], error: Optional[str]) -> None:
+        """Record the delivery outcome for a topic's events"""
+        query = update(PolicyEvent).where(PolicyEvent.id.in_(event_ids))
+        if error is None:
+            db.execute(query.values(published_at=datetime.utcnow(), last_error=None))
+        else:
+            db.execute(query.values(attempts=PolicyEvent.attempts + 1, last_error=error))
+
+    def _pending_count(self) -> int:
+        db = self.session_factory()
+        try:
+            return db.query(func.count(PolicyEvent.id)).filter(PolicyEvent.published_at.is_(None)).scalar()
+        finally:
+            db.close()
+
+    # ==================== DELIVERY ====================
+
+    async def _deliver(self, delta: Dict[str, Any], topic: str) -> Optional[str]:
+        """Send a delta with retries; returns an error message on failure"""
+        for attempt in range(self.retry_policy.max_attempts):
+            if attempt:
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+            if await self.opal.notify_policy_update(delta, topic=topic):
+                return None
+        return f"OPAL rejected delta {delta['from_version']}..{delta['version']} after {self.retry_policy.max_attempts} attempts"
+
+    async def publish_pending(self) -> int:
+        """Publish every pending event once; returns the number of events delivered"""
+        async with self._lock:
+            db = self.session_factory()
+            try:
+                batches = await asyncio.to_thread(self._claim, db)
+                published = 0
+                failed = False
+
+                for topic, (previous, events) in batches.items():
+                    delta = {
+                        "topic": topic,
+                        "from_version": previous,
+                        "version": events[-1].id,
+                        "changes": coalesce_changes(events),
+                        "event_count": len(events),
+                    }
+                    error = await self._deliver(delta, topic)
+                    await asyncio.to_thread(self._mark, db, [event.id for event in events], error)
+
+                    if error is None:
+                        published += len(events)
+                        self.stats["deltas_sent"] += 1
+                        self.last_versions[topic] = delta["version"]
+                        self.last_published_at = datetime.utcnow()
+                        logger.info(
+                            f"Published {len(events)} policy events to OPAL topic '{topic}' "
+                            f"as {len(delta['changes'])} changes (version {delta['version']})"
+                        )
+                    else:
+                        failed = True
+                        self.stats["delivery_failures"] += 1
+                        self.last_error = error
+                        logger.error(error)
+
+                # Commit once so other workers see every topic's outcome together
+                await asyncio.to_thread(db.commit)
+            except Exception:
+                await asyncio.to_thread(db.rollback)
+                raise
+            finally:
+                db.close()
+
+            self.stats["events_published"] += published
+            self._consecutive_failures = self._consecutive_failures + 1 if failed else 0
+            if not failed:
+                self.last_error = None
+            return published
+
+    # ==================== RUNNING ====================
+
+    def _next_wait(self) -> float:
+        if not self._consecutive_failures:
+            return self.poll_interval
+        return min(MAX_BACKOFF_SECONDS, self.poll_interval * (2 ** self._consecutive_failures))
+
+    async def run_forever(self) -> None:
+        """Publish on notification or poll interval until cancelled"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_wait())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                # Let a burst of edits accumulate into a single delta
+                if not self._immediate:
+                    await asyncio.sleep(self.debounce)
+                self._immediate = False
+                await self.publish_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._consecutive_failures += 1
+                self.last_error = str(e)
+                logger.error(f"OPAL publication failed: {e}")
+
+    def start(self) -> None:
+        """Start the background publisher"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+            # Drain anything left over from a previous run
+            self.notify()
+
+    async def stop(self) -> None:
+        """Stop the background publisher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def status(self) -> Dict[str, Any]:
+        """Current state of the publisher"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "pending_events": await asyncio.to_thread(self._pending_count),
+            "last_versions": dict(self.last_versions),
+            "last_published_at": self.last_published_at.isoformat() if self.last_published_at else None,
+            "last_error": self.last_error,
+            **self.stats,
+        }
+
+
+_publisher: Optional[OPALPublisher] = None
+
+
+def get_policy_publisher() -> Optional[OPALPublisher]:
+    """Get the process-wide publisher, if one was started"""
+    return _publisher
+
+
+def start_policy_publisher(opal: OPALService) -> OPALPublisher:
+    """Create and start the process-wide publisher"""
+    global _publisher
+    if _publisher is None:
+        _publisher = OPALPublisher(opal)
+    _publisher.start()
+    return _publisher
+
+
+async def stop_policy_publisher() -> None:
+    """Stop the process-wide publisher"""
+    global _publisher
+    if _publisher is not None:
+        await _publisher.stop()
+        _publisher = None
+
+
+def notify_policy_publisher(immediate: bool = False) -> None:
+    """Wake the publisher after committing policy events (no-op when not running)"""
+    if _publisher is not None:
+        _publisher.notify(immediate)
@@ -7,8 +7,13 @@ import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from services.metrics import REGISTRY
+from services.tracing import inject_httpx_request, tracer
+
 logger = logging.getLogger(__name__)
 
+OPAL_REQUEST_DURATION = REGISTRY.histogram("opal_request_duration_seconds", "OPAL server latency by operation")
+
 
 class OPALService:
     """Service for interacting with OPAL server"""
@@ -19,13 +24,15 @@ class OPALService:
         self.client = httpx.AsyncClient(
             base_url=server_url,
             headers={"Authorization": f"Bearer {auth_token}"},
-            timeout=30.0
+            timeout=30.0,
+            event_hooks={"request": [inject_httpx_request]}
         )
     
     async def health_check(self) -> bool:
         """Check if OPAL server is healthy"""
         try:
-            response = await self.client.get("/health")
+            with OPAL_REQUEST_DURATION.time(operation="health"):
+                response = await self.client.get("/health")
             return response.status_code == 200
         except Exception as e:
             logger.error(f"OPAL health check failed: {e}")
@@ -44,10 +51,13 @@ class OPALService:
                 "topic": topic
             }
             
-            response = await self.client.post(
-                "/policy-updates",
-                json=payload
-            )
+            with OPAL_REQUEST_DURATION.time(operation="notify"), tracer.start_span(
+                "opal.notify", kind="CLIENT", attributes={"opal.topic": topic}
+            ):
+                response = await self.client.post(
+                    "/policy-updates",
+                    json=payload
+                )
             
             if response.status_code == 200:
                 logger.info(f"Policy update notification sent successfully")
@@ -63,7 +73,8 @@ class OPALService:
     async def get_policy_data(self, path: str = "/") -> Optional[Dict[str, Any]]:
         """Get current policy data from OPAL server"""
         try:
-            response = await self.client.get(f"/policy-data{path}")
+            with OPAL_REQUEST_DURATION.time(operation="policy_data"):
+                response = await self.client.get(f"/policy-data{path}")
             if response.status_code == 200:
                 return response.json()
             else:
@@ -0,0 +1,168 @@
+"""
+Partition Indexes
+Per-partition time range and entity bloom filter, kept next to each data file
+
+A partition is one append-only data file (an audit JSON lines file, a
+decision log segment). Its index, ``<file>.idx``, records the oldest and
+newest timestamp written, the number of records, the file size covered
+and a bloom filter of the entity ids in it. A query reads the small index
+files first and only scans partitions whose range overlaps the requested
+window and whose bloom filter may contain the requested entities.
+
+An index only vouches for the bytes it covers: a partition whose file grew
+past ``covered_bytes`` (a crash between the data write and the index
+write, or a partition still being written without an index yet) is never
+pruned.
+"""
+
+import base64
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+PARTITION_BLOOM_BITS = int(os.getenv("PARTITION_BLOOM_BITS", str(1 << 20)))
+PARTITION_BLOOM_HASHES = int(os.getenv("PARTITION_BLOOM_HASHES", "7"))
+INDEX_SUFFIX = ".idx"
+
+
+class BloomFilter:
+    """Bloom filter over strings (double hashing of one BLAKE2b digest)"""
+
+    def __init__(self, size_bits: int = PARTITION_BLOOM_BITS, hashes: int = PARTITION_BLOOM_HASHES, bits: Optional[bytes] = None):
+        self.size_bits = max(8, size_bits)
+        self.hashes = max(1, hashes)
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, items: int, error_rate: float = 0.01) -> "BloomFilter":
+        """Filter sized for ``items`` distinct keys at ``error_rate`` false positives"""
+        items = max(1, items)
+        size_bits = math.ceil(-items * math.log(error_rate) / (math.log(2) ** 2))
+        return cls(size_bits, round(size_bits / items * math.log(2)))
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size_bits for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"size_bits": self.size_bits, "hashes": self.hashes, "bits": base64.b64encode(bytes(self.bits)).decode()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BloomFilter":
+        return cls(data["size_bits"], data["hashes"], base64.b64decode(data["bits"]))
+
+
+@dataclass
+class PartitionIndex:
+    """Time range, record count and entity bloom filter of one partition (times in epoch ms)"""
+    min_ts: Optional[int] = None
+    max_ts: Optional[int] = None
+    records: int = 0
+    covered_bytes: int = 0
+    bloom: BloomFilter = field(default_factory=BloomFilter)
+
+    def add(self, ts: int, keys: Iterable[str] = ()) -> None:
+        """Account for one record at ``ts`` mentioning ``keys``"""
+        self.min_ts = ts if self.min_ts is None else min(self.min_ts, ts)
+        self.max_ts = ts if self.max_ts is None else max(self.max_ts, ts)
+        self.records += 1
+        for key in keys:
+            self.bloom.add(key)
+
+    def may_contain(self, since: Optional[int] = None, until: Optional[int] = None, keys: Iterable[str] = ()) -> bool:
+        """False only when no record of the partition can match"""
+        if self.records == 0:
+            return False
+        if since is not None and self.max_ts < since:
+            return False
+        if until is not None and self.min_ts > until:
+            return False
+        return all(key in self.bloom for key in keys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "records": self.records,
+            "covered_bytes": self.covered_bytes,
+            "bloom": self.bloom.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PartitionIndex":
+        return cls(data["min_ts"], data["max_ts"], data["records"], data["covered_bytes"], BloomFilter.from_dict(data["bloom"]))
+
+
+def index_path(data_path: str) -> str:
+    return data_path + INDEX_SUFFIX
+
+
+def save_index(data_path: str, index: PartitionIndex) -> None:
+    """Write the index of ``data_path`` atomically, covering the file as it is now"""
+    index.covered_bytes = os.path.getsize(data_path)
+    target = index_path(data_path)
+    temporary = f"{target}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(index.to_dict(), handle)
+    os.replace(temporary, target)
+
+
+def load_index(data_path: str) -> Optional[PartitionIndex]:
+    """Index of ``data_path``, or None when missing, unreadable or not covering the whole file"""
+    try:
+        with open(index_path(data_path), encoding="utf-8") as handle:
+            index = PartitionIndex.from_dict(json.load(handle))
+        if os.path.getsize(data_path) > index.covered_bytes:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return index
+
+
+@dataclass
+class PruneStats:
+    """Partitions considered by a query and why they were skipped"""
+    partitions: int = 0
+    pruned_by_name: int = 0
+    pruned_by_time: int = 0
+    pruned_by_bloom: int = 0
+    unindexed: int = 0
+    scanned: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+def should_scan(
+    data_path: str,
+    stats: PruneStats,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    keys: Iterable[str] = ()
+) -> bool:
+    """Whether ``data_path`` has to be scanned for a query, counting the decision in ``stats``"""
+    keys = tuple(keys)
+    stats.partitions += 1
+    index = load_index(data_path)
+    if index is None:
+        stats.unindexed += 1
+    elif not index.may_contain(since, until):
+        stats.pruned_by_time += 1
+        return False
+    elif not index.may_contain(keys=keys):
+        stats.pruned_by_bloom += 1
+        return False
+    stats.scanned += 1
+    return True
@@ -0,0 +1,216 @@
+"""
+Policy Changeset Service
+Validates staged policy changes together and commits them as one policy-set version
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from models.application import Application
+from models.policy import Policy, PolicyStatus, compute_content_hash
+from models.policy_changeset import PolicyChangeset
+from services.opal_publisher import lock_event_order, policy_change, record_policy_set_event
+from services.policy_versions import next_version, record_version
+
+logger = logging.getLogger(__name__)
+
+UPDATABLE_FIELDS = ("name", "description", "content", "application_id")
+
+
+class ChangesetError(Exception):
+    """A changeset cannot be committed"""
+
+    def __init__(self, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def content_errors(content: str) -> List[str]:
+    """Structural checks a policy must pass before it can be distributed"""
+    errors = []
+    if not content.strip():
+        errors.append("content cannot be empty")
+        return errors
+    if "permit" not in content and "forbid" not in content:
+        errors.append("content must contain a 'permit' or 'forbid' rule")
+    if content.count("{") != content.count("}"):
+        errors.append(f"unbalanced braces: {content.count('{')} open, {content.count('}')} close")
+    if content.count("(") != content.count(")"):
+        errors.append(f"unbalanced parentheses: {content.count('(')} open, {content.count(')')} close")
+    return errors
+
+
+def validate_operations(db: Session, operations: List[Dict[str, Any]]) -> List[str]:
+    """
+    Validate operations as a whole, in order
+
+    Name uniqueness is checked against the state the earlier operations
+    leave behind, so renaming A away and creating a new A in the same
+    changeset is allowed.
+    """
+    if not operations:
+        return ["changeset has no operations"]
+
+    errors: List[str] = []
+    policy_ids = {op["policy_id"] for op in operations if op.get("policy_id") is not None}
+    policies = {p.id: p for p in db.query(Policy).filter(Policy.id.in_(policy_ids))} if policy_ids else {}
+
+    names = {op["name"] for op in operations if op.get("name")}
+    owners: Dict[str, Any] = {p.name: p.id for p in policies.values()}
+    if names:
+        owners.update({name: policy_id for policy_id, name in db.query(Policy.id, Policy.name).filter(Policy.name.in_(names))})
+
+    application_ids = {op["application_id"] for op in operations if op.get("application_id") is not None}
+    known_applications = (
+        {app_id for (app_id,) in db.query(Application.id).filter(Application.id.in_(application_ids))}
+        if application_ids else set()
+    )
+    current_names = {policy_id: policy.name for policy_id, policy in policies.items()}
+
+    for index, op in enumerate(operations):
+        prefix = f"operation {index} ({op['op']})"
+        policy_id = op.get("policy_id")
+
+        if op.get("application_id") is not None and op["application_id"] not in known_applications:
+            errors.append(f"{prefix}: application {op['application_id']} not found")
+        if op.get("content") is not None:
+            errors.extend(f"{prefix}: {error}" for error in content_errors(op["content"]))
+
+        if op["op"] == "create":
+            if not op.get("name") or op.get("content") is None:
+                errors.append(f"{prefix}: name and content are required")
+                continue
+            if op["name"] in owners:
+                errors.append(f"{prefix}: policy name '{op['name']}' already exists")
+                continue
+            owners[op["name"]] = f"new:{index}"
+            continue
+
+        if policy_id is None:
+            errors.append(f"{prefix}: policy_id is required")
+            continue
+        if policy_id not in policies:
+            errors.append(f"{prefix}: policy {policy_id} not found")
+            continue
+
+        if op["op"] == "update" and op.get("name") and op["name"] != current_names[policy_id]:
+            if owners.get(op["name"], policy_id) != policy_id:
+                errors.append(f"{prefix}: policy name '{op['name']}' already exists")
+                continue
+            owners.pop(current_names[policy_id], None)
+            owners[op["name"]] = policy_id
+            current_names[policy_id] = op["name"]
+
+    return errors
+
+
+def _apply_operation(
+    db: Session,
+    op: Dict[str, Any],
+    policies: Dict[int, Policy],
+    user_id: Optional[int],
+    comment: str
+) -> Policy:
+    if op["op"] == "create":
+        policy = Policy(
+            name=op["name"],
+            description=op.get("description"),
+            content=op["content"],
+            application_id=op.get("application_id"),
+            version="1.0.0",
+            status=PolicyStatus.ACTIVE if op.get("activate") else PolicyStatus.DRAFT
+        )
+        db.add(policy)
+        db.flush()
+        record_version(db, policy, user_id=user_id, comment=comment)
+        policies[policy.id] = policy
+        return policy
+
+    policy = policies[op["policy_id"]]
+    if op["op"] == "update":
+        content_changed = (
+            op.get("content") is not None
+            and compute_content_hash(op["content"]) != policy.content_hash
+        )
+        for field in UPDATABLE_FIELDS:
+            if op.get(field) is not None:
+                setattr(policy, field, op[field])
+        if content_changed:
+            policy.version = next_version(db, policy)
+            record_version(db, policy, user_id=user_id, comment=comment)
+    elif op["op"] == "activate":
+        policy.status = PolicyStatus.ACTIVE
+    elif op["op"] == "deactivate":
+        policy.status = PolicyStatus.INACTIVE
+    policy.updated_at = datetime.utcnow()
+    return policy
+
+
+def commit_changeset(db: Session, changeset_id: int, user_id: Optional[int] = None) -> PolicyChangeset:
+    """
+    Apply a draft changeset in the current transaction
+
+    Touched policies are locked in id order, every operation is applied and
+    a single outbox event carries the net change of each policy, so data
+    planes see one new policy-set version and recompile once. The caller
+    commits (or rolls back on ChangesetError).
+    """
+    # Event order lock before any row lock, in the same order as the
+    # publish and update paths, so concurrent writers cannot deadlock
+    lock_event_order(db)
+    changeset = (
+        db.query(PolicyChangeset)
+        .filter(PolicyChangeset.id == changeset_id)
+        .with_for_update()
+        .first()
+    )
+    if changeset is None:
+        raise LookupError(f"Changeset {changeset_id} not found")
+    if changeset.status != "draft":
+        raise ChangesetError(f"Changeset {changeset_id} is {changeset.status}")
+
+    operations = changeset.operations or []
+    errors = validate_operations(db, operations)
+    if errors:
+        raise ChangesetError(f"Changeset {changeset_id} is invalid", errors)
+
+    policy_ids = sorted({op["policy_id"] for op in operations if op.get("policy_id") is not None})
+    policies = {
+        policy.id: policy
+        for policy in db.query(Policy).filter(Policy.id.in_(policy_ids)).order_by(Policy.id).with_for_update()
+    } if policy_ids else {}
+    was_active = {policy_id: policy.status == PolicyStatus.ACTIVE for policy_id, policy in policies.items()}
+
+    comment = f"changeset {changeset.id}"
+    touched: Dict[int, Policy] = {}
+    created: List[int] = []
+    for op in operations:
+        policy = _apply_operation(db, op, policies, user_id, comment)
+        touched[policy.id] = policy
+        if op["op"] == "create":
+            created.append(policy.id)
+
+    # Net effect per policy: data planes only hold active policies
+    changes = []
+    for policy_id, policy in touched.items():
+        if policy.status == PolicyStatus.ACTIVE:
+            changes.append(policy_change(policy, "upsert"))
+        elif was_active.get(policy_id):
+            changes.append(policy_change(policy, "delete"))
+
+    if changes:
+        event = record_policy_set_event(db, changes)
+        db.flush()
+        changeset.committed_version = event.id
+
+    changeset.status = "committed"
+    changeset.committed_at = datetime.utcnow()
+    changeset.result = {"policy_ids": list(touched), "created": created, "distributed": len(changes)}
+    logger.info(
+        f"Changeset {changeset.id} applied {len(operations)} operations to {len(touched)} policies "
+        f"(version {changeset.committed_version})"
+    )
+    return changeset
@@ -0,0 +1,235 @@
+"""
+Policy Feed Service
+Serves committed policy_events to data planes by version cursor
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from database_pg import SessionLocal
+from models.policy import Policy, PolicyStatus
+from models.policy_event import PolicyEvent
+from services.cache import TTLCache
+from services.opal_publisher import coalesce_changes, policy_snapshot
+
+logger = logging.getLogger(__name__)
+
+FEED_POLL_INTERVAL = float(os.getenv("POLICY_FEED_POLL_INTERVAL", "1"))
+FEED_BATCH_SIZE = int(os.getenv("POLICY_FEED_BATCH_SIZE", "1000"))
+MAX_BLOBS_PER_REQUEST = 500
+
+
+class CursorExpired(Exception):
+    """The client's cursor is unknown to this server; it must reload the snapshot"""
+
+
+def manifest_root(entries: Dict[int, str]) -> str:
+    """Root hash over (policy id, content hash) pairs; equal roots mean equal policy sets"""
+    digest = hashlib.sha256()
+    for policy_id in sorted(entries):
+        digest.update(f"{policy_id}:{entries[policy_id]}\n".encode())
+    return digest.hexdigest()
+
+
+class PolicyFeed:
+    """
+    Version-cursor feed over the policy_events outbox
+
+    The version is the id of the last committed event. Event writers are
+    serialized (see opal_publisher.lock_event_order), so ids become
+    visible in order and a cursor never skips an event committed late.
+    A single shared poller watches the latest version and wakes every
+    waiting subscriber, so the database sees one cheap query per interval
+    regardless of how many data planes are connected.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        poll_interval: float = FEED_POLL_INTERVAL
+    ):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.latest_version: Optional[int] = None
+        self._changed = asyncio.Condition()
+        self._recheck = asyncio.Event()
+        self._poller: Optional[asyncio.Task] = None
+        self._waiters = 0
+        # Manifests are keyed by version, so a new event naturally invalidates them
+        self._manifests = TTLCache(max_entries=256, default_ttl=300)
+
+    # ==================== QUERIES ====================
+
+    def _query_latest(self) -> int:
+        db = self.session_factory()
+        try:
+            return db.query(func.max(PolicyEvent.id)).scalar() or 0
+        finally:
+            db.close()
+
+    def _query_snapshot(self) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            # Read the version first: a change committed in between is replayed
+            # by the next delta, and applying a change twice is harmless
+            version = db.query(func.max(PolicyEvent.id)).scalar() or 0
+            policies = (
+                db.query(Policy)
+                .filter(Policy.status == PolicyStatus.ACTIVE)
+                .order_by(Policy.id)
+                .all()
+            )
+            return {"version": version, "policies": [policy_snapshot(policy) for policy in policies]}
+        finally:
+            db.close()
+
+    def _query_events(self, after: int, limit: int) -> List[PolicyEvent]:
+        db = self.session_factory()
+        try:
+            return (
+                db.query(PolicyEvent)
+                .filter(PolicyEvent.id > after)
+                .order_by(PolicyEvent.id)
+                .limit(limit)
+                .all()
+            )
+        finally:
+            db.close()
+
+    def _query_manifest(self, application_id: Optional[int]) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            version = db.query(func.max(PolicyEvent.id)).scalar() or 0
+            query = db.query(Policy.id, Policy.content_hash).filter(Policy.status == PolicyStatus.ACTIVE)
+            if application_id is not None:
+                query = query.filter(or_(Policy.application_id == application_id, Policy.application_id.is_(None)))
+            entries = {policy_id: content_hash for policy_id, content_hash in query}
+            return {
+                "application_id": application_id,
+                "version": version,
+                "root": manifest_root(entries),
+                "entries": entries,
+            }
+        finally:
+            db.close()
+
+    def _query_blobs(self, hashes: List[str]) -> Dict[str, str]:
+        db = self.session_factory()
+        try:
+            rows = db.query(Policy.content_hash, Policy.content).filter(Policy.content_hash.in_(hashes))
+            # Policies sharing a hash share their content, so duplicates collapse
+            return {content_hash: content for content_hash, content in rows}
+        finally:
+            db.close()
+
+    async def manifest(self, application_id: Optional[int] = None) -> Dict[str, Any]:
+        """Content hash of every active policy for an application (plus global policies)"""
+        version = await self.refresh()
+        key = ("manifest", application_id, version)
+        return await self._manifests.get_or_load(
+            key, lambda: asyncio.to_thread(self._query_manifest, application_id)
+        )
+
+    async def blobs(self, hashes: Iterable[str]) -> Dict[str, str]:
+        """Policy contents by content hash (unknown hashes are omitted)"""
+        hashes = list(dict.fromkeys(hashes))[:MAX_BLOBS_PER_REQUEST]
+        if not hashes:
+            return {}
+        return await asyncio.to_thread(self._query_blobs, hashes)
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Every active policy plus the version it corresponds to"""
+        return await asyncio.to_thread(self._query_snapshot)
+
+    async def delta_since(self, after: int, limit: int = FEED_BATCH_SIZE) -> Optional[Dict[str, Any]]:
+        """Coalesced changes after ``after`` (at most ``limit`` events), or None"""
+        latest = await self.refresh()
+        if after > latest:
+            raise CursorExpired(f"Cursor {after} is ahead of the latest version {latest}")
+
+        events = await asyncio.to_thread(self._query_events, after, limit)
+        if not events:
+            return None
+        return {
+            "from_version": after,
+            "version": events[-1].id,
+            "changes": coalesce_changes(events),
+            "event_count": len(events),
+        }
+
+    # ==================== WAITING ====================
+
+    async def refresh(self) -> int:
+        """Re-read the latest version and wake waiters if it moved"""
+        latest = await asyncio.to_thread(self._query_latest)
+        if latest != self.latest_version:
+            self.latest_version = latest
+            async with self._changed:
+                self._changed.notify_all()
+        return latest
+
+    async def _poll(self) -> None:
+        try:
+            while self._waiters:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.error(f"Policy feed poll failed: {e}")
+                try:
+                    await asyncio.wait_for(self._recheck.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._recheck.clear()
+        finally:
+            self._poller = None
+
+    async def wait_for_version(self, after: int, timeout: float) -> int:
+        """Wait until the latest version is past ``after``; returns the latest version"""
+        if self.latest_version is None or self.latest_version < after:
+            await self.refresh()
+        if after > self.latest_version:
+            raise CursorExpired(f"Cursor {after} is ahead of the latest version {self.latest_version}")
+        if self.latest_version > after:
+            return self.latest_version
+
+        self._waiters += 1
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll())
+        try:
+            async with self._changed:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self.latest_version > after),
+                    timeout=timeout
+                )
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters -= 1
+        return self.latest_version
+
+    def notify(self) -> None:
+        """Re-check immediately after committing policy events in this process"""
+        self._recheck.set()
+
+
+_feed: Optional[PolicyFeed] = None
+
+
+def get_policy_feed() -> PolicyFeed:
+    """Get the process-wide policy feed"""
+    global _feed
+    if _feed is None:
+        _feed = PolicyFeed()
+    return _feed
+
+
+def notify_policy_feed() -> None:
+    """Wake feed subscribers after committing policy events"""
+    if _feed is not None:
+        _feed.notify()
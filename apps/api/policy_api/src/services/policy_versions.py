@@ -0,0 +1,145 @@
+"""
+Policy Version Service
+Append-only, content-addressed policy history with diffs and pointer-swap rollback
+"""
+
+import difflib
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.policy import Policy, compute_content_hash
+from models.policy_version import PolicyContent, PolicyVersion
+from services.cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Diffs are between immutable contents, so they can be kept for long
+_diff_cache = TTLCache(max_entries=512, default_ttl=3600)
+
+
+def store_content(db: Session, content: str) -> str:
+    """Store a policy text once and return its hash"""
+    content_hash = compute_content_hash(content)
+    if db.get(PolicyContent, content_hash) is None:
+        try:
+            with db.begin_nested():
+                db.add(PolicyContent(content_hash=content_hash, content=content))
+        except IntegrityError:
+            # Stored concurrently by another transaction; identical by definition
+            pass
+    return content_hash
+
+
+def next_version(db: Session, policy: Policy) -> str:
+    """Bump the last segment of the policy's newest version (not its current one)"""
+    latest = (
+        db.query(PolicyVersion.version)
+        .filter(PolicyVersion.policy_id == policy.id)
+        .order_by(PolicyVersion.id.desc())
+        .limit(1)
+        .scalar()
+    ) or policy.version or "1.0.0"
+    segments = latest.split(".")
+    try:
+        segments[-1] = str(int(segments[-1]) + 1)
+    except ValueError:
+        segments.append("1")
+    return ".".join(segments)
+
+
+def record_version(
+    db: Session,
+    policy: Policy,
+    user_id: Optional[int] = None,
+    comment: Optional[str] = None
+) -> PolicyVersion:
+    """Append the policy's current content as its ``policy.version`` and point at it"""
+    content_hash = store_content(db, policy.content)
+    version = PolicyVersion(
+        policy_id=policy.id,
+        version=policy.version,
+        content_hash=content_hash,
+        created_by=user_id,
+        comment=comment
+    )
+    db.add(version)
+    db.flush()
+    policy.current_version_id = version.id
+    return version
+
+
+def get_version(db: Session, policy_id: int, version: str) -> Optional[PolicyVersion]:
+    """Look up one version by (policy_id, version)"""
+    return (
+        db.query(PolicyVersion)
+        .filter(PolicyVersion.policy_id == policy_id, PolicyVersion.version == version)
+        .first()
+    )
+
+
+def list_versions(db: Session, policy_id: int, skip: int = 0, limit: int = 50) -> List[PolicyVersion]:
+    """Versions of a policy, newest first"""
+    return (
+        db.query(PolicyVersion)
+        .filter(PolicyVersion.policy_id == policy_id)
+        .order_by(PolicyVersion.id.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_content(db: Session, content_hash: str) -> Optional[str]:
+    """Policy text for a hash"""
+    stored = db.get(PolicyContent, content_hash)
+    return stored.content if stored else None
+
+
+def diff_versions(db: Session, old: PolicyVersion, new: PolicyVersion, context: int = 3) -> Dict[str, Any]:
+    """Unified diff between two versions (identical contents short-circuit on the hash)"""
+    result = {
+        "from_version": old.version,
+        "to_version": new.version,
+        "from_hash": old.content_hash,
+        "to_hash": new.content_hash,
+        "identical": old.content_hash == new.content_hash,
+        "diff": "",
+    }
+    if result["identical"]:
+        return result
+
+    key = ("diff", old.content_hash, new.content_hash, context)
+    diff = _diff_cache.get(key)
+    if diff is MISSING:
+        diff = "".join(difflib.unified_diff(
+            get_content(db, old.content_hash).splitlines(keepends=True),
+            get_content(db, new.content_hash).splitlines(keepends=True),
+            fromfile=f"{old.policy_id}@{old.version}",
+            tofile=f"{new.policy_id}@{new.version}",
+            n=context
+        ))
+        _diff_cache.set(key, diff)
+    result["diff"] = diff
+    return result
+
+
+def diff_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the diff cache"""
+    return _diff_cache.stats()
+
+
+def rollback_policy(db: Session, policy: Policy, target: PolicyVersion) -> Policy:
+    """
+    Make ``target`` the policy's current version
+
+    Nothing is rewritten into history: the current-version pointer moves
+    and the denormalized content is copied from the stored blob. The caller
+    commits and records the outbox event.
+    """
+    policy.current_version_id = target.id
+    policy.version = target.version
+    policy.content = get_content(db, target.content_hash)
+    return policy
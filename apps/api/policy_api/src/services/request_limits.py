@@ -0,0 +1,86 @@
+"""
+Request Limits
+Maps Policy API requests to rate-limit buckets (API key, application, user or IP)
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
+from database_pg import SessionLocal
+from auth.jwt import decode_access_token
+from models.application import Application
+from services.api_key_auth import get_api_key_authenticator
+from services.cache import TTLCache
+from services.rate_limit import RateLimit, client_ip, header, limit_from_env
+
+logger = logging.getLogger(__name__)
+
+ENVIRONMENTS = ("development", "staging", "production")
+# Applications that cannot be resolved get the strictest environment's limits
+DEFAULT_ENVIRONMENT = "production"
+
+KEY_LIMITS: Dict[str, RateLimit] = {
+    "development": limit_from_env("RATE_LIMIT_KEY_DEVELOPMENT", "300/minute"),
+    "staging": limit_from_env("RATE_LIMIT_KEY_STAGING", "1200/minute"),
+    "production": limit_from_env("RATE_LIMIT_KEY_PRODUCTION", "6000/minute;burst=1000"),
+}
+APPLICATION_LIMITS: Dict[str, RateLimit] = {
+    "development": limit_from_env("RATE_LIMIT_APPLICATION_DEVELOPMENT", "1200/minute"),
+    "staging": limit_from_env("RATE_LIMIT_APPLICATION_STAGING", "6000/minute"),
+    "production": limit_from_env("RATE_LIMIT_APPLICATION_PRODUCTION", "30000/minute;burst=5000"),
+}
+USER_LIMIT = limit_from_env("RATE_LIMIT_USER", "600/minute;burst=100")
+ANONYMOUS_LIMIT = limit_from_env("RATE_LIMIT_ANONYMOUS", "120/minute;burst=30")
+
+_environments = TTLCache(max_entries=10000, default_ttl=300)
+
+
+def _query_environment(application_ref: str) -> str:
+    db = SessionLocal()
+    try:
+        query = db.query(Application.environment)
+        if application_ref.isdigit():
+            environment = query.filter(Application.id == int(application_ref)).scalar()
+        else:
+            environment = query.filter(Application.slug == application_ref).scalar()
+    finally:
+        db.close()
+    return environment if environment in ENVIRONMENTS else DEFAULT_ENVIRONMENT
+
+
+async def application_environment(application_ref: str) -> str:
+    """Environment of an application by id or slug (cached)"""
+    return await _environments.get_or_load(
+        ("environment", application_ref),
+        lambda: asyncio.to_thread(_query_environment, application_ref)
+    )
+
+
+async def resolve_buckets(scope: Dict[str, Any]) -> List[Tuple[str, RateLimit]]:
+    """
+    Buckets a request counts against
+
+    A valid API key is limited per key and per application with the limits
+    of the application's environment. A valid bearer token is limited per
+    user. Everything else, including invalid credentials, shares the
+    client IP's anonymous bucket.
+    """
+    api_key = header(scope, b"x-api-key")
+    if api_key:
+        principal = await get_api_key_authenticator().authenticate(api_key)
+        if principal is not None:
+            environment = await application_environment(principal.application_id)
+            return [
+                (f"key:{principal.id}", KEY_LIMITS[environment]),
+                (f"app:{principal.application_id}", APPLICATION_LIMITS[environment]),
+            ]
+
+    authorization = header(scope, b"authorization")
+    if authorization and authorization.startswith("Bearer "):
+        payload = decode_access_token(authorization[7:])
+        subject = payload and (payload.get("sub") or payload.get("email"))
+        if subject:
+            return [(f"user:{subject}", USER_LIMIT)]
+
+    return [(f"ip:{client_ip(scope)}", ANONYMOUS_LIMIT)]
@@ -0,0 +1,147 @@
+"""
+Resilience primitives for outbound HTTP calls
+Circuit breaker, jittered exponential backoff and hedged requests
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    closed    -> calls flow; ``failure_threshold`` consecutive failures open it
+    open      -> calls are rejected immediately for ``reset_timeout`` seconds
+    half_open -> a single probe call is let through; success closes the
+                 circuit, failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_at = None
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through"""
+        if self._state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+
+    def before_call(self) -> None:
+        """Reserve permission for a call, raising CircuitOpenError when rejected"""
+        state = self.state
+        if state == self.CLOSED:
+            return
+
+        now = self.clock()
+        # A probe that never reported back (e.g. cancelled) expires after reset_timeout
+        if state == self.HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.reset_timeout):
+            self._probe_at = now
+            return
+
+        self.rejected += 1
+        raise CircuitOpenError(self.name, self.retry_after() or self.reset_timeout)
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+            self._state = self.OPEN
+            self._opened_at = self.clock()
+            self._probe_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.1, max_delay: float = 2.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+async def hedged(
+    call: Callable[[], Awaitable[Any]],
+    delay: float
+) -> Tuple[Any, bool, bool]:
+    """
+    Run ``call`` and start a second copy if the first has not finished after ``delay``
+
+    Returns ``(result, hedged, hedge_won)``. The first successful result wins
+    and the other copy is cancelled; if both fail the last error is raised.
+    Only use this for idempotent reads.
+    """
+    first = asyncio.ensure_future(call())
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result(), False, False
+
+    second = asyncio.ensure_future(call())
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), True, task is second
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
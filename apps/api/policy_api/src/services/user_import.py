@@ -0,0 +1,365 @@
+"""
+Bulk User Import/Export Service
+Incremental NDJSON/CSV parsing, chunked validation and batched inserts
+"""
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+
+import bcrypt
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.user import User, UserStatus as ModelUserStatus, UserRole as ModelUserRole
+from schemas.user import UserCreate
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("USER_IMPORT_CHUNK_SIZE", "500"))
+HASH_WORKERS = int(os.getenv("USER_IMPORT_HASH_WORKERS", str(min(8, os.cpu_count() or 1))))
+EXPORT_BATCH_SIZE = int(os.getenv("USER_EXPORT_BATCH_SIZE", "1000"))
+IMPORT_MAX_BYTES = int(os.getenv("USER_IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+
+# Columns written by the export endpoint (never includes password_hash)
+EXPORT_FIELDS = [
+    "id", "email", "name", "photo_url", "status", "role",
+    "created_at", "updated_at", "last_login", "created_by"
+]
+
+# A parsed record: (line number, record dict or None, parse error or None)
+ParsedRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+
+class ImportTooLargeError(Exception):
+    """The import body is larger than the configured maximum"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Import body exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """Get the shared bcrypt worker pool (bcrypt releases the GIL while hashing)"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=HASH_WORKERS,
+            thread_name_prefix="user-import-bcrypt"
+        )
+    return _hash_executor
+
+
+def _hash_password(password: str) -> str:
+    """Hash password using bcrypt"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords concurrently on the worker pool"""
+    loop = asyncio.get_running_loop()
+    executor = get_hash_executor()
+    return await asyncio.gather(
+        *(loop.run_in_executor(executor, _hash_password, password) for password in passwords)
+    )
+
+
+# ==================== PARSING ====================
+
+async def spool_body(
+    chunks: AsyncIterator[bytes],
+    max_bytes: int = IMPORT_MAX_BYTES
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Spool the request body to memory, overflowing to disk
+
+    The body has to be drained before a streaming response starts, because the
+    response listens on the same ASGI receive channel for client disconnects.
+    Raises ImportTooLargeError as soon as more than ``max_bytes`` arrive.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            spool.close()
+            raise ImportTooLargeError(max_bytes)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def iter_file(file, chunk_size: int = READ_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read a spooled file in fixed-size chunks off the event loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, file.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering the whole body"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRecord]:
+    """Parse one JSON object per line"""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Each line must be a JSON object"
+            continue
+        yield line_no, record, None
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRecord]:
+    """Parse CSV with a header row, supporting quoted fields spanning several lines"""
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    quotes = 0
+    line_no = 0
+    record_line = 0
+
+    async for line in lines:
+        line_no += 1
+        if not pending:
+            record_line = line_no
+        pending.append(line)
+        quotes += line.count('"')
+        # An odd number of quotes means a quoted field continues on the next line
+        if quotes % 2:
+            continue
+
+        text = "\n".join(pending)
+        pending = []
+        quotes = 0
+        if not text.strip():
+            continue
+
+        try:
+            row = next(csv.reader([text]))
+        except csv.Error as e:
+            yield record_line, None, f"Invalid CSV: {e}"
+            continue
+
+        if header is None:
+            header = [column.strip().lower() for column in row]
+            continue
+
+        if len(row) != len(header):
+            yield record_line, None, f"Expected {len(header)} columns, got {len(row)}"
+            continue
+
+        yield record_line, dict(zip(header, row)), None
+
+    if pending:
+        yield record_line, None, "Unterminated quoted field"
+
+
+async def iter_chunks(
+    records: AsyncIterator[ParsedRecord],
+    size: int
+) -> AsyncIterator[List[ParsedRecord]]:
+    """Group parsed records into fixed-size chunks"""
+    chunk: List[ParsedRecord] = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ==================== VALIDATION & INSERT ====================
+
+def _normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty CSV cells and accept enum values in any case"""
+    normalized = {key: value for key, value in record.items() if value not in ("", None)}
+    for field in ("status", "role"):
+        if isinstance(normalized.get(field), str):
+            normalized[field] = normalized[field].strip().lower()
+    return normalized
+
+
+def _error(line: int, message: str, email: Optional[str] = None) -> Dict[str, Any]:
+    return {"line": line, "email": email, "error": message}
+
+
+def validate_chunk(
+    chunk: List[ParsedRecord],
+    seen_emails: Set[str]
+) -> Tuple[List[Tuple[int, UserCreate]], List[Dict[str, Any]]]:
+    """Validate a chunk against UserCreate and drop duplicates within the import"""
+    valid: List[Tuple[int, UserCreate]] = []
+    errors: List[Dict[str, Any]] = []
+
+    for line, record, parse_error in chunk:
+        if parse_error:
+            errors.append(_error(line, parse_error))
+            continue
+        try:
+            user = UserCreate(**_normalize_record(record))
+        except ValidationError as e:
+            messages = "; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            errors.append(_error(line, messages, record.get("email")))
+            continue
+
+        email = user.email.lower()
+        if email in seen_emails:
+            errors.append(_error(line, "Duplicate email in import", user.email))
+            continue
+        seen_emails.add(email)
+        valid.append((line, user))
+
+    return valid, errors
+
+
+def filter_existing(
+    db: Session,
+    valid: List[Tuple[int, UserCreate]]
+) -> Tuple[List[Tuple[int, UserCreate]], List[Dict[str, Any]]]:
+    """Drop users whose email is already registered (one query per chunk)"""
+    if not valid:
+        return valid, []
+
+    # Case-insensitive, like the duplicate check within the import
+    emails = [user.email.lower() for _, user in valid]
+    existing = set(
+        db.execute(select(func.lower(User.email)).where(func.lower(User.email).in_(emails))).scalars()
+    )
+
+    remaining = []
+    errors = []
+    for line, user in valid:
+        if user.email.lower() in existing:
+            errors.append(_error(line, "Email already registered", user.email))
+        else:
+            remaining.append((line, user))
+    return remaining, errors
+
+
+def insert_users(
+    db: Session,
+    users: List[Tuple[int, UserCreate]],
+    password_hashes: List[str],
+    created_by: Optional[int]
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """Insert a validated chunk with a single executemany and one commit"""
+    if not users:
+        return 0, []
+
+    rows = [
+        {
+            "email": user.email,
+            "name": user.name,
+            "password_hash": password_hash,
+            "photo_url": user.photo_url,
+            "status": ModelUserStatus[user.status.name],
+            "role": ModelUserRole[user.role.name],
+            "created_by": created_by,
+        }
+        for (_, user), password_hash in zip(users, password_hashes)
+    ]
+
+    try:
+        db.execute(insert(User), rows)
+        db.commit()
+    except IntegrityError as e:
+        # A concurrent writer registered one of the emails; report the chunk as failed
+        db.rollback()
+        logger.warning(f"Bulk user insert failed: {e.orig}")
+        return 0, [_error(line, "Conflicting user, chunk rolled back", user.email) for line, user in users]
+
+    return len(rows), []
+
+
+# ==================== EXPORT ====================
+
+def _export_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+def iter_export_rows(db: Session, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Stream users as plain dicts using a server-side cursor (no ORM identity map)"""
+    columns = [getattr(User, field) for field in EXPORT_FIELDS]
+    result = db.execute(
+        select(*columns).order_by(User.id).execution_options(yield_per=batch_size)
+    )
+    for partition in result.partitions():
+        for row in partition:
+            yield {field: _export_value(value) for field, value in zip(EXPORT_FIELDS, row)}
+
+
+def iter_export_ndjson(db: Session, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Serialize exported users as NDJSON, one batch per chunk"""
+    buffer = []
+    for row in iter_export_rows(db, batch_size):
+        buffer.append(json.dumps(row))
+        if len(buffer) >= batch_size:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def iter_export_csv(db: Session, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Serialize exported users as CSV with a header row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+
+    count = 0
+    for row in iter_export_rows(db, batch_size):
+        writer.writerow(row)
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
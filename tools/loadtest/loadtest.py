@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Sentinela load generator
+
+Logs in on the Business API (and the Policy API for admin traffic) through
+/api/v1/auth/login, then drives a weighted mix of document CRUD,
+authorization and admin requests, and reports throughput and latency
+percentiles per route.
+
+Closed loop (default): --concurrency virtual users each send a request,
+wait for the answer, then send the next. Open loop (--rate): requests start
+on a Poisson schedule whatever the response times, and latency is measured
+from the scheduled start, so a stalled server shows up in the percentiles
+instead of slowing the generator down.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+DOCUMENT_CATEGORIES = ("engineering", "finance", "hr", "legal", "sales")
+PRINCIPALS = ('User::"alice"', 'User::"bob"', 'User::"admin"')
+ACTIONS = ('Action::"read"', 'Action::"write"', 'Action::"delete"')
+SAMPLE_POLICY = 'permit(principal in Group::"employees", action == Action::"read", resource in Folder::"shared");'
+
+# Relative weights within each API's traffic: reads and authorization checks
+# dominate, writes are a minority and logins are rare (tokens live for hours)
+BUSINESS_MIX: Dict[str, int] = {
+    "documents.list": 25,
+    "documents.get": 25,
+    "documents.create": 6,
+    "documents.update": 4,
+    "documents.delete": 2,
+    "authorize": 30,
+    "authorize.batch": 8,
+    "auth.login": 1,
+}
+ADMIN_MIX: Dict[str, int] = {
+    "policies.list": 30,
+    "policies.validate": 10,
+    "users.list": 20,
+    "applications.list": 20,
+    "analytics.decisions": 15,
+    "audit.events": 5,
+}
+
+
+# ==================== RECORDING ====================
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class RouteStats:
+    """Latencies (ms) and outcomes of one route"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.statuses: Counter = Counter()
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+            "mean_ms": round(sum(latencies) / count, 2) if count else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p90_ms": round(percentile(latencies, 0.90), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2) if count else 0.0,
+            "statuses": {str(key): value for key, value in sorted(self.statuses.items(), key=lambda item: str(item[0]))},
+        }
+
+
+class Recorder:
+    """Per-route results; nothing is kept until ``start`` (end of warm-up)"""
+
+    def __init__(self):
+        self.routes: Dict[str, RouteStats] = {}
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+
+    def start(self) -> None:
+        self.routes.clear()
+        self.started_at = time.perf_counter()
+
+    def stop(self) -> None:
+        self.stopped_at = time.perf_counter()
+
+    def record(self, route: str, latency_ms: float, outcome: Any, error: bool) -> None:
+        if self.started_at is None:
+            return
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = RouteStats()
+        stats.latencies.append(latency_ms)
+        stats.statuses[outcome] += 1
+        if error:
+            stats.errors += 1
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.stopped_at or time.perf_counter()) - self.started_at
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = self.elapsed
+        total = RouteStats()
+        for stats in self.routes.values():
+            total.latencies.extend(stats.latencies)
+            total.errors += stats.errors
+            total.statuses.update(stats.statuses)
+        return {
+            "duration_s": round(elapsed, 2),
+            "routes": {route: self.routes[route].summary(elapsed) for route in sorted(self.routes)},
+            "total": total.summary(elapsed),
+        }
+
+
+# ==================== SCENARIOS ====================
+
+class LoadContext:
+    """Clients, tokens and the document ids shared by all virtual users"""
+
+    def __init__(self, options: argparse.Namespace, business: httpx.AsyncClient, policy: Optional[httpx.AsyncClient], recorder: Recorder):
+        self.options = options
+        self.business = business
+        self.policy = policy
+        self.recorder = recorder
+        self.rng = random.Random(options.seed)
+        # Documents created before the run: read and updated, never deleted
+        self.seed_ids: List[int] = []
+        # Documents created during the run: the only ones deleted
+        self.created_ids: List[int] = []
+
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        route: str,
+        method: str,
+        url: str,
+        started: Optional[float] = None,
+        **kwargs
+    ) -> Optional[httpx.Response]:
+        """Send one request and record it under ``route``; latency counts from ``started`` if given"""
+        started = started if started is not None else time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(route, (time.perf_counter() - started) * 1000, type(e).__name__, True)
+            return None
+        self.recorder.record(route, (time.perf_counter() - started) * 1000, response.status_code, response.status_code >= 400)
+        return response
+
+    def document_body(self) -> Dict[str, str]:
+        words = " ".join(self.rng.choice(("policy", "access", "audit", "report", "budget", "roadmap")) for _ in range(self.options.document_words))
+        return {
+            "title": f"Load test document {self.rng.randrange(1_000_000)}",
+            "content": words,
+            "category": self.rng.choice(DOCUMENT_CATEGORIES),
+        }
+
+    def document_id(self) -> int:
+        pool = self.seed_ids or self.created_ids
+        return self.rng.choice(pool) if pool else 1
+
+    def authorization_request(self) -> Dict[str, Any]:
+        return {
+            "principal": self.rng.choice(PRINCIPALS),
+            "action": self.rng.choice(ACTIONS),
+            "resource": f'Document::"{self.document_id()}"',
+            "context": {},
+        }
+
+
+Scenario = Callable[[LoadContext, Optional[float]], Awaitable[None]]
+
+
+async def list_documents(ctx: LoadContext, started: Optional[float]) -> None:
+    params = {"limit": ctx.rng.choice((10, 20, 50))}
+    if ctx.rng.random() < 0.3:
+        params["category"] = ctx.rng.choice(DOCUMENT_CATEGORIES)
+    await ctx.call(ctx.business, "GET /api/v1/documents/", "GET", "/api/v1/documents/", started, params=params)
+
+
+async def get_document(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(ctx.business, "GET /api/v1/documents/{id}", "GET", f"/api/v1/documents/{ctx.document_id()}", started)
+
+
+async def create_document(ctx: LoadContext, started: Optional[float]) -> None:
+    response = await ctx.call(ctx.business, "POST /api/v1/documents/", "POST", "/api/v1/documents/", started, json=ctx.document_body())
+    if response is not None and response.status_code == 201:
+        ctx.created_ids.append(response.json()["id"])
+
+
+async def update_document(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(
+        ctx.business, "PUT /api/v1/documents/{id}", "PUT", f"/api/v1/documents/{ctx.document_id()}", started,
+        json=ctx.document_body()
+    )
+
+
+async def delete_document(ctx: LoadContext, started: Optional[float]) -> None:
+    if not ctx.created_ids:
+        # Nothing of our own to delete yet
+        return await create_document(ctx, started)
+    document_id = ctx.created_ids.pop(ctx.rng.randrange(len(ctx.created_ids)))
+    await ctx.call(ctx.business, "DELETE /api/v1/documents/{id}", "DELETE", f"/api/v1/documents/{document_id}", started)
+
+
+async def authorize(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(ctx.business, "POST /api/v1/authorize", "POST", "/api/v1/authorize", started, json=ctx.authorization_request())
+
+
+async def authorize_batch(ctx: LoadContext, started: Optional[float]) -> None:
+    requests = [ctx.authorization_request() for _ in range(ctx.options.batch_size)]
+    await ctx.call(ctx.business, "POST /api/v1/authorize/batch", "POST", "/api/v1/authorize/batch", started, json={"requests": requests})
+
+
+async def business_login(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(
+        ctx.business, "POST /api/v1/auth/login", "POST", "/api/v1/auth/login", started,
+        json={"email": ctx.options.business_email, "password": ctx.options.business_password}
+    )
+
+
+async def list_policies(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(ctx.policy, "GET /api/v1/policies/", "GET", "/api/v1/policies/", started, params={"limit": 20})
+
+
+async def validate_policy(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(ctx.policy, "POST /api/v1/policies/validate", "POST", "/api/v1/policies/validate", started, json={"content": SAMPLE_POLICY})
+
+
+async def list_users(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(ctx.policy, "GET /api/v1/users/", "GET", "/api/v1/users/", started, params={"per_page": 20})
+
+
+async def list_applications(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(ctx.policy, "GET /api/v1/applications/", "GET", "/api/v1/applications/", started, params={"page_size": 20})
+
+
+async def decision_analytics(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(
+        ctx.policy, "GET /api/v1/analytics/decisions", "GET", "/api/v1/analytics/decisions", started,
+        params={"granularity": "minute", "group_by": "action_type"}
+    )
+
+
+async def audit_events(ctx: LoadContext, started: Optional[float]) -> None:
+    await ctx.call(ctx.policy, "GET /api/v1/audit/events", "GET", "/api/v1/audit/events", started, params={"limit": 50})
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "documents.list": list_documents,
+    "documents.get": get_document,
+    "documents.create": create_document,
+    "documents.update": update_document,
+    "documents.delete": delete_document,
+    "authorize": authorize,
+    "authorize.batch": authorize_batch,
+    "auth.login": business_login,
+    "policies.list": list_policies,
+    "policies.validate": validate_policy,
+    "users.list": list_users,
+    "applications.list": list_applications,
+    "analytics.decisions": decision_analytics,
+    "audit.events": audit_events,
+}
+
+
+def build_mix(admin_share: float) -> Tuple[List[str], List[float]]:
+    """Scenario names and cumulative weights, with ``admin_share`` of the traffic on the Policy API"""
+    weights: Dict[str, float] = {}
+    for mix, share in ((BUSINESS_MIX, 1.0 - admin_share), (ADMIN_MIX, admin_share)):
+        total = sum(mix.values())
+        for name, weight in mix.items():
+            if share > 0:
+                weights[name] = share * weight / total
+    names = list(weights)
+    cumulative, running = [], 0.0
+    for name in names:
+        running += weights[name]
+        cumulative.append(running)
+    return names, cumulative
+
+
+# ==================== DRIVERS ====================
+
+async def login(client: httpx.AsyncClient, email: str, password: str, api: str) -> str:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        raise SystemExit(f"{api} login as {email} failed: {response.status_code} {response.text[:200]}")
+    return response.json()["access_token"]
+
+
+async def seed_documents(ctx: LoadContext, count: int) -> None:
+    for _ in range(count):
+        response = await ctx.business.post("/api/v1/documents/", json=ctx.document_body())
+        if response.status_code != 201:
+            raise SystemExit(f"Seeding documents failed: {response.status_code} {response.text[:200]}")
+        ctx.seed_ids.append(response.json()["id"])
+
+
+async def closed_loop(ctx: LoadContext, names: List[str], cumulative: List[float], deadline: float) -> None:
+    async def virtual_user() -> None:
+        while time.perf_counter() < deadline:
+            name = ctx.rng.choices(names, cum_weights=cumulative)[0]
+            await SCENARIOS[name](ctx, None)
+            if ctx.options.think_time:
+                await asyncio.sleep(ctx.rng.expovariate(1000 / ctx.options.think_time))
+
+    await asyncio.gather(*(virtual_user() for _ in range(ctx.options.concurrency)))
+
+
+async def open_loop(ctx: LoadContext, names: List[str], cumulative: List[float], deadline: float) -> None:
+    in_flight = asyncio.Semaphore(ctx.options.concurrency)
+    tasks = set()
+
+    async def fire(name: str, scheduled: float) -> None:
+        # Time spent waiting for a free connection counts towards the latency
+        async with in_flight:
+            await SCENARIOS[name](ctx, scheduled)
+
+    scheduled = time.perf_counter()
+    while True:
+        scheduled += ctx.rng.expovariate(ctx.options.rate)
+        if scheduled >= deadline:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(fire(ctx.rng.choices(names, cum_weights=cumulative)[0], scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=ctx.options.timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def run_load(options: argparse.Namespace) -> Dict[str, Any]:
+    """Log in, seed documents, warm up, then drive the mix for ``options.duration`` seconds"""
+    limits = httpx.Limits(max_connections=options.concurrency, max_keepalive_connections=options.concurrency)
+    recorder = Recorder()
+    async with httpx.AsyncClient(base_url=options.business_url, timeout=options.timeout, limits=limits) as business, \
+            httpx.AsyncClient(base_url=options.policy_url, timeout=options.timeout, limits=limits) as policy:
+        business_token = options.business_token or await login(business, options.business_email, options.business_password, "Business API")
+        business.headers["Authorization"] = f"Bearer {business_token}"
+
+        admin_share = options.admin_share
+        if admin_share > 0:
+            policy_token = options.policy_token or await login(policy, options.policy_email, options.policy_password, "Policy API")
+            policy.headers["Authorization"] = f"Bearer {policy_token}"
+
+        ctx = LoadContext(options, business, policy if admin_share > 0 else None, recorder)
+        await seed_documents(ctx, options.seed_documents)
+        names, cumulative = build_mix(admin_share)
+
+        driver = open_loop if options.rate else closed_loop
+        if options.warmup > 0:
+            await driver(ctx, names, cumulative, time.perf_counter() + options.warmup)
+        recorder.start()
+        await driver(ctx, names, cumulative, time.perf_counter() + options.duration)
+        recorder.stop()
+
+    report = recorder.report()
+    report["config"] = {
+        "mode": "open" if options.rate else "closed",
+        "rate": options.rate,
+        "concurrency": options.concurrency,
+        "duration_s": options.duration,
+        "warmup_s": options.warmup,
+        "admin_share": admin_share,
+        "business_url": options.business_url,
+        "policy_url": options.policy_url if admin_share > 0 else None,
+    }
+    return report
+
+
+# ==================== REPORTING ====================
+
+def format_report(report: Dict[str, Any]) -> str:
+    config = report["config"]
+    mode = f"open loop at {config['rate']:g} req/s" if config["mode"] == "open" else f"closed loop with {config['concurrency']} users"
+    header = f"{'Route':<36} {'Count':>7} {'Err':>5} {'RPS':>8} {'Mean':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'Max':>8}"
+    lines = [f"{report['duration_s']}s, {mode} (latencies in ms)", "", header, "-" * len(header)]
+
+    def row(name: str, stats: Dict[str, Any]) -> str:
+        return (
+            f"{name:<36} {stats['count']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} {stats['mean_ms']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p90_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}"
+        )
+
+    for route, stats in report["routes"].items():
+        lines.append(row(route, stats))
+    lines += ["-" * len(header), row("Total", report["total"])]
+
+    failing = {
+        route: {status: count for status, count in stats["statuses"].items() if not status.isdigit() or int(status) >= 400}
+        for route, stats in report["routes"].items()
+    }
+    failing = {route: statuses for route, statuses in failing.items() if statuses}
+    if failing:
+        lines += ["", "Errors:"]
+        lines += [f"  {route}: {', '.join(f'{status} x{count}' for status, count in statuses.items())}" for route, statuses in failing.items()]
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load generator for the Sentinela Business and Policy APIs",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument("--business-url", default=os.getenv("BUSINESS_API_URL", "http://localhost:8002"))
+    parser.add_argument("--policy-url", default=os.getenv("POLICY_API_URL", "http://localhost:8001"))
+    parser.add_argument("--business-email", default="admin@sentinela.com")
+    parser.add_argument("--business-password", default="admin123")
+    parser.add_argument("--policy-email", default="admin@sentinela.com")
+    parser.add_argument("--policy-password", default="admin123")
+    parser.add_argument("--business-token", help="Use this token instead of logging in")
+    parser.add_argument("--policy-token", help="Use this token instead of logging in")
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of unrecorded traffic before measuring")
+    parser.add_argument("-c", "--concurrency", type=int, default=20, help="Virtual users (closed loop) or maximum requests in flight (open loop)")
+    parser.add_argument("-r", "--rate", type=float, help="Requests per second for an open-loop run")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause in ms between a user's requests (closed loop)")
+    parser.add_argument("--admin-share", type=float, default=0.05, help="Fraction of requests sent to the Policy API admin routes (0 disables)")
+    parser.add_argument("--batch-size", type=int, default=10, help="Requests per batch authorization call")
+    parser.add_argument("--seed-documents", type=int, default=50, help="Documents created before the run")
+    parser.add_argument("--document-words", type=int, default=40, help="Words in each generated document body")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, help="Random seed for a repeatable mix")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this file ('-' for stdout)")
+    parser.add_argument("--max-error-rate", type=float, help="Exit with status 1 if the error rate is above this fraction")
+    options = parser.parse_args(argv)
+
+    if not 0.0 <= options.admin_share <= 1.0:
+        parser.error("--admin-share must be between 0 and 1")
+    if options.rate is not None and options.rate <= 0:
+        parser.error("--rate must be positive")
+    if options.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if not 1 <= options.batch_size <= 100:
+        parser.error("--batch-size must be between 1 and 100")
+    return options
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    options = parse_args(argv)
+    report = asyncio.run(run_load(options))
+
+    if options.json_path == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(report))
+        if options.json_path:
+            with open(options.json_path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    total = report["total"]
+    if options.max_error_rate is not None and total["count"] and total["errors"] / total["count"] > options.max_error_rate:
+        print(f"Error rate {total['errors'] / total['count']:.2%} is above {options.max_error_rate:.2%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Mock Keycloak for load tests
+Serves the token, userinfo and health endpoints the Policy API calls, for any realm
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Form, Header, HTTPException, status
+from jose import JWTError, jwt
+
+MOCK_KEYCLOAK_SECRET = os.getenv("MOCK_KEYCLOAK_SECRET", "mock-keycloak-secret")
+# Added to every token request, to model the latency of a real identity provider
+MOCK_KEYCLOAK_LATENCY_MS = float(os.getenv("MOCK_KEYCLOAK_LATENCY_MS", "0"))
+TOKEN_LIFETIME = 300
+CLIENTS = {"sentinela-api": "sentinela-secret"}
+
+# Same credentials as the Business API mock users and the seeded Policy API admin
+USERS = {
+    "admin@sentinela.com": {"username": "admin", "password": "admin123", "name": "Administrator", "roles": ["admin"]},
+    "alice@sentinela.com": {"username": "alice", "password": "alice123", "name": "Alice Smith", "roles": ["employee"]},
+    "bob@sentinela.com": {"username": "bob", "password": "bob123", "name": "Bob Johnson", "roles": ["manager", "employee"]},
+}
+USER_IDS = {email: str(uuid.uuid5(uuid.NAMESPACE_URL, email)) for email in USERS}
+
+app = FastAPI(title="Mock Keycloak", version="1.0.0")
+stats = {"token_requests": 0, "tokens_issued": 0, "token_failures": 0, "userinfo_requests": 0}
+
+
+def _find_user(username: str) -> Optional[str]:
+    """Email of the user logging in with an email or a username"""
+    if username in USERS:
+        return username
+    for email, user in USERS.items():
+        if user["username"] == username:
+            return email
+    return None
+
+
+def _issue(realm: str, subject: str, claims: Dict[str, Any]) -> Dict[str, Any]:
+    now = int(time.time())
+    payload = {
+        "iss": f"/realms/{realm}",
+        "sub": subject,
+        "iat": now,
+        "exp": now + TOKEN_LIFETIME,
+        "typ": "Bearer",
+        **claims,
+    }
+    stats["tokens_issued"] += 1
+    return {
+        "access_token": jwt.encode(payload, MOCK_KEYCLOAK_SECRET, algorithm="HS256"),
+        "token_type": "Bearer",
+        "expires_in": TOKEN_LIFETIME,
+        "refresh_expires_in": 0,
+        "scope": "openid email profile",
+    }
+
+
+@app.post("/realms/{realm}/protocol/openid-connect/token")
+async def token(
+    realm: str,
+    grant_type: str = Form(...),
+    client_id: str = Form(...),
+    client_secret: Optional[str] = Form(None),
+    username: Optional[str] = Form(None),
+    password: Optional[str] = Form(None)
+):
+    """Password and client credentials grants"""
+    stats["token_requests"] += 1
+    if MOCK_KEYCLOAK_LATENCY_MS:
+        await asyncio.sleep(MOCK_KEYCLOAK_LATENCY_MS / 1000)
+
+    if CLIENTS.get(client_id) != client_secret:
+        stats["token_failures"] += 1
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_client")
+
+    if grant_type == "client_credentials":
+        return _issue(realm, str(uuid.uuid5(uuid.NAMESPACE_URL, client_id)), {"azp": client_id, "clientId": client_id})
+
+    if grant_type != "password":
+        stats["token_failures"] += 1
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="unsupported_grant_type")
+
+    email = _find_user(username or "")
+    if email is None or USERS[email]["password"] != password:
+        stats["token_failures"] += 1
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_grant")
+
+    user = USERS[email]
+    return _issue(realm, USER_IDS[email], {
+        "azp": client_id,
+        "email": email,
+        "email_verified": True,
+        "preferred_username": user["username"],
+        "name": user["name"],
+        "realm_access": {"roles": user["roles"]},
+    })
+
+
+@app.get("/realms/{realm}/protocol/openid-connect/userinfo")
+async def userinfo(realm: str, authorization: Optional[str] = Header(None)):
+    """Claims of the token's user"""
+    stats["userinfo_requests"] += 1
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="missing bearer token")
+    try:
+        claims = jwt.decode(authorization[7:], MOCK_KEYCLOAK_SECRET, algorithms=["HS256"])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token")
+    return {
+        key: claims[key]
+        for key in ("sub", "email", "email_verified", "preferred_username", "name")
+        if key in claims
+    }
+
+
+@app.get("/realms/{realm}/.well-known/openid-configuration")
+async def openid_configuration(realm: str):
+    """Discovery document pointing at the mock endpoints"""
+    base = f"http://localhost:{os.getenv('MOCK_KEYCLOAK_PORT', '8080')}/realms/{realm}"
+    return {
+        "issuer": base,
+        "token_endpoint": f"{base}/protocol/openid-connect/token",
+        "userinfo_endpoint": f"{base}/protocol/openid-connect/userinfo",
+        "grant_types_supported": ["password", "client_credentials"],
+    }
+
+
+@app.get("/health")
+@app.get("/health/ready")
+async def health():
+    """Liveness and readiness, with request counters"""
+    return {"status": "UP", **stats}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("MOCK_KEYCLOAK_PORT", "8080")), log_level="warning")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Create the Policy API tables and the admin the load generator logs in as
+
+Uses DATABASE_URL like the Policy API. On SQLite the api_keys table is
+skipped (its UUID column only exists on PostgreSQL); API key routes then
+need a PostgreSQL database.
+"""
+
+import argparse
+import os
+import sys
+
+import bcrypt
+
+POLICY_API_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "apps", "api", "policy_api", "src")
+sys.path.insert(0, os.path.abspath(POLICY_API_SRC))
+
+from database_pg import Base, SessionLocal, engine  # noqa: E402
+import models  # noqa: E402,F401  (registers every table)
+from models.user import User, UserRole, UserStatus  # noqa: E402
+
+
+def create_tables() -> None:
+    tables = Base.metadata.sorted_tables
+    if engine.dialect.name == "sqlite":
+        tables = [table for table in tables if table.name != "api_keys"]
+    Base.metadata.create_all(bind=engine, tables=tables)
+
+
+def seed_admin(email: str, password: str) -> User:
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            user = User(email=email, name=email.split("@")[0])
+            db.add(user)
+        # Checked with bcrypt.checkpw by the local login
+        user.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        user.role = UserRole.ADMIN
+        user.status = UserStatus.ACTIVE
+        db.commit()
+        db.refresh(user)
+        return user
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--email", default="admin@sentinela.com")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--no-create-tables", action="store_true", help="Tables already exist (e.g. created by alembic)")
+    args = parser.parse_args()
+
+    engine.echo = False
+    if not args.no_create_tables:
+        create_tables()
+    user = seed_admin(args.email, args.password)
+    print(f"Admin {user.email} (id {user.id}) ready on {engine.url.render_as_string(hide_password=True)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())